@@ -0,0 +1,94 @@
+"""
+Scaling benchmark for process-pool batch preparation
+
+Times ``prepare_batch`` (validation, phone normalisation, STK Push password
+generation and JSON encoding) over a synthetic batch, in-process and with
+1..N worker processes, in ordered and unordered modes. Reports rows/sec,
+the speed-up over the in-process baseline and parallel efficiency.
+
+Usage:
+    python benchmarks/bench_preparation.py
+    python benchmarks/bench_preparation.py --rows 500000 --workers 1 2 4 8 --kind stk_push
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safaricom_sdk.preparation import prepare_batch  # noqa: E402
+
+SHORTCODE = "174379"
+PASSKEY = "bfb279f9aa9bdbcf158e97dd71a467cd2e0c893059b10f78e6b72ada1ed2c919"
+
+DEFAULTS = {
+    "b2c": dict(
+        InitiatorName="bench",
+        SecurityCredential="credential",
+        PartyA=SHORTCODE,
+        Remarks="Benchmark payout",
+        QueueTimeOutURL="https://example.com/timeout",
+        ResultURL="https://example.com/result",
+    ),
+    "stk_push": dict(
+        BusinessShortCode=SHORTCODE,
+        PartyB=SHORTCODE,
+        TransactionDesc="Benchmark payment",
+        CallBackURL="https://example.com/callback",
+        AccountReference="BENCH",
+    ),
+}
+
+
+def make_rows(kind: str, count: int) -> Iterator[Dict[str, object]]:
+    for i in range(count):
+        phone = f"0712{i % 1_000_000:06d}"
+        if kind == "b2c":
+            yield {"Amount": 100 + i % 900, "PartyB": phone}
+        else:
+            yield {"MerchantRequestID": f"bench-{i}", "Amount": str(10 + i % 90), "PartyA": phone, "PhoneNumber": phone}
+
+
+def run(kind: str, rows: int, workers: int, chunk_size: int, ordered: bool) -> float:
+    """Seconds to prepare ``rows`` rows (pool start-up included)"""
+    start = time.perf_counter()
+    prepared = 0
+    for item in prepare_batch(make_rows(kind, rows), kind, defaults=DEFAULTS[kind], passkey=PASSKEY,
+                              workers=workers, chunk_size=chunk_size, ordered=ordered):
+        prepared += item.ok
+    elapsed = time.perf_counter() - start
+    if prepared != rows:
+        raise RuntimeError(f"Only {prepared} of {rows} rows prepared")
+    return elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    parser = argparse.ArgumentParser(description="Benchmark process-pool batch preparation")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows per run")
+    parser.add_argument("--kind", choices=["b2c", "stk_push"], default="b2c")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers, help="Worker counts to test")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    baseline = run(args.kind, args.rows, 0, args.chunk_size, True)
+    header = f"{'mode':<22}{'rows/sec':>12}{'speed-up':>10}{'efficiency':>12}"
+    print(f"{args.rows:,} {args.kind} rows, chunk size {args.chunk_size}, {cpus} CPUs\n")
+    print(header)
+    print("-" * len(header))
+    print(f"{'in-process':<22}{args.rows / baseline:>12,.0f}{1.0:>10.2f}x{'':>11}")
+    for workers in args.workers:
+        for ordered in (True, False):
+            elapsed = run(args.kind, args.rows, workers, args.chunk_size, ordered)
+            speedup = baseline / elapsed
+            mode = f"{workers} proc {'ordered' if ordered else 'unordered'}"
+            print(f"{mode:<22}{args.rows / elapsed:>12,.0f}{speedup:>10.2f}x{speedup / workers:>11.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""
+Benchmark suite for the SDK hot paths
+
+Covers request model construction, serialization, the utils helpers, token
+cache hits and end-to-end ``stk_push`` / ``process_b2c_payment`` calls against
+the local stand-in server at several concurrency levels.
+
+Each benchmark reports ops/sec, p50/p99 latency and the peak memory traced
+while it ran. Results can be saved as a baseline and later runs compared
+against it to catch regressions after an upgrade.
+
+Usage:
+    python benchmarks/bench_sdk.py
+    python benchmarks/bench_sdk.py --save baseline.json
+    python benchmarks/bench_sdk.py --compare baseline.json --threshold 0.10
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safaricom_sdk import MPESAClient, Configuration, Authentication  # noqa: E402
+from safaricom_sdk.models import (  # noqa: E402
+    STKPushRequest, STKPushResponse, B2CRequest, AccessTokenResponse
+)
+from safaricom_sdk.utils import generate_password, validate_phone_number  # noqa: E402
+
+from stub_server import StubServer  # noqa: E402
+
+SHORTCODE = "174379"
+PASSKEY = "bfb279f9aa9bdbcf158e97dd71a467cd2e0c893059b10f78e6b72ada1ed2c919"
+TIMESTAMP = "20240101120000"
+
+STK_FIELDS = dict(
+    MerchantRequestID="bench-0001",
+    BusinessShortCode=SHORTCODE,
+    Password=generate_password(SHORTCODE, PASSKEY, TIMESTAMP),
+    Timestamp=TIMESTAMP,
+    Amount="10",
+    PartyA="251712345678",
+    PartyB=SHORTCODE,
+    PhoneNumber="251712345678",
+    TransactionDesc="Benchmark payment",
+    CallBackURL="https://example.com/callback",
+    AccountReference="BENCH",
+)
+
+B2C_FIELDS = dict(
+    InitiatorName="bench",
+    SecurityCredential="credential",
+    Amount=100,
+    PartyA=SHORTCODE,
+    PartyB="251712345678",
+    Remarks="Benchmark payout",
+    QueueTimeOutURL="https://example.com/timeout",
+    ResultURL="https://example.com/result",
+)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns: List[int], wall_seconds: float, peak_bytes: int) -> Dict[str, float]:
+    latencies_ns.sort()
+    return {
+        "ops": len(latencies_ns),
+        "ops_per_sec": len(latencies_ns) / wall_seconds if wall_seconds else 0.0,
+        "p50_us": percentile(latencies_ns, 50) / 1000.0,
+        "p99_us": percentile(latencies_ns, 99) / 1000.0,
+        "peak_kib": peak_bytes / 1024.0,
+    }
+
+
+def trace_peak(fn: Callable[[], object], iterations: int) -> int:
+    """Peak traced allocation while running ``fn`` (kept out of the timed pass)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench_serial(fn: Callable[[], object], iterations: int, warmup: int = 100) -> Dict[str, float]:
+    """Time ``fn`` called back-to-back on a single thread"""
+    for _ in range(warmup):
+        fn()
+
+    clock = time.perf_counter_ns
+    latencies = [0] * iterations
+    gc.collect()
+    start = clock()
+    for i in range(iterations):
+        t0 = clock()
+        fn()
+        latencies[i] = clock() - t0
+    wall = (clock() - start) / 1e9
+
+    return summarize(latencies, wall, trace_peak(fn, min(iterations, 500)))
+
+
+def bench_concurrent(fn: Callable[[], object], iterations: int, concurrency: int) -> Dict[str, float]:
+    """Time ``fn`` issued ``iterations`` times across ``concurrency`` threads"""
+    clock = time.perf_counter_ns
+
+    def timed(_):
+        t0 = clock()
+        fn()
+        return clock() - t0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(min(iterations, concurrency * 2))))  # warm-up
+        gc.collect()
+        start = clock()
+        latencies = list(pool.map(timed, range(iterations)))
+        wall = (clock() - start) / 1e9
+
+        # Peak memory from a separate traced pass, so tracing doesn't slow the timed one
+        gc.collect()
+        tracemalloc.start()
+        try:
+            list(pool.map(lambda _: fn(), range(min(iterations, 500))))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return summarize(latencies, wall, peak)
+
+
+STK_RESPONSE_BODY = json.dumps({
+    "MerchantRequestID": "bench-0001",
+    "CheckoutRequestID": "ws_CO_191220191020363925",
+    "ResponseCode": "0",
+    "ResponseDescription": "Success. Request accepted for processing",
+    "CustomerMessage": "Success. Request accepted for processing",
+}).encode()
+
+TOKEN_RESPONSE_BODY = b'{"access_token": "c9SQxWWhmdVRlyh0zh8gZDTkubVF", "expires_in": "3599"}'
+
+
+def make_response(body: bytes) -> requests.Response:
+    """A received requests.Response carrying ``body``, as the client sees it"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = body
+    return response
+
+
+def make_client(base_url: str) -> MPESAClient:
+    """Client pointed at the stand-in server with a warm token"""
+    config = Configuration(
+        consumer_key="bench_key",
+        consumer_secret="bench_secret",
+        environment="sandbox",
+        base_url=base_url,
+    )
+    client = MPESAClient(config)
+    client.auth._access_token = "bench-token"
+    client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+    return client
+
+
+def run_micro(iterations: int) -> Dict[str, Dict[str, float]]:
+    stk_request = STKPushRequest(**STK_FIELDS)
+
+    auth = Authentication(Configuration(consumer_key="bench_key", consumer_secret="bench_secret"))
+    auth._access_token = "bench-token"
+    auth._token_expiry = datetime.now() + timedelta(hours=1)
+
+    config = Configuration(consumer_key="bench_key", consumer_secret="bench_secret")
+    frozen = config.freeze()
+
+    stk_response = make_response(STK_RESPONSE_BODY)
+    token_response = make_response(TOKEN_RESPONSE_BODY)
+
+    cases = {
+        "model.stk_push_request": lambda: STKPushRequest(**STK_FIELDS),
+        "model.b2c_request": lambda: B2CRequest(**B2C_FIELDS),
+        "serialize.model_dump": stk_request.model_dump,
+        "serialize.model_dump_json": stk_request.model_dump_json,
+        "serialize.json_dumps": lambda: json.dumps(stk_request.model_dump()),
+        "utils.generate_password": lambda: generate_password(SHORTCODE, PASSKEY, TIMESTAMP),
+        "utils.validate_phone_number": lambda: validate_phone_number("+251 712-345-678"),
+        # Response decoding: previous dict/str paths vs. direct validation from bytes
+        "decode.stk_response_via_dict": lambda: STKPushResponse(**stk_response.json()),
+        "decode.stk_response_from_bytes": lambda: STKPushResponse.model_validate_json(stk_response.content),
+        "decode.token_via_text": lambda: json.loads(token_response.text)["access_token"],
+        "decode.token_from_bytes": lambda: AccessTokenResponse.model_validate_json(token_response.content),
+        "config.stkpush_url": config.get_stkpush_url,
+        "config.stkpush_url_frozen": frozen.get_stkpush_url,
+        "auth.token_cache_hit": auth.get_access_token,
+    }
+    return {name: bench_serial(fn, iterations) for name, fn in cases.items()}
+
+
+def run_end_to_end(requests_per_level: int, levels: List[int], latency: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    stk_request = STKPushRequest(**STK_FIELDS)
+    b2c_request = B2CRequest(**B2C_FIELDS)
+
+    with StubServer(latency=latency) as server:
+        client = make_client(server.base_url)
+        for concurrency in levels:
+            results[f"e2e.stk_push.c{concurrency}"] = bench_concurrent(
+                lambda: client.stk_push(stk_request), requests_per_level, concurrency
+            )
+            results[f"e2e.process_b2c_payment.c{concurrency}"] = bench_concurrent(
+                lambda: client.process_b2c_payment(b2c_request), requests_per_level, concurrency
+            )
+    return results
+
+
+def print_table(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+    header = f"{'benchmark':<34}{'ops/sec':>12}{'p50 us':>11}{'p99 us':>11}{'peak KiB':>11}"
+    if baseline:
+        header += f"{'d ops/sec':>11}{'d p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = f"{name:<34}{r['ops_per_sec']:>12,.0f}{r['p50_us']:>11.1f}{r['p99_us']:>11.1f}{r['peak_kib']:>11.1f}"
+        if baseline and name in baseline:
+            base = baseline[name]
+            d_ops = (r["ops_per_sec"] - base["ops_per_sec"]) / base["ops_per_sec"] if base["ops_per_sec"] else 0.0
+            d_p99 = (r["p99_us"] - base["p99_us"]) / base["p99_us"] if base["p99_us"] else 0.0
+            line += f"{d_ops:>+11.1%}{d_p99:>+9.1%}"
+        print(line)
+
+
+def find_regressions(results, baseline, threshold: float) -> List[str]:
+    """Benchmarks whose throughput dropped, or p99 grew, by more than ``threshold``"""
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if base["ops_per_sec"] and current["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {base['ops_per_sec']:,.0f} -> {current['ops_per_sec']:,.0f}")
+        if base["p99_us"] and current["p99_us"] > base["p99_us"] * (1 + threshold):
+            regressions.append(f"{name}: p99 {base['p99_us']:.1f}us -> {current['p99_us']:.1f}us")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Safaricom M-PESA SDK hot paths")
+    parser.add_argument("--iterations", type=int, default=20000, help="Iterations per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per end-to-end concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--server-latency", type=float, default=0.0, help="Stand-in server delay in seconds")
+    parser.add_argument("--only", choices=["micro", "e2e"], help="Run a single group")
+    parser.add_argument("--save", metavar="PATH", help="Save results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression (default 10%%)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    if args.only in (None, "micro"):
+        results.update(run_micro(args.iterations))
+    if args.only in (None, "e2e"):
+        results.update(run_end_to_end(args.requests, args.concurrency, args.server_latency))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print_table(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nBaseline saved to {args.save}")
+
+    if baseline:
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Transport benchmark: HTTP/1.1 requests vs. multiplexed HTTP/2
+
+Sends ``process_b2c_payment`` calls at several concurrency levels through
+three transports against the local stand-in servers:
+
+- ``requests``: the client default, a new connection per request
+- ``session``: a pooled ``requests.Session`` (one connection per thread)
+- ``http2``: ``HTTP2Transport``, concurrent requests multiplexed as streams
+
+Reports ops/sec, p50/p99 latency and the number of connections the server
+accepted, which is the socket (and, against a TLS endpoint, handshake)
+count each transport costs. Requires ``pip install safaricom_sdk[http2]``.
+
+Usage:
+    python benchmarks/bench_transport.py
+    python benchmarks/bench_transport.py --requests 2000 --concurrency 8 64 256 --server-latency 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safaricom_sdk import MPESAClient, Configuration  # noqa: E402
+from safaricom_sdk.models import B2CRequest  # noqa: E402
+from safaricom_sdk.transport import HTTP2Transport  # noqa: E402
+
+from stub_server import H2StubServer, StubServer  # noqa: E402
+
+B2C = B2CRequest(
+    InitiatorName="bench",
+    SecurityCredential="credential",
+    Amount=100,
+    PartyA="174379",
+    PartyB="251712345678",
+    Remarks="Benchmark payout",
+    QueueTimeOutURL="https://example.com/timeout",
+    ResultURL="https://example.com/result",
+)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def make_client(base_url: str, session=None) -> MPESAClient:
+    """Client pointed at a stand-in server with a warm token"""
+    client = MPESAClient(
+        Configuration(consumer_key="bench_key", consumer_secret="bench_secret", base_url=base_url),
+        session=session,
+    )
+    client.auth._access_token = "bench-token"
+    client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+    return client
+
+
+def pooled_session(concurrency: int) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=concurrency))
+    return session
+
+
+def run_level(client: MPESAClient, server, total: int, concurrency: int) -> Dict[str, float]:
+    clock = time.perf_counter_ns
+
+    def timed(_):
+        t0 = clock()
+        client.process_b2c_payment(B2C)
+        return clock() - t0
+
+    connections = server.connections
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = clock()
+        latencies = sorted(pool.map(timed, range(total)))
+        wall = (clock() - start) / 1e9
+    return {
+        "ops_per_sec": total / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) / 1e6,
+        "p99_ms": percentile(latencies, 99) / 1e6,
+        "connections": server.connections - connections,
+    }
+
+
+def run(total: int, levels: List[int], latency: float, max_connections: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with StubServer(latency=latency) as h1, H2StubServer(latency=latency) as h2:
+        for concurrency in levels:
+            results[f"requests.c{concurrency}"] = run_level(make_client(h1.base_url), h1, total, concurrency)
+
+            with pooled_session(concurrency) as session:
+                results[f"session.c{concurrency}"] = run_level(
+                    make_client(h1.base_url, session), h1, total, concurrency
+                )
+
+            with HTTP2Transport(max_connections=max_connections, prior_knowledge=True) as transport:
+                results[f"http2.c{concurrency}"] = run_level(
+                    make_client(h2.base_url, transport), h2, total, concurrency
+                )
+    return results
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    header = f"{'transport':<20}{'ops/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'sockets':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<20}{r['ops_per_sec']:>12,.0f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['connections']:>10}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare HTTP/1.1 and HTTP/2 transports under concurrency")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 32, 128])
+    parser.add_argument("--server-latency", type=float, default=0.02, help="Stand-in server delay in seconds")
+    parser.add_argument("--max-connections", type=int, default=4, help="HTTP/2 connections per client")
+    args = parser.parse_args(argv)
+
+    print_table(run(args.requests, args.concurrency, args.server_latency, args.max_connections))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Local stand-in for the Safaricom M-PESA API
+
+Serves canned, successful responses for the endpoints the SDK talks to so
+benchmarks and load tests can exercise the full client request path
+(headers, serialization, HTTP round trip, response parsing) without
+touching the real sandbox.
+"""
+
+import json
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+
+def _stk_push_response(body: dict) -> dict:
+    return {
+        "MerchantRequestID": body.get("MerchantRequestID", str(uuid.uuid4())),
+        "CheckoutRequestID": f"ws_CO_{uuid.uuid4().hex[:20]}",
+        "ResponseCode": "0",
+        "ResponseDescription": "Success. Request accepted for processing",
+        "CustomerMessage": "Success. Request accepted for processing",
+    }
+
+
+def _stk_query_response(body: dict) -> dict:
+    return {
+        "ResponseCode": "0",
+        "ResponseDescription": "The service request has been accepted successfully",
+        "MerchantRequestID": str(uuid.uuid4()),
+        "CheckoutRequestID": body.get("CheckoutRequestID", ""),
+        "ResultCode": "0",
+        "ResultDesc": "The service request is processed successfully.",
+    }
+
+
+def _transaction_response(body: dict) -> dict:
+    return {
+        "ResponseCode": "0",
+        "ResponseDescription": "Accept the service request successfully.",
+        "ConversationID": f"AG_{uuid.uuid4().hex[:20]}",
+        "OriginatorConversationID": str(uuid.uuid4()),
+    }
+
+
+def _token_response(body: dict) -> dict:
+    return {"access_token": uuid.uuid4().hex, "expires_in": "3599"}
+
+
+# Path suffix -> response factory
+ROUTES = {
+    "/v1/token/generate": _token_response,
+    "/oauth/v1/generate": _token_response,
+    "/mpesa/stkpush/v1/processrequest": _stk_push_response,
+    "/mpesa/stkpushquery/v1/query": _stk_query_response,
+    "/mpesa/b2c/v1/paymentrequest": _transaction_response,
+    "/mpesa/c2b/v1/simulate": _transaction_response,
+    "/mpesa/c2b/v1/registerurl": _transaction_response,
+}
+
+
+def _respond(raw_path: str, raw: bytes) -> Tuple[int, bytes]:
+    """Status and encoded body for a request to ``raw_path``"""
+    # Collapse the duplicate slash produced by "base_url/" + "/path"
+    path = "/" + raw_path.split("?", 1)[0].lstrip("/")
+    factory = ROUTES.get(path)
+    try:
+        body = json.loads(raw) if raw else {}
+    except ValueError:
+        body = {}
+
+    if factory is None:
+        status, payload = 404, {"errorCode": "404.001.01", "errorMessage": "Resource not found"}
+    else:
+        status, payload = 200, factory(body)
+    return status, json.dumps(payload).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler answering every known route with a canned payload"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        status, encoded = _respond(self.path, raw)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(encoded)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_HEAD = _dispatch
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    # New connection per request means bursts of connects at high concurrency
+    request_queue_size = 256
+    daemon_threads = True
+    connections = 0
+
+    def get_request(self):
+        request = super().get_request()
+        self.connections += 1
+        return request
+
+
+class StubServer:
+    """
+    Threaded stand-in server running in a background thread
+
+    Args:
+        host (str): Interface to bind (default: 127.0.0.1)
+        port (int): Port to bind, 0 picks a free port
+        latency (float): Artificial server-side delay per request in seconds
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self._server = _Server((host, port), StubHandler)
+        self._server.latency = latency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        """Connections accepted so far"""
+        return self._server.connections
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class H2StubServer:
+    """
+    Cleartext HTTP/2 (h2c with prior knowledge) variant of StubServer
+
+    Streams on a connection are answered independently, so concurrent
+    requests multiplexed over one connection overlap their ``latency``.
+    Requires the ``h2`` package.
+
+    Args:
+        host (str): Interface to bind (default: 127.0.0.1)
+        port (int): Port to bind, 0 picks a free port
+        latency (float): Artificial server-side delay per request in seconds
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        self._h2 = h2
+        self.latency = latency
+        self.connections = 0
+        self._sock = socket.create_server((host, port), backlog=256)
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._workers: List[Tuple[socket.socket, threading.Thread]] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._sock.getsockname()[:2]
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    def _serve(self, sock: socket.socket) -> None:
+        h2 = self._h2
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        lock = threading.RLock()
+        streams = {}
+
+        def respond(stream_id: int) -> None:
+            method, path, raw = streams.pop(stream_id)
+            status, encoded = _respond(path, raw)
+            head = method == "HEAD"
+            with lock:
+                try:
+                    conn.send_headers(stream_id, [
+                        (":status", str(status)),
+                        ("content-type", "application/json"),
+                        ("content-length", str(len(encoded))),
+                    ], end_stream=head)
+                    if not head:
+                        conn.send_data(stream_id, encoded, end_stream=True)
+                    sock.sendall(conn.data_to_send())
+                except (OSError, h2.exceptions.ProtocolError):
+                    pass  # client went away
+
+        with lock:
+            conn.initiate_connection()
+            sock.sendall(conn.data_to_send())
+        try:
+            while True:
+                data = sock.recv(65535)
+                if not data:
+                    return
+                with lock:
+                    for event in conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            headers = dict(event.headers)
+                            streams[event.stream_id] = (headers[":method"], headers[":path"], b"")
+                        elif isinstance(event, h2.events.DataReceived):
+                            method, path, raw = streams[event.stream_id]
+                            streams[event.stream_id] = (method, path, raw + event.data)
+                            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            if self.latency:
+                                timer = threading.Timer(self.latency, respond, (event.stream_id,))
+                                timer.daemon = True
+                                timer.start()
+                            else:
+                                respond(event.stream_id)
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    sock.sendall(conn.data_to_send())
+        except OSError:
+            pass
+        finally:
+            sock.close()
+
+    def _accept(self) -> None:
+        while not self._stopping:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            worker = threading.Thread(target=self._serve, args=(sock,), daemon=True)
+            self._workers.append((sock, worker))
+            worker.start()
+
+    def start(self) -> "H2StubServer":
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping = True
+        try:
+            # Wakes the blocked accept(); close() alone does not on Linux
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        if self._thread is not None:
+            self._thread.join()
+        for sock, worker in self._workers:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            worker.join()
+
+    def __enter__(self) -> "H2StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the M-PESA stand-in server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Per-request delay in seconds")
+    args = parser.parse_args()
+
+    server = StubServer(port=args.port, latency=args.latency)
+    print(f"Serving M-PESA stand-in on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,18 +1,52 @@
 import base64
+import threading
 from datetime import datetime, timedelta
 import requests
 from typing import Optional, Dict
-from .exceptions import MPESAError
+from pydantic import ValidationError as PydanticValidationError
+from .exceptions import MPESAError, DeadlineExceededError
+from .models import AccessTokenResponse
 from .config import Configuration
+from .deadline import current_deadline, resolve_timeout
+from .hedging import RequestHedger
+from .routing import EndpointRouter
 import json
 
 class Authentication:
     """Authentication handler for Safaricom M-PESA API"""    
-    def __init__(self, config: Configuration):
+    def __init__(
+        self,
+        config: Configuration,
+        session: Optional[requests.Session] = None,
+        hedger: Optional[RequestHedger] = None,
+        router: Optional[EndpointRouter] = None
+    ):
         self.config = config
+        self.session = session
+        self.hedger = hedger
+        self.router = router
         self._access_token: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
+        self._refresh_lock = threading.Lock()
     
+    def update_config(self, config: Configuration) -> None:
+        """
+        Switch to a new configuration
+
+        The cached token is dropped when the credentials or token endpoint
+        change; requests already holding it are unaffected.
+        """
+        with self._refresh_lock:
+            old = self.config
+            self.config = config
+            if (
+                old.consumer_key != config.consumer_key
+                or old.consumer_secret != config.consumer_secret
+                or old.get_token_url() != config.get_token_url()
+            ):
+                self._access_token = None
+                self._token_expiry = None
+
     def _generate_basic_auth(self) -> str:
         """Generate Basic Auth string from consumer key and secret"""
         credentials = f"{self.config.consumer_key}:{self.config.consumer_secret}"
@@ -21,20 +55,58 @@ class Authentication:
     
     def get_access_token(self) -> str:
         """Get a valid access token, refreshing if necessary"""
-        if not self._is_token_valid():
+        # Work on a local copy: update_config() may clear the cached token at any point
+        token = self._valid_token()
+        if token is None:
+            self._acquire_refresh_lock()
+            try:
+                # Another thread may have refreshed while we waited
+                token = self._valid_token()
+                if token is None:
+                    self._refresh_access_token()
+                    token = self._access_token
+            finally:
+                self._refresh_lock.release()
+        return token
+
+    def _acquire_refresh_lock(self) -> None:
+        """Wait for the refresh lock, but no longer than the active deadline allows"""
+        deadline = current_deadline()
+        if deadline is None:
+            self._refresh_lock.acquire()
+        elif not self._refresh_lock.acquire(timeout=max(0.0, deadline.remaining())):
+            raise DeadlineExceededError("Deadline exceeded waiting for access token refresh")
+
+    def refresh_if_expiring(self, within_seconds: float) -> bool:
+        """Refresh the token if it expires within the given window; returns True if refreshed"""
+        if self._is_token_valid(margin=within_seconds):
+            return False
+        with self._refresh_lock:
+            if self._is_token_valid(margin=within_seconds):
+                return False
             self._refresh_access_token()
-        return self._access_token
+        return True
     
-    def _is_token_valid(self) -> bool:
-        """Check if current access token is valid"""
-        if not self._access_token or not self._token_expiry:
-            return False
-        return datetime.now() < self._token_expiry
+    def _valid_token(self, margin: float = 0) -> Optional[str]:
+        """The cached access token if it is valid for at least ``margin`` more seconds, else None"""
+        token, expiry = self._access_token, self._token_expiry
+        if not token or not expiry:
+            return None
+        return token if datetime.now() + timedelta(seconds=margin) < expiry else None
+
+    def _is_token_valid(self, margin: float = 0) -> bool:
+        """Check if current access token is valid (for at least ``margin`` more seconds)"""
+        return self._valid_token(margin) is not None
+
+    def _request(self, **kwargs) -> requests.Response:
+        """Send through the shared session when one is configured"""
+        if self.session is not None:
+            return self.session.request(**kwargs)
+        return requests.request(**kwargs)
     
     def _refresh_access_token(self) -> None:
         """Refresh the access token with comprehensive error handling"""
-        # Use the correct Safaricom sandbox token generation URL
-        url = 'https://apisandbox.safaricom.et/v1/token/generate?grant_type=client_credentials'
+        url = self.config.get_token_url()
 
         # Validate credentials before making the request
         if not self.config.consumer_key or not self.config.consumer_secret:        
@@ -44,32 +116,46 @@ class Authentication:
             'Authorization': self._generate_basic_auth()
         }
 
-        try:
-            # Use requests.request for more control and detailed logging
-            response = requests.request(
+        def send(target: str = url) -> requests.Response:
+            return self._request(
                 method='GET',
-                url=url,
+                url=target,
                 headers=headers,
                 verify=self.config.verify_ssl,
-                timeout=15  # Increased timeout
+                timeout=resolve_timeout(
+                    self.config.token_timeout,
+                    self.config.connect_timeout,
+                    self.config.read_timeout,
+                    operation="access token refresh"
+                )
             )
 
-            # Handle mocked responses in tests
-            raw_content = response.text if isinstance(response.text, (str, bytes)) else response.text()
-
-            # Parse the response
-            parsed_content = json.loads(raw_content)
+        try:
+            # Token fetch is idempotent, so it may be hedged and fail over on any transport error
+            fetch = send
+            if self.router is not None:
+                base_url = str(self.config.base_url)
+                fetch = lambda: self.router.send(url, base_url, send, idempotent=True)
+            response = self.hedger.run("token", fetch) if self.hedger is not None else fetch()
 
-            # Update access token and expiry
-            self._access_token = parsed_content.get('access_token')
-            if not self._access_token:
+            # Validate the raw bytes straight into the token model
+            try:
+                token = AccessTokenResponse.model_validate_json(response.content)
+            except PydanticValidationError as e:
+                if any(error['type'] == 'json_invalid' for error in e.errors()):
+                    raise MPESAError(f"Failed to refresh access token: {str(e)}")
                 raise MPESAError("Failed to retrieve access token")
 
-            # Set token expiry
-            expiry_seconds = int(parsed_content.get('expires_in', 3600))
-            self._token_expiry = datetime.now() + timedelta(seconds=expiry_seconds)
+            # Update access token and expiry
+            self._access_token = token.access_token
+            self._token_expiry = datetime.now() + timedelta(seconds=token.expires_in)
 
-        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+        except requests.exceptions.Timeout as e:
+            deadline = current_deadline()
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(f"Deadline exceeded during access token refresh: {str(e)}")
+            raise MPESAError(f"Failed to refresh access token: {str(e)}")
+        except requests.exceptions.RequestException as e:
             raise MPESAError(f"Failed to refresh access token: {str(e)}")
 
     def get_headers(self) -> Dict[str, str]:
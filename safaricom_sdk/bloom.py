@@ -0,0 +1,79 @@
+import hashlib
+import math
+from typing import Iterable, Tuple
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set membership
+
+    Never reports a false negative; reports false positives at roughly
+    ``error_rate`` once ``capacity`` items have been added. Memory is fixed
+    at construction (about 1.8 bytes per item at a 0.1% error rate).
+
+    Args:
+        capacity (int): Expected number of items
+        error_rate (float): Target false-positive probability (default: 0.001)
+    """
+
+    __slots__ = ("capacity", "error_rate", "num_bits", "num_hashes", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        bloom = cls(capacity, error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _hashes(self, item: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        # Double hashing: position_i = h1 + i * h2 (h2 forced odd)
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns True if it was (probably) not present before"""
+        h1, h2 = self._hashes(item)
+        bits = self._bits
+        new = False
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % self.num_bits
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = self._hashes(item)
+        bits = self._bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % self.num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        """Approximate number of distinct items added"""
+        return self.count
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
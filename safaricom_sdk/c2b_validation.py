@@ -0,0 +1,254 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sized, Tuple, Union
+
+from .bloom import BloomFilter
+from .exceptions import ConfigurationError
+from .models import C2BConfirmation
+from .utils import logger, validate_phone_number
+
+
+class ValidationDecision(NamedTuple):
+    """Accept/reject answer returned to Safaricom's ValidationURL call"""
+    accepted: bool
+    result_code: str
+    result_desc: str
+
+    def to_response(self) -> Dict[str, str]:
+        """Response body expected by the C2B validation API"""
+        return {"ResultCode": self.result_code, "ResultDesc": self.result_desc}
+
+
+ACCEPT = ValidationDecision(True, "0", "Accepted")
+REJECT_INVALID_MSISDN = ValidationDecision(False, "C2B00011", "Invalid MSISDN")
+REJECT_INVALID_ACCOUNT = ValidationDecision(False, "C2B00012", "Invalid Account Number")
+REJECT_INVALID_AMOUNT = ValidationDecision(False, "C2B00013", "Invalid Amount")
+REJECT_OTHER = ValidationDecision(False, "C2B00016", "Other Error")
+
+# A rule inspects the payment and returns a decision, or None to defer
+ValidationRule = Callable[[C2BConfirmation], Optional[ValidationDecision]]
+
+
+def amount_range(minimum: Optional[float] = None, maximum: Optional[float] = None) -> ValidationRule:
+    """Rule rejecting payments outside [minimum, maximum], and non-finite amounts"""
+    def rule(event: C2BConfirmation) -> Optional[ValidationDecision]:
+        try:
+            amount = float(event.TransAmount)
+        except ValueError:
+            return REJECT_INVALID_AMOUNT
+        if not math.isfinite(amount):
+            return REJECT_INVALID_AMOUNT
+        if (minimum is not None and amount < minimum) or (maximum is not None and amount > maximum):
+            return REJECT_INVALID_AMOUNT
+        return None
+    return rule
+
+
+def valid_msisdn(event: C2BConfirmation) -> Optional[ValidationDecision]:
+    """Rule rejecting payments whose MSISDN is not a valid Ethiopian number"""
+    try:
+        validate_phone_number(event.MSISDN or "")
+    except ValueError:
+        return REJECT_INVALID_MSISDN
+    return None
+
+
+def _normalize_account(account: Optional[str]) -> str:
+    return (account or "").strip().upper()
+
+
+class C2BValidationService:
+    """
+    In-memory accept/reject decisions for the C2B ValidationURL
+
+    Valid account references are loaded by ``loader`` into an in-memory index
+    that is rebuilt off the request path and swapped in atomically, so
+    ``decide()`` never performs I/O. For very large reference sets the index
+    can be a Bloom filter, trading a small false-accept rate for memory: the
+    filter is sized up front from ``bloom_capacity`` (or the length of the
+    loader's result, if it has one) and the loader is streamed straight into
+    it, so the account list is never held in memory.
+
+    Rules run before the account lookup; the first rule returning a decision
+    wins.
+
+    Args:
+        loader (callable): Returns an iterable of valid account references
+        refresh_interval (float): Seconds between background refreshes (default: 300)
+        rules (list, optional): Extra validation rules
+        use_bloom (bool): Index accounts in a Bloom filter instead of a set
+        bloom_error_rate (float): False-positive rate of the Bloom filter
+        bloom_capacity (int, optional): Expected number of accounts; required
+            with ``use_bloom`` when the loader returns an iterator
+        latency_window (int): Number of recent decision latencies kept for stats
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[str]],
+        refresh_interval: float = 300,
+        rules: Optional[List[ValidationRule]] = None,
+        use_bloom: bool = False,
+        bloom_error_rate: float = 0.001,
+        bloom_capacity: Optional[int] = None,
+        latency_window: int = 10000
+    ):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.rules: List[ValidationRule] = list(rules or [])
+        self.use_bloom = use_bloom
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom_capacity = bloom_capacity
+
+        self._lock = threading.Lock()
+        self._accounts: Union[frozenset, BloomFilter] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._counts = {"hits": 0, "misses": 0, "accepted": 0, "rejected": 0, "rule_rejections": 0,
+                        "refreshes": 0, "refresh_failures": 0}
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def add_rule(self, rule: ValidationRule) -> None:
+        self.rules.append(rule)
+
+    def refresh(self) -> int:
+        """
+        Rebuild the account index from the loader and swap it in
+
+        On failure the previous index keeps serving and the error is logged.
+
+        Returns:
+            int: Number of accounts loaded into the new index (-1 if the refresh failed)
+
+        Raises:
+            ConfigurationError: If the Bloom filter can't be sized (no
+                ``bloom_capacity`` and the loader's result has no length)
+        """
+        try:
+            accounts = self.loader()
+            if self.use_bloom:
+                index, loaded = self._load_bloom(accounts)
+            else:
+                index = frozenset(_normalize_account(a) for a in accounts)
+                loaded = len(index)
+        except ConfigurationError:
+            raise
+        except Exception as e:
+            with self._lock:
+                self._counts["refresh_failures"] += 1
+            logger.warning("C2B validation index refresh failed, keeping previous index: %s", e)
+            return -1
+
+        # Single reference assignment: readers see either the old or the new index
+        self._accounts = index
+        self._loaded_at = time.time()
+        with self._lock:
+            self._counts["refreshes"] += 1
+        return loaded
+
+    def _load_bloom(self, accounts: Iterable[str]) -> Tuple[BloomFilter, int]:
+        """Stream ``accounts`` into a Bloom filter sized before the first insert"""
+        capacity = self.bloom_capacity
+        if capacity is None:
+            if not isinstance(accounts, Sized):
+                raise ConfigurationError(
+                    "bloom_capacity is required when the account loader returns an iterator"
+                )
+            capacity = len(accounts)
+        bloom = BloomFilter(max(1, capacity), self.bloom_error_rate)
+        loaded = 0
+        for account in accounts:
+            bloom.add(_normalize_account(account))
+            loaded += 1
+        if loaded > bloom.capacity:
+            logger.warning(
+                "C2B validation loaded %d accounts into a Bloom filter sized for %d; "
+                "the false-accept rate is above %s, raise bloom_capacity",
+                loaded, bloom.capacity, self.bloom_error_rate
+            )
+        return bloom, loaded
+
+    def start(self) -> None:
+        """Load the index now and keep refreshing it from a daemon thread"""
+        self.refresh()
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.refresh_interval):
+                self.refresh()
+
+        self._refresher = threading.Thread(target=run, name="mpesa-c2b-validation-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        """Stop background refreshing"""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def decide(self, event: Union[C2BConfirmation, Mapping[str, Any]]) -> ValidationDecision:
+        """
+        Decide whether to accept a C2B payment, without any I/O
+
+        Args:
+            event (C2BConfirmation | dict): Payload posted to the ValidationURL
+
+        Returns:
+            ValidationDecision: Accept, or reject with the C2B result code
+        """
+        start = time.perf_counter_ns()
+        lookup = None  # "hits" or "misses" when the account index was consulted
+        rule_rejected = False
+        try:
+            if not isinstance(event, C2BConfirmation):
+                event = C2BConfirmation.model_validate(event)
+        except ValueError:
+            decision = REJECT_OTHER
+        else:
+            decision = None
+            for rule in self.rules:
+                decision = rule(event)
+                if decision is not None:
+                    rule_rejected = not decision.accepted
+                    break
+
+            if decision is None:
+                if _normalize_account(event.BillRefNumber) in self._accounts:
+                    lookup, decision = "hits", ACCEPT
+                else:
+                    lookup, decision = "misses", REJECT_INVALID_ACCOUNT
+
+        elapsed = time.perf_counter_ns() - start
+        with self._lock:
+            counts = self._counts
+            if lookup is not None:
+                counts[lookup] += 1
+            if rule_rejected:
+                counts["rule_rejections"] += 1
+            counts["accepted" if decision.accepted else "rejected"] += 1
+            self._latencies.append(elapsed)
+        return decision
+
+    def handle(self, payload: Mapping[str, Any]) -> Dict[str, str]:
+        """Decide and return the response body for the ValidationURL handler"""
+        return self.decide(payload).to_response()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and decision counters plus decision latency percentiles (microseconds)"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+            latencies = sorted(self._latencies)
+        stats["accounts"] = len(self._accounts)
+        stats["index"] = "bloom" if isinstance(self._accounts, BloomFilter) else "set"
+        stats["loaded_at"] = self._loaded_at
+
+        if latencies:
+            stats["latency_p50_us"] = latencies[len(latencies) // 2] / 1000.0
+            stats["latency_p99_us"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000.0
+        return stats
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Set
+
+import requests
+
+from .exceptions import APIError, DeadlineExceededError, MPESAError
+
+
+class BatchResult(NamedTuple):
+    """Outcome counts of a (possibly resumed) batch run"""
+    succeeded: int
+    failed: int
+    uncertain: int
+    skipped: int
+    resumed_from: int
+
+
+def is_ambiguous(error: BaseException) -> bool:
+    """
+    Whether a failed request may still have been processed by M-PESA
+
+    Timeouts, dropped connections, 5xx responses and successful responses
+    with an unreadable body leave the outcome unknown; an error response
+    (4xx) or a local validation failure means it was not.
+    """
+    if isinstance(error, DeadlineExceededError):
+        return True
+    if isinstance(error, APIError):
+        return error.status_code is None or not 400 <= error.status_code < 500
+    if isinstance(error, MPESAError):
+        cause = error.__cause__ or error.__context__
+        if isinstance(cause, requests.exceptions.ConnectTimeout):
+            return False  # never connected, so never sent
+        return isinstance(cause, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+    return False
+
+
+class BatchCheckpoint:
+    """
+    Compact, crash-safe progress record for a batch of requests
+
+    Progress is kept as a high-water mark (every index below it is finished)
+    plus the few indexes finished above it, a ``dispatched`` mark (one past
+    the highest index handed out for sending), and the exceptions: ``failed`` (definitely not processed, safe to resend) and
+    ``uncertain`` (timed out after sending; reconcile before resending).
+    The file stays small regardless of batch size: only out-of-order
+    completions and the exceptions are listed individually.
+
+    ``reserve()`` persists a ``reserved`` mark *before* requests are sent,
+    once per block of ``reserve_block`` indexes. Completion marks and the
+    dispatched mark are buffered and written every ``flush_every`` updates
+    or ``flush_interval`` seconds. ``release()`` trims the reservation to
+    the dispatched mark once nothing more will be sent, so after an orderly
+    stop only indexes actually handed out count as possibly sent. After a
+    hard crash the whole reserved range does. Either way, indexes in it that
+    are not recorded as finished are flagged by ``was_interrupted()`` and
+    must be reconciled rather than resent, so a resumed run never sends a
+    request twice; indexes past it resume as pending.
+
+    Writes are atomic (temporary file + rename).
+
+    Args:
+        path (str): Checkpoint file
+        flush_every (int): Buffered updates before a write (default: 500)
+        flush_interval (float): Maximum seconds between writes (default: 1.0)
+        reserve_block (int): Indexes dispatched per persisted reservation (default: 64)
+    """
+
+    def __init__(self, path: str, flush_every: int = 500, flush_interval: float = 1.0, reserve_block: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.reserve_block = max(1, reserve_block)
+        self._lock = threading.Lock()
+        self.high_water = 0
+        self.dispatched = 0
+        self.reserved = 0
+        self._done_above: Set[int] = set()
+        self.failed: Dict[int, str] = {}
+        self.uncertain: Dict[int, str] = {}
+        self._dirty = 0
+        self._last_write = time.monotonic()
+        self.writes = 0
+        self._previously_dispatched = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.high_water = state["high_water"]
+        self.dispatched = state["dispatched"]
+        self.reserved = state.get("reserved", self.dispatched)
+        self._done_above = set(state.get("done_above", []))
+        self.failed = {int(i): e for i, e in state.get("failed", {}).items()}
+        self.uncertain = {int(i): e for i, e in state.get("uncertain", {}).items()}
+        self._previously_dispatched = max(self.dispatched, self.reserved)
+
+    @property
+    def resume_index(self) -> int:
+        """Lowest index not known to be finished; a resumed run starts here"""
+        return self.high_water
+
+    def was_interrupted(self, index: int) -> bool:
+        """
+        Whether ``index`` may have been sent by an earlier run without its outcome being recorded
+
+        Such indexes must be reconciled, not resent.
+        """
+        with self._lock:
+            return (
+                index < self._previously_dispatched
+                and index >= self.high_water
+                and index not in self._done_above
+            )
+
+    def _advance(self) -> None:
+        done = self._done_above
+        while self.high_water in done:
+            done.discard(self.high_water)
+            self.high_water += 1
+
+    def _write(self) -> None:
+        state = {
+            "high_water": self.high_water,
+            "dispatched": self.dispatched,
+            "reserved": self.reserved,
+            "done_above": sorted(self._done_above),
+            "failed": {str(i): e for i, e in sorted(self.failed.items())},
+            "uncertain": {str(i): e for i, e in sorted(self.uncertain.items())},
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._dirty = 0
+        self._last_write = time.monotonic()
+        self.writes += 1
+
+    def reserve(self, index: int) -> None:
+        """Record that ``index`` is about to be sent (writes once per reserve block)"""
+        with self._lock:
+            self.dispatched = max(self.dispatched, index + 1)
+            if index < self.reserved:
+                return
+            self.reserved = index + self.reserve_block
+            self._write()
+
+    def release(self) -> None:
+        """Trim the reservation to the indexes actually dispatched and flush; call once nothing more will be sent"""
+        with self._lock:
+            self.reserved = self.dispatched
+            self._write()
+
+    def _finish(self, index: int) -> None:
+        self._done_above.add(index)
+        self._advance()
+        self._dirty += 1
+        if self._dirty >= self.flush_every or time.monotonic() - self._last_write >= self.flush_interval:
+            self._write()
+
+    def mark_done(self, index: int) -> None:
+        with self._lock:
+            self._finish(index)
+
+    def mark_failed(self, index: int, error: str, uncertain: bool = False) -> None:
+        with self._lock:
+            (self.uncertain if uncertain else self.failed)[index] = error
+            self._finish(index)
+
+    def finish(self, total: int) -> None:
+        """Record the true end of the batch (trims the reservation) and flush"""
+        with self._lock:
+            self.dispatched = min(self.dispatched, total)
+            self.reserved = self.dispatched
+            self._previously_dispatched = min(self._previously_dispatched, total)
+            self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def is_done(self, index: int) -> bool:
+        with self._lock:
+            return index < self.high_water or index in self._done_above
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "high_water": self.high_water,
+                "dispatched": self.dispatched,
+                "reserved": self.reserved,
+                "failed": len(self.failed),
+                "uncertain": len(self.uncertain),
+                "writes": self.writes,
+            }
@@ -0,0 +1,338 @@
+"""
+Command-line interface for bulk M-PESA operations
+
+    safaricom-sdk token
+    safaricom-sdk b2c payouts.csv --initiator-name api_op --security-credential ... --parallel 16
+    safaricom-sdk stk-push customers.csv --passkey ... --callback-url https://...
+    safaricom-sdk reconcile stk-results.jsonl --passkey ...
+
+Credentials and the base URL come from the usual MPESA_* environment
+variables (a .env file is honoured) unless given as options.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .checkpoint import is_ambiguous
+from .client import MPESAClient
+from .config import Configuration
+from .exceptions import APIError, MPESAError, ValidationError
+from .models import B2CRequest, STKPushQueryRequest, STKPushRequest
+from .utils import format_timestamp, generate_password, validate_phone_number
+
+# A job is (row key, request), or (row key, ValidationError) when the row is invalid
+Job = Tuple[str, Any]
+
+
+class Progress:
+    """Throughput, latency and error counters printed periodically to a stream"""
+
+    def __init__(self, total: Optional[int], interval: float = 2.0, stream: TextIO = sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.started = time.monotonic()
+        self._last_print = self.started
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=10000)
+        self.counts = {"ok": 0, "error": 0, "uncertain": 0, "invalid": 0, "skipped": 0}
+
+    def record(self, status: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.counts[status] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+            now = time.monotonic()
+            if self.interval and now - self._last_print >= self.interval:
+                self._last_print = now
+                self.stream.write(self.line() + "\n")
+                self.stream.flush()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        done = self.counts["ok"] + self.counts["error"] + self.counts["uncertain"]
+        latencies = sorted(self._latencies)
+        summary: Dict[str, Any] = dict(self.counts)
+        summary["elapsed_s"] = round(elapsed, 3)
+        summary["rate_per_s"] = round(done / elapsed, 1) if elapsed > 0 else 0.0
+        if latencies:
+            summary["p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 1)
+            summary["p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+        return summary
+
+    def line(self) -> str:
+        s = self.summary()
+        processed = s["ok"] + s["error"] + s["uncertain"] + s["invalid"] + s["skipped"]
+        total = f"/{self.total}" if self.total is not None else ""
+        latency = f" p50={s['p50_ms']}ms p95={s['p95_ms']}ms" if "p50_ms" in s else ""
+        return (f"[{s['elapsed_s']:.1f}s] {processed}{total} ok={s['ok']} error={s['error']} "
+                f"uncertain={s['uncertain']} invalid={s['invalid']} skipped={s['skipped']} "
+                f"{s['rate_per_s']}/s{latency}")
+
+
+def _read_rows(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Rows from a CSV or JSONL file, keyed by their ``id`` column or 1-based line number"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    row = json.loads(line)
+                    yield str(row.get("id") or number), row
+        else:
+            for number, row in enumerate(csv.DictReader(f), 1):
+                yield str(row.get("id") or number), row
+
+
+def _count_rows(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        lines = sum(1 for line in f if line.strip())
+    return lines if path.endswith((".jsonl", ".ndjson")) else max(0, lines - 1)
+
+
+def _amount(value: Any) -> int:
+    amount = float(value)
+    if not math.isfinite(amount) or amount <= 0 or amount != int(amount):
+        raise ValueError(f"Invalid amount: {value}")
+    return int(amount)
+
+
+def _b2c_jobs(args: argparse.Namespace, config: Configuration) -> Iterator[Job]:
+    credential = args.security_credential or config.security_credential
+    if not credential and args.certificate:
+        from .security import SecurityCredentialProvider
+        credential = SecurityCredentialProvider(args.certificate).get(args.initiator_name, args.initiator_password or "")
+    if not credential:
+        raise MPESAError("A security credential is required (--security-credential or --certificate)")
+    shortcode = args.shortcode or config.shortcode
+    for key, row in _read_rows(args.file):
+        try:
+            yield key, B2CRequest(
+                InitiatorName=args.initiator_name or config.initiator_name,
+                SecurityCredential=credential,
+                CommandID=row.get("command_id") or args.command_id,
+                Amount=_amount(row["amount"]),
+                PartyA=shortcode,
+                PartyB=validate_phone_number(str(row["phone"])),
+                Remarks=row.get("remarks") or args.remarks,
+                QueueTimeOutURL=args.timeout_url,
+                ResultURL=args.result_url,
+                Occassion=row.get("occasion") or None,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            yield key, ValidationError(f"{type(e).__name__}: {e}")
+
+
+def _stk_jobs(args: argparse.Namespace, config: Configuration) -> Iterator[Job]:
+    shortcode = args.shortcode or config.shortcode
+    for key, row in _read_rows(args.file):
+        try:
+            phone = validate_phone_number(str(row["phone"]))
+            timestamp = format_timestamp()
+            yield key, STKPushRequest(
+                MerchantRequestID=str(row.get("merchant_request_id") or MPESAClient.generate_request_id()),
+                BusinessShortCode=shortcode,
+                Password=generate_password(shortcode, args.passkey, timestamp),
+                Timestamp=timestamp,
+                Amount=str(_amount(row["amount"])),
+                PartyA=phone,
+                PartyB=shortcode,
+                PhoneNumber=phone,
+                TransactionDesc=row.get("description") or args.description,
+                CallBackURL=args.callback_url,
+                AccountReference=row.get("account_reference") or key,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            yield key, ValidationError(f"{type(e).__name__}: {e}")
+
+
+def _reconcile_jobs(args: argparse.Namespace, config: Configuration) -> Iterator[Job]:
+    shortcode = args.shortcode or config.shortcode
+    for key, row in _read_rows(args.file):
+        response = row.get("response") or {}
+        checkout_id = row.get("checkout_request_id") or response.get("CheckoutRequestID")
+        if not checkout_id:
+            if row.get("status") not in ("error", "invalid", "uncertain"):
+                yield key, ValidationError("No CheckoutRequestID")
+            continue
+        timestamp = format_timestamp()
+        yield key, STKPushQueryRequest(
+            BusinessShortCode=shortcode,
+            Password=generate_password(shortcode, args.passkey, timestamp),
+            Timestamp=timestamp,
+            CheckoutRequestID=checkout_id,
+        )
+
+
+def _build_client(args: argparse.Namespace) -> MPESAClient:
+    overrides = {
+        field: value for field, value in (
+            ("consumer_key", args.consumer_key),
+            ("consumer_secret", args.consumer_secret),
+            ("base_url", args.base_url),
+            ("timeout", args.timeout),
+            ("shortcode", getattr(args, "shortcode", None)),
+        ) if value is not None
+    }
+    config = Configuration(**overrides)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max(10, getattr(args, "parallel", 1)))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return MPESAClient(config, session=session)
+
+
+def _cmd_token(args: argparse.Namespace, client: MPESAClient) -> int:
+    started = time.perf_counter()
+    client.auth.get_access_token()
+    latency = time.perf_counter() - started
+    print(json.dumps({
+        "status": "ok",
+        "base_url": str(client.config.base_url),
+        "expires_at": client.auth._token_expiry.isoformat(),
+        "latency_ms": round(latency * 1000, 1),
+    }))
+    return 0
+
+
+_BULK_COMMANDS = {
+    "b2c": (_b2c_jobs, "process_b2c_payment"),
+    "stk-push": (_stk_jobs, "stk_push"),
+    "reconcile": (_reconcile_jobs, "stk_push_query"),
+}
+
+
+def _cmd_bulk(args: argparse.Namespace, client: MPESAClient) -> int:
+    make_jobs, method = _BULK_COMMANDS[args.command]
+    if args.command in ("stk-push", "reconcile") and not args.passkey:
+        raise MPESAError("--passkey (or MPESA_PASSKEY) is required")
+    if not (args.shortcode or client.config.shortcode):
+        raise MPESAError("--shortcode (or MPESA_SHORTCODE) is required")
+
+    total = _count_rows(args.file)
+    if not args.no_warm_up:
+        client.warm_up(connections=min(args.parallel, 8))
+
+    send = getattr(client, method)
+    output = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    progress = Progress(total, interval=args.progress_interval)
+    write_lock = threading.Lock()
+    started: Dict[int, float] = {}
+
+    def call(job: Job) -> Any:
+        key, request = job
+        if isinstance(request, ValidationError):
+            raise request
+        started[id(job)] = time.perf_counter()
+        return send(request)
+
+    def on_result(index: int, job: Job, response: Any, error: Optional[BaseException]) -> None:
+        key, request = job
+        began = started.pop(id(job), None)
+        latency = None if began is None else time.perf_counter() - began
+        record: Dict[str, Any] = {"id": key, "index": index}
+        if error is None:
+            status = "ok"
+            record["response"] = response.model_dump()
+        else:
+            if isinstance(error, ValidationError):
+                status = "invalid"
+            elif is_ambiguous(error) or latency is None:
+                status = "uncertain"
+            else:
+                status = "error"
+            record["error"] = str(error)
+            if isinstance(error, APIError):
+                record["response_code"] = error.response_code
+        record["status"] = status
+        if latency is not None:
+            record["latency_ms"] = round(latency * 1000, 1)
+        with write_lock:
+            output.write(json.dumps(record, default=str) + "\n")
+        progress.record(status, latency if status in ("ok", "error", "uncertain") else None)
+
+    try:
+        result = client.run_batch(
+            make_jobs(args, client.config), call,
+            checkpoint=args.checkpoint, parallel=args.parallel, on_result=on_result
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    progress.counts["skipped"] = result.skipped
+    sys.stderr.write(progress.line() + "\n")
+    print(json.dumps({"summary": progress.summary(), "resumed_from": result.resumed_from}), file=sys.stderr)
+    # Invalid rows are reported in the output but don't fail the run
+    return 0 if progress.counts["error"] == 0 and progress.counts["uncertain"] == 0 else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="safaricom-sdk", description="Bulk M-PESA operations")
+    parser.add_argument("--base-url", default=os.getenv("MPESA_BASE_URL"), help="API base URL (default: MPESA sandbox)")
+    parser.add_argument("--consumer-key", default=os.getenv("MPESA_CONSUMER_KEY"), help="Consumer key (default: $MPESA_CONSUMER_KEY)")
+    parser.add_argument("--consumer-secret", default=os.getenv("MPESA_CONSUMER_SECRET"), help="Consumer secret (default: $MPESA_CONSUMER_SECRET)")
+    parser.add_argument("--timeout", type=int, help="Request timeout in seconds")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("token", help="Fetch an access token to check credentials and connectivity")
+
+    def bulk_parser(name: str, help_text: str) -> argparse.ArgumentParser:
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("file", help="Input rows (.csv with a header row, or .jsonl)")
+        sub.add_argument("--shortcode", default=os.getenv("MPESA_SHORTCODE"), help="Business shortcode")
+        sub.add_argument("--parallel", type=int, default=8, help="Concurrent requests (default: 8)")
+        sub.add_argument("--checkpoint", help="Checkpoint file; a rerun resumes after the last finished row")
+        sub.add_argument("--output", help="Append JSON-lines results here (default: stdout)")
+        sub.add_argument("--progress-interval", type=float, default=2.0, help="Seconds between progress lines")
+        sub.add_argument("--no-warm-up", action="store_true", help="Skip connection and token warm-up")
+        return sub
+
+    b2c = bulk_parser("b2c", "Bulk B2C payouts (columns: phone, amount[, remarks, occasion, command_id, id])")
+    b2c.add_argument("--initiator-name", default=os.getenv("MPESA_INITIATOR_NAME"))
+    b2c.add_argument("--security-credential", default=os.getenv("MPESA_SECURITY_CREDENTIAL"))
+    b2c.add_argument("--certificate", help="M-PESA public certificate used to encrypt --initiator-password")
+    b2c.add_argument("--initiator-password", default=os.getenv("MPESA_INITIATOR_PASSWORD"))
+    b2c.add_argument("--command-id", default="BusinessPayment")
+    b2c.add_argument("--remarks", default="Bulk payment")
+    b2c.add_argument("--result-url", required=True)
+    b2c.add_argument("--timeout-url", required=True)
+
+    stk = bulk_parser("stk-push", "Bulk STK Push (columns: phone, amount[, account_reference, description, id])")
+    stk.add_argument("--passkey", default=os.getenv("MPESA_PASSKEY"))
+    stk.add_argument("--callback-url", required=True)
+    stk.add_argument("--description", default="Payment")
+
+    reconcile = bulk_parser("reconcile", "Query the status of STK Pushes from an stk-push results file")
+    reconcile.add_argument("--passkey", default=os.getenv("MPESA_PASSKEY"))
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    args = build_parser().parse_args(argv)
+    try:
+        client = _build_client(args)
+        if args.command == "token":
+            return _cmd_token(args, client)
+        return _cmd_bulk(args, client)
+    except (MPESAError, ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import asyncio
+import functools
 import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from contextvars import copy_context
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Callable, ContextManager, Iterable, Optional, Type, TypeVar, Union
+from urllib.parse import urlsplit
 import requests
 from datetime import datetime
 import uuid
@@ -8,56 +16,336 @@ from .config import Configuration
 from .auth import Authentication
 from .models import (
     STKPushRequest, STKPushResponse,
+    STKPushQueryRequest, STKPushQueryResponse,
     C2BRegisterURLRequest, C2BPaymentRequest,
     B2CRequest, TransactionResponse
 )
-from .exceptions import MPESAError, APIError
+from pydantic import BaseModel
+from pydantic import ValidationError as PydanticValidationError
+
+from .exceptions import MPESAError, APIError, DeadlineExceededError, ValidationError
+from .deadline import Deadline, Timeout, current_deadline, deadline_scope, resolve_timeout
+from .hedging import RequestHedger
+from .concurrency import AdaptiveConcurrencyLimiter, held_slot
+from .lanes import BULK, INTERACTIVE, LaneScheduler
+from .warmup import WarmUpReport, warm_up
+from .streaming import StreamResult, stream_requests
+from .recording import TrafficRecorder
+from .routing import EndpointRouter
+from .diagnostics import RequestTrace, SlowRequestProfiler
+from .preparation import STK_TIMESTAMP_MAX_AGE, PreparedRequest, refresh_password
+from .checkpoint import BatchCheckpoint, BatchResult, is_ambiguous
+from .sinks import EventSink, make_event
+from .ledger import TransactionLedger
+from .utils import logger
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
 
 class MPESAClient:
     """Main client for interacting with M-PESA APIs"""
     
-    def __init__(self, config: Configuration):
+    def __init__(
+        self,
+        config: Configuration,
+        session: Optional[requests.Session] = None,
+        hedger: Optional[RequestHedger] = None,
+        event_sink: Optional[EventSink] = None,
+        ledger: Optional[TransactionLedger] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        scheduler: Optional[LaneScheduler] = None,
+        recorder: Optional[TrafficRecorder] = None,
+        router: Optional[EndpointRouter] = None,
+        profiler: Optional[SlowRequestProfiler] = None
+    ):
+        self.config = config
+        self.session = session
+        self.hedger = hedger
+        self.event_sink = event_sink
+        self.ledger = ledger
+        self.limiter = limiter
+        self.recorder = recorder
+        self.profiler = profiler
+        self._scheduler = scheduler
+        self._scheduler_lock = threading.Lock()
+        if router is None and len(config.endpoints) > 1:
+            router = EndpointRouter(config.endpoints)
+        self.router = router
+        self.auth = Authentication(config, session=session, hedger=hedger, router=router)
+
+    def update_config(self, config: Configuration) -> None:
+        """
+        Swap in a new configuration without interrupting the client
+
+        Requests already in flight finish with the settings they started
+        with; later requests use the new ones. The session and its connection
+        pools are kept. Use ``config_sources.ConfigWatcher`` to apply changes
+        from env, ``.env`` or JSON/TOML files automatically.
+        """
+        if self.router is not None:
+            self.router.set_endpoints(config.endpoints)
+        elif len(config.endpoints) > 1:
+            self.router = EndpointRouter(config.endpoints)
+            self.auth.router = self.router
+        self.auth.update_config(config)
         self.config = config
-        self.auth = Authentication(config)
+
+    def _request(self, **kwargs) -> requests.Response:
+        """Send through the shared session when one is configured"""
+        if self.session is not None:
+            return self.session.request(**kwargs)
+        return requests.request(**kwargs)
+
+    def _emit(self, kind: str, key: Optional[str], payload: Dict[str, Any]) -> None:
+        """Hand a transaction event to the configured sink and ledger; never fails the API call"""
+        if self.event_sink is None and self.ledger is None:
+            return
+        event = make_event(kind, key, payload)
+        for sink in (self.event_sink, self.ledger):
+            if sink is None:
+                continue
+            try:
+                sink.emit(event)
+            except Exception as e:
+                logger.error("Failed to record %s event %s: %s", kind, key, e)
+
+    def _record(
+        self,
+        method: str,
+        url: str,
+        data: Union[None, Dict, bytes],
+        started: float,
+        response: Optional[requests.Response] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Pass a finished request to the traffic recorder, if one is configured"""
+        if self.recorder is None:
+            return
+        self.recorder.record_request(
+            method, url, data, started, time.time() - started,
+            status=response.status_code if response is not None else None,
+            response=response.content if response is not None else None,
+            error=error
+        )
+
+    def _trace(self, method: str, url: str) -> ContextManager[Optional[RequestTrace]]:
+        """Phase timing for a request attempt (no-op without a profiler)"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.trace(method, url)
+
+    def _slot(self, url: str) -> ContextManager:
+        """Concurrency slot for a request to ``url`` (no-op without a limiter)"""
+        if self.limiter is None:
+            return nullcontext()
+        endpoint = urlsplit(url).path
+        slot = held_slot.get()
+        if slot is not None and slot.endpoint == endpoint:
+            return slot
+        return self.limiter.acquire(endpoint)
+
+    async def _run_async(self, url: str, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking API method in the loop's executor
+
+        The concurrency slot is awaited on the event loop first, so requests
+        over the limit queue as cheap coroutines rather than blocked threads.
+        Context variables (deadlines) carry over into the worker thread.
+        Cancelling the caller doesn't stop a request already in the worker
+        thread, so the slot is held until that thread finishes.
+        """
+        loop = asyncio.get_running_loop()
+        slot = None
+        with deadline_scope(kwargs.get("deadline")):
+            if self.limiter is not None:
+                slot = await self.limiter.acquire_async(urlsplit(url).path)
+            token = held_slot.set(slot)
+            try:
+                context = copy_context()
+            finally:
+                held_slot.reset(token)
+        future = loop.run_in_executor(None, functools.partial(context.run, method, *args, **kwargs))
+        if slot is not None:
+            future.add_done_callback(lambda done: slot.release())
+        # Shielded, so a cancelled caller leaves the future (and its slot release) to the worker thread
+        return await asyncio.shield(future)
+
+    def _timeout(self, operation: str = "request") -> Timeout:
+        """Connect/read timeout for the next request, capped by the active deadline"""
+        return resolve_timeout(
+            self.config.timeout,
+            self.config.connect_timeout,
+            self.config.read_timeout,
+            operation=operation
+        )
     
-    def _make_request(self, method: str, url: str, data: Optional[Dict] = None, verify_ssl: bool = False) -> Dict:
-        """Make HTTP request to M-PESA API"""
+    def _make_request(
+        self,
+        method: str,
+        url: str,
+        data: Union[None, Dict, bytes] = None,
+        verify_ssl: Optional[bool] = None,
+        hedge: Optional[str] = None,
+        response_model: Optional[Type[ResponseModel]] = None
+    ) -> Union[Dict, ResponseModel]:
+        """
+        Make HTTP request to M-PESA API, hedged under the given operation name when a hedger is set
+
+        With ``response_model`` the raw response bytes are validated straight
+        into that model; otherwise the decoded JSON dict is returned. ``data``
+        may be a dict (encoded here) or an already encoded JSON body.
+        ``verify_ssl`` defaults to ``config.verify_ssl``.
+        """
+        if verify_ssl is None:
+            verify_ssl = self.config.verify_ssl
+        if hedge is not None and self.hedger is not None:
+            return self.hedger.run(hedge, lambda: self._send_request(method, url, data, verify_ssl, response_model))
+        return self._send_request(method, url, data, verify_ssl, response_model)
+
+    @staticmethod
+    def _api_error(response: requests.Response) -> APIError:
+        """Build an APIError from an error response, tolerating non-JSON bodies"""
+        try:
+            body = json.loads(response.content)
+        except (TypeError, ValueError):
+            body = None
+        if not isinstance(body, dict):
+            body = {}
+        return APIError(
+            message=f"API request failed: {response.status_code}",
+            response_code=body.get("errorCode"),
+            response_description=body.get("errorMessage"),
+            status_code=response.status_code
+        )
+
+    def _send_request(
+        self,
+        method: str,
+        url: str,
+        data: Union[None, Dict, bytes],
+        verify_ssl: bool,
+        response_model: Optional[Type[ResponseModel]] = None
+    ) -> Union[Dict, ResponseModel]:
+        """Send a single attempt of an API request"""
+        with self._trace(method, url) as trace:
+            return self._send_traced(method, url, data, verify_ssl, response_model, trace)
+
+    def _send_traced(
+        self,
+        method: str,
+        url: str,
+        data: Union[None, Dict, bytes],
+        verify_ssl: bool,
+        response_model: Optional[Type[ResponseModel]],
+        trace: Optional[RequestTrace]
+    ) -> Union[Dict, ResponseModel]:
+        """Body of ``_send_request``, marking each phase on ``trace`` when profiling"""
         headers = self.auth.get_headers()
+        body = {"data": data} if isinstance(data, bytes) else {"json": data}
+        if trace is not None:
+            trace.mark("token")
+
+        def send(target: str) -> requests.Response:
+            started = time.time()
+            if trace is not None:
+                trace.attempts += 1
+            try:
+                response = self._request(
+                    method=method,
+                    url=target,
+                    headers=headers,
+                    timeout=self._timeout(f"request to {target}"),
+                    **body,
+                    verify=verify_ssl
+                )
+            except requests.exceptions.RequestException as e:
+                self._record(method, target, data, started, error=str(e))
+                raise
+            self._record(method, target, data, started, response=response)
+            if trace is not None:
+                trace.status = response.status_code
+            return response
 
         try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data,
-                timeout=self.config.timeout,
-                verify=verify_ssl  # Set to False for testing
-            )
+            with self._slot(url):
+                if trace is not None:
+                    trace.mark("slot_wait")
+                if self.router is not None:
+                    response = self.router.send(url, str(self.config.base_url), send)
+                else:
+                    response = send(url)
+                if trace is not None:
+                    trace.mark("send")
 
-            response_data = response.json()
+                if response.status_code >= 400:
+                    raise self._api_error(response)
 
-            if response.status_code >= 400:
+            try:
+                if response_model is not None:
+                    # One parse from bytes, no intermediate str or dict
+                    result = response_model.model_validate_json(response.content)
+                else:
+                    result = response.json()
+            except (PydanticValidationError, ValueError) as e:
                 raise APIError(
-                    message=f"API request failed: {response.status_code}",
-                    response_code=response_data.get("errorCode"),
-                    response_description=response_data.get("errorMessage")
+                    message=f"Invalid response body from {url}: {str(e)}",
+                    status_code=response.status_code
                 )
+            if trace is not None:
+                trace.mark("parse")
+            return result
 
-            return response_data
-
+        except requests.exceptions.Timeout as e:
+            deadline = current_deadline()
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for {url}: {str(e)}")
+            raise MPESAError(f"Request failed: {str(e)}")
         except requests.exceptions.RequestException as e:
             raise MPESAError(f"Request failed: {str(e)}")
 
-    def stk_push(self, request: STKPushRequest) -> STKPushResponse:
-        """Initiate STK Push request"""
-        url = self.config.get_stkpush_url()
-        response = self._make_request("POST", url, request.model_dump())
-        return STKPushResponse(**response)
+    def stk_push(
+        self,
+        request: STKPushRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> STKPushResponse:
+        """
+        Initiate STK Push request, optionally bounded by a deadline (seconds or Deadline)
+
+        Never hedged: M-PESA doesn't deduplicate STK Push requests, so a
+        duplicate attempt would prompt (and could charge) the customer twice.
+        """
+        with deadline_scope(deadline):
+            url = self.config.get_stkpush_url()
+            response = self._make_request("POST", url, request.model_dump(), response_model=STKPushResponse)
+        self._emit("stk_push", response.CheckoutRequestID, {
+            **response.model_dump(),
+            "Amount": request.Amount,
+            "PhoneNumber": request.PhoneNumber,
+            "AccountReference": request.AccountReference
+        })
+        return response
+
+    def stk_push_query(
+        self,
+        request: STKPushQueryRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> STKPushQueryResponse:
+        """Query the status of an STK Push (hedged when a hedger is configured)"""
+        with deadline_scope(deadline):
+            url = self.config.get_stkpush_query_url()
+            return self._make_request(
+                "POST", url, request.model_dump(),
+                hedge="stk_push_query",
+                response_model=STKPushQueryResponse
+            )
     
-    def register_c2b_url(self, request: C2BRegisterURLRequest) -> Dict:
+    def register_c2b_url(self, request: C2BRegisterURLRequest, deadline: Union[None, float, Deadline] = None) -> Dict:
         """Register C2B URLs with comprehensive error handling"""
+        with deadline_scope(deadline):
+            return self._register_c2b_url(request)
+
+    def _register_c2b_url(self, request: C2BRegisterURLRequest) -> Dict:
         # Construct the URL with API key
-        url = f"{self.config.get_c2b_register_url()}?apikey={self.config.consumer_key}"
+        url = self.config.get_c2b_register_url_with_key()
         
         # Convert the request to a dictionary
         request_data = request.model_dump()
@@ -67,15 +355,16 @@ class MPESAClient:
         
         try:
             # Use form data instead of JSON
-            response = requests.post(
-                url, 
+            response = self._request(
+                method='POST',
+                url=url,
                 data=request_data,
                 headers={
                     'Authorization': f'Bearer {self.auth.get_access_token()}',
                     'Content-Type': 'application/x-www-form-urlencoded'
                 },
-                timeout=self.config.timeout,
-                verify=False  # Disable SSL verification for testing
+                timeout=self._timeout("C2B URL registration"),
+                verify=self.config.verify_ssl
             )
 
             # Log the full response for debugging
@@ -102,18 +391,294 @@ class MPESAClient:
             print(f"Error: {str(e)}")
             raise
  
-    def process_c2b_payment(self, request: C2BPaymentRequest) -> TransactionResponse:
-        """Process C2B payment"""
-        url = self.config.get_c2b_payment_url()
-        response = self._make_request("POST", url, request.model_dump())
-        return TransactionResponse(**response)
+    def process_c2b_payment(self, request: C2BPaymentRequest, deadline: Union[None, float, Deadline] = None) -> TransactionResponse:
+        """Process C2B payment, optionally bounded by a deadline (seconds or Deadline)"""
+        with deadline_scope(deadline):
+            url = self.config.get_c2b_payment_url()
+            response = self._make_request("POST", url, request.model_dump(), response_model=TransactionResponse)
+        self._emit("c2b_payment", response.TransactionID or response.ConversationID, {
+            **response.model_dump(),
+            "RequestRefID": request.RequestRefID
+        })
+        return response
     
-    def process_b2c_payment(self, request: B2CRequest) -> TransactionResponse:
-        """Process B2C payment"""
-        url = self.config.get_b2c_url()
-        response = self._make_request("POST", url, request.model_dump())
-        return TransactionResponse(**response)
+    def process_b2c_payment(self, request: B2CRequest, deadline: Union[None, float, Deadline] = None) -> TransactionResponse:
+        """Process B2C payment, optionally bounded by a deadline (seconds or Deadline)"""
+        with deadline_scope(deadline):
+            url = self.config.get_b2c_url()
+            response = self._make_request("POST", url, request.model_dump(), response_model=TransactionResponse)
+        self._emit("b2c_payment", response.ConversationID or response.OriginatorConversationID, {
+            **response.model_dump(),
+            "Amount": request.Amount,
+            "PartyB": request.PartyB,
+            "CommandID": request.CommandID
+        })
+        return response
     
+    def send_prepared(
+        self,
+        prepared: PreparedRequest,
+        deadline: Union[None, float, Deadline] = None,
+        passkey: Optional[str] = None
+    ) -> Union[STKPushResponse, TransactionResponse]:
+        """
+        Send a body produced by ``prepare_batch()`` without re-validating or re-encoding it
+
+        With ``passkey``, an STK Push body gets a fresh ``Timestamp`` and
+        ``Password`` just before sending. Without one, STK Push bodies older
+        than ``STK_TIMESTAMP_MAX_AGE`` seconds are refused.
+
+        Raises:
+            ValidationError: If the row failed preparation or its STK Push timestamp is stale
+        """
+        if not prepared.ok:
+            raise ValidationError(f"Row {prepared.index} failed preparation: {prepared.error}")
+        if prepared.kind == "stk_push" and passkey:
+            prepared = refresh_password(prepared, passkey)
+        elif prepared.kind == "stk_push":
+            age = prepared.age()
+            if age is not None and age > STK_TIMESTAMP_MAX_AGE:
+                raise ValidationError(
+                    f"Row {prepared.index} has an STK Push timestamp {age:.0f}s old; "
+                    "pass passkey= to regenerate it at send time"
+                )
+        if prepared.kind == "stk_push":
+            url, response_model, event = self.config.get_stkpush_url(), STKPushResponse, "stk_push"
+        else:
+            url, response_model, event = self.config.get_b2c_url(), TransactionResponse, "b2c_payment"
+        with deadline_scope(deadline):
+            response = self._make_request("POST", url, prepared.body, response_model=response_model)
+        key = (
+            response.CheckoutRequestID if prepared.kind == "stk_push"
+            else response.ConversationID or response.OriginatorConversationID
+        )
+        self._emit(event, key, {**response.model_dump(), **prepared.summary})
+        return response
+
+    async def stk_push_async(
+        self,
+        request: STKPushRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> STKPushResponse:
+        """Async variant of stk_push"""
+        return await self._run_async(self.config.get_stkpush_url(), self.stk_push, request, deadline=deadline)
+
+    async def stk_push_query_async(
+        self,
+        request: STKPushQueryRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> STKPushQueryResponse:
+        """Async variant of stk_push_query"""
+        return await self._run_async(self.config.get_stkpush_query_url(), self.stk_push_query, request, deadline=deadline)
+
+    async def process_c2b_payment_async(
+        self,
+        request: C2BPaymentRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> TransactionResponse:
+        """Async variant of process_c2b_payment"""
+        return await self._run_async(self.config.get_c2b_payment_url(), self.process_c2b_payment, request, deadline=deadline)
+
+    async def process_b2c_payment_async(
+        self,
+        request: B2CRequest,
+        deadline: Union[None, float, Deadline] = None
+    ) -> TransactionResponse:
+        """Async variant of process_b2c_payment"""
+        return await self._run_async(self.config.get_b2c_url(), self.process_b2c_payment, request, deadline=deadline)
+
+    def stream_stk_push(
+        self,
+        items: Union[AsyncIterable, Iterable],
+        concurrency: int = 16,
+        deadline: Union[None, float, Deadline] = None
+    ) -> AsyncIterator[StreamResult]:
+        """
+        Send STK Pushes from an async (or plain) iterable as capacity frees up
+
+        Yields a StreamResult per request in completion order, correlated by
+        MerchantRequestID unless items are ``(correlation_id, request)`` pairs.
+        See ``streaming.stream_requests`` for backpressure and cancellation.
+        """
+        return stream_requests(
+            items, self.stk_push_async, lambda index, request: request.MerchantRequestID,
+            concurrency=concurrency, deadline=deadline
+        )
+
+    def stream_b2c(
+        self,
+        items: Union[AsyncIterable, Iterable],
+        concurrency: int = 16,
+        deadline: Union[None, float, Deadline] = None
+    ) -> AsyncIterator[StreamResult]:
+        """
+        Send B2C payments from an async (or plain) iterable as capacity frees up
+
+        Yields a StreamResult per request in completion order, correlated by
+        stream position unless items are ``(correlation_id, request)`` pairs.
+        """
+        return stream_requests(
+            items, self.process_b2c_payment_async, lambda index, request: index,
+            concurrency=concurrency, deadline=deadline
+        )
+
+    def warm_up(self, connections: int = 4, timeout: float = 10.0) -> WarmUpReport:
+        """
+        Resolve DNS, fetch the access token and open idle TLS connections in parallel
+
+        Call once at startup so the first request runs at steady-state latency.
+        Never raises; check the returned report for failed steps.
+        """
+        return warm_up(self, connections=connections, timeout=timeout)
+
+    async def warm_up_async(self, connections: int = 4, timeout: float = 10.0) -> WarmUpReport:
+        """Async variant of warm_up (runs in the loop's executor)"""
+        loop = asyncio.get_running_loop()
+        context = copy_context()
+        return await loop.run_in_executor(
+            None, functools.partial(context.run, self.warm_up, connections=connections, timeout=timeout)
+        )
+
+    @property
+    def scheduler(self) -> LaneScheduler:
+        """Lane scheduler used by the submit_* methods (a default one is created on first use)"""
+        if self._scheduler is None:
+            with self._scheduler_lock:
+                if self._scheduler is None:
+                    self._scheduler = LaneScheduler()
+        return self._scheduler
+
+    def _submit(self, lane: str, method: Callable[..., Any], request: Any, deadline: Union[None, float, Deadline]) -> Future:
+        # Start the deadline clock at submission so time spent queued counts against it
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+        return self.scheduler.submit(lane, method, request, deadline=deadline)
+
+    def submit_stk_push(
+        self,
+        request: STKPushRequest,
+        lane: str = INTERACTIVE,
+        deadline: Union[None, float, Deadline] = None
+    ) -> "Future[STKPushResponse]":
+        """Queue an STK Push on a priority lane (interactive by default)"""
+        return self._submit(lane, self.stk_push, request, deadline)
+
+    def submit_stk_push_query(
+        self,
+        request: STKPushQueryRequest,
+        lane: str = INTERACTIVE,
+        deadline: Union[None, float, Deadline] = None
+    ) -> "Future[STKPushQueryResponse]":
+        """Queue an STK Push status query on a priority lane (interactive by default)"""
+        return self._submit(lane, self.stk_push_query, request, deadline)
+
+    def submit_c2b_payment(
+        self,
+        request: C2BPaymentRequest,
+        lane: str = BULK,
+        deadline: Union[None, float, Deadline] = None
+    ) -> "Future[TransactionResponse]":
+        """Queue a C2B payment on a priority lane (bulk by default)"""
+        return self._submit(lane, self.process_c2b_payment, request, deadline)
+
+    def submit_b2c_payment(
+        self,
+        request: B2CRequest,
+        lane: str = BULK,
+        deadline: Union[None, float, Deadline] = None
+    ) -> "Future[TransactionResponse]":
+        """Queue a B2C payment on a priority lane (bulk by default)"""
+        return self._submit(lane, self.process_b2c_payment, request, deadline)
+
+    def run_batch(
+        self,
+        items: Iterable[Any],
+        method: Union[str, Callable[[Any], Any]],
+        checkpoint: Union[None, str, BatchCheckpoint] = None,
+        parallel: int = 8,
+        on_result: Optional[Callable[[int, Any, Any, Optional[BaseException]], None]] = None
+    ) -> BatchResult:
+        """
+        Send a batch of requests in parallel, resumably
+
+        With a checkpoint, rerunning the same batch after a crash skips
+        finished items without re-sending them. Items that may have been sent
+        without a recorded outcome are reported as uncertain (and passed to
+        ``on_result`` with an error) instead of being sent again.
+
+        Args:
+            items (iterable): Requests, in a stable order across runs
+            method (str | callable): Client method name (e.g. "process_b2c_payment") or a callable
+            checkpoint (str | BatchCheckpoint, optional): Checkpoint file or instance
+            parallel (int): Concurrent requests (default: 8)
+            on_result (callable, optional): Called as ``on_result(index, item, response, error)``
+
+        Returns:
+            BatchResult: Counts of succeeded, failed, uncertain and skipped items
+        """
+        call = getattr(self, method) if isinstance(method, str) else method
+        if isinstance(checkpoint, str):
+            checkpoint = BatchCheckpoint(checkpoint, reserve_block=max(64, 2 * parallel))
+        resumed_from = checkpoint.resume_index if checkpoint is not None else 0
+        counts = {"succeeded": 0, "failed": 0, "uncertain": 0, "skipped": 0}
+        lock = threading.Lock()
+
+        def report(index: int, item: Any, response: Any, error: Optional[BaseException]) -> None:
+            if on_result is not None:
+                on_result(index, item, response, error)
+
+        def execute(index: int, item: Any) -> None:
+            try:
+                response = call(item)
+            except MPESAError as e:
+                uncertain = is_ambiguous(e)
+                if checkpoint is not None:
+                    checkpoint.mark_failed(index, str(e), uncertain=uncertain)
+                with lock:
+                    counts["uncertain" if uncertain else "failed"] += 1
+                report(index, item, None, e)
+            else:
+                if checkpoint is not None:
+                    checkpoint.mark_done(index)
+                with lock:
+                    counts["succeeded"] += 1
+                report(index, item, response, None)
+
+        total = 0
+        try:
+            with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="mpesa-batch") as pool:
+                pending = set()
+                for index, item in enumerate(items):
+                    total = index + 1
+                    if checkpoint is not None:
+                        if index < resumed_from or checkpoint.is_done(index):
+                            counts["skipped"] += 1
+                            continue
+                        if checkpoint.was_interrupted(index):
+                            error = MPESAError("Interrupted before the outcome was recorded; reconcile before resending")
+                            checkpoint.mark_failed(index, str(error), uncertain=True)
+                            counts["uncertain"] += 1
+                            report(index, item, None, error)
+                            continue
+                    if len(pending) >= 2 * parallel:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    if checkpoint is not None:
+                        checkpoint.reserve(index)
+                    pending.add(pool.submit(execute, index, item))
+                for future in pending:
+                    future.result()
+        except BaseException:
+            # The pool has drained, so nothing past the dispatched mark was sent; those rows resume as pending
+            if checkpoint is not None:
+                checkpoint.release()
+            raise
+
+        if checkpoint is not None:
+            checkpoint.finish(total)
+        return BatchResult(resumed_from=resumed_from, **counts)
+
     @staticmethod
     def generate_timestamp() -> str:
         """Generate timestamp in required format"""
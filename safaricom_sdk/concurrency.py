@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional
+
+import requests
+
+from .deadline import current_deadline
+from .exceptions import APIError, DeadlineExceededError, MPESAError
+
+# Slot acquired by an async wrapper on behalf of the sync call it dispatches
+held_slot: ContextVar[Optional["Slot"]] = ContextVar("mpesa_held_slot", default=None)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an error signals that the API is saturated (timeouts, 429s, 5xx)"""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, DeadlineExceededError)):
+        return True
+    if isinstance(error, APIError):
+        return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+        self.cancelled = False
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class _EndpointLimit:
+    __slots__ = ("limit", "max_limit", "in_flight", "waiters", "successes", "drops",
+                 "latency_ewma", "baseline", "last_decrease")
+
+    def __init__(self, limit: float, max_limit: int):
+        self.limit = limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.waiters: Deque[_Waiter] = deque()
+        self.successes = 0
+        self.drops = 0
+        self.latency_ewma: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+
+
+class Slot:
+    """
+    One admitted in-flight request
+
+    Used as a context manager: a clean exit records a success with the
+    measured latency, an overload error (see ``is_overload``) records a drop,
+    and any other error leaves the limit untouched.
+    """
+
+    __slots__ = ("limiter", "endpoint", "started", "_done")
+
+    def __init__(self, limiter: "AdaptiveConcurrencyLimiter", endpoint: str):
+        self.limiter = limiter
+        self.endpoint = endpoint
+        self.started = time.monotonic()
+        self._done = False
+
+    def success(self) -> None:
+        if not self._done:
+            self._done = True
+            self.limiter._release(self.endpoint, time.monotonic() - self.started, overloaded=False)
+
+    def drop(self) -> None:
+        if not self._done:
+            self._done = True
+            self.limiter._release(self.endpoint, None, overloaded=True)
+
+    def release(self) -> None:
+        """Free the slot without a latency or overload signal"""
+        if not self._done:
+            self._done = True
+            self.limiter._release(self.endpoint, None, overloaded=False)
+
+    def __enter__(self) -> "Slot":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_value is None:
+            self.success()
+        elif is_overload(exc_value):
+            self.drop()
+        else:
+            self.release()
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.__exit__(exc_type, exc_value, traceback)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight requests, kept separately per endpoint
+
+    Each successful response whose latency is within ``latency_tolerance``
+    times the endpoint's baseline latency grows the limit by ``1 / limit``
+    (about +1 per round trip at full utilization). Timeouts, connection
+    errors, 429s and 5xx responses multiply it by ``backoff``, at most once
+    per observed round trip so a burst of failures from one congested window
+    counts once. Slow-but-successful responses hold the limit steady.
+
+    Requests beyond the limit wait in FIFO order, bounded by the caller's
+    deadline (see ``deadline_scope``) or ``acquire_timeout``. Threads and
+    asyncio tasks share the same limits.
+
+    Args:
+        initial_limit (int): Starting limit for every endpoint (default: 4)
+        min_limit (int): Floor for the limit (default: 1)
+        max_limit (int): Ceiling for the limit (default: 64)
+        backoff (float): Multiplicative decrease factor (default: 0.5)
+        latency_tolerance (float): Latency multiple of baseline still considered healthy (default: 2.0)
+        endpoint_limits (dict, optional): Per-endpoint ceilings, keyed by URL path
+        acquire_timeout (float, optional): Maximum wait for a slot when no deadline is active
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        endpoint_limits: Optional[Dict[str, int]] = None,
+        acquire_timeout: Optional[float] = None
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointLimit] = {}
+
+    def _state(self, endpoint: str) -> _EndpointLimit:
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            max_limit = self.endpoint_limits.get(endpoint, self.max_limit)
+            state = self._endpoints[endpoint] = _EndpointLimit(
+                float(min(self.initial_limit, max_limit)), max_limit
+            )
+        return state
+
+    def _wait_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        deadline = current_deadline()
+        if deadline is not None:
+            remaining = max(0.0, deadline.remaining())
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout if timeout is not None else self.acquire_timeout
+
+    @staticmethod
+    def _timeout_error(endpoint: str) -> MPESAError:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired:
+            return DeadlineExceededError(f"Deadline exceeded waiting for a concurrency slot on {endpoint}")
+        return MPESAError(f"Timed out waiting for a concurrency slot on {endpoint}")
+
+    def _try_acquire(self, state: _EndpointLimit, waiter_factory) -> Optional[_Waiter]:
+        """Take a slot immediately (returns None) or enqueue a waiter"""
+        self._grant(state)
+        if not state.waiters and state.in_flight < int(state.limit):
+            state.in_flight += 1
+            return None
+        waiter = waiter_factory()
+        state.waiters.append(waiter)
+        return waiter
+
+    def acquire(self, endpoint: str, timeout: Optional[float] = None) -> Slot:
+        """Block until a slot is free for ``endpoint``"""
+        with self._lock:
+            waiter = self._try_acquire(self._state(endpoint), _Waiter)
+        if waiter is not None:
+            waiter.event.wait(self._wait_timeout(timeout))
+            with self._lock:
+                if not waiter.granted:
+                    waiter.cancelled = True
+                    raise self._timeout_error(endpoint)
+        return Slot(self, endpoint)
+
+    async def acquire_async(self, endpoint: str, timeout: Optional[float] = None) -> Slot:
+        """Wait without blocking the event loop until a slot is free for ``endpoint``"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            waiter = self._try_acquire(self._state(endpoint), lambda: _Waiter(loop))
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self._wait_timeout(timeout))
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                with self._lock:
+                    granted = waiter.granted
+                    waiter.cancelled = not granted
+                if granted:
+                    # Granted while we were being cancelled: hand the slot back
+                    self._release(endpoint, None, overloaded=False)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                raise self._timeout_error(endpoint)
+        return Slot(self, endpoint)
+
+    def _grant(self, state: _EndpointLimit) -> None:
+        """Admit queued waiters while there is room (lock held)"""
+        while state.waiters and (state.waiters[0].cancelled or state.in_flight < int(state.limit)):
+            waiter = state.waiters.popleft()
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            state.in_flight += 1
+            waiter.wake()
+
+    def _release(self, endpoint: str, latency: Optional[float], overloaded: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(endpoint)
+            state.in_flight -= 1
+
+            if overloaded:
+                state.drops += 1
+                round_trip = state.latency_ewma or 0.0
+                if now - state.last_decrease >= round_trip:
+                    state.limit = max(float(self.min_limit), state.limit * self.backoff)
+                    state.last_decrease = now
+            elif latency is not None:
+                state.successes += 1
+                if state.latency_ewma is None:
+                    state.latency_ewma = state.baseline = latency
+                else:
+                    state.latency_ewma += 0.2 * (latency - state.latency_ewma)
+                    # Baseline follows the fastest responses, drifting up slowly
+                    if latency < state.baseline:
+                        state.baseline = latency
+                    else:
+                        state.baseline += 0.01 * (latency - state.baseline)
+                healthy = latency <= self.latency_tolerance * state.baseline
+                # Only grow when the current limit is actually being used
+                if healthy and state.in_flight + 1 >= state.limit / 2:
+                    state.limit = min(float(state.max_limit), state.limit + 1.0 / state.limit)
+
+            self._grant(state)
+
+    def limit(self, endpoint: str) -> int:
+        """Current in-flight limit for an endpoint"""
+        with self._lock:
+            return int(self._state(endpoint).limit)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, in-flight, waiting and outcome counters per endpoint"""
+        with self._lock:
+            return {
+                endpoint: {
+                    "limit": int(state.limit),
+                    "max_limit": state.max_limit,
+                    "in_flight": state.in_flight,
+                    "waiting": sum(1 for w in state.waiters if not w.cancelled),
+                    "successes": state.successes,
+                    "drops": state.drops,
+                    "latency_ms": None if state.latency_ewma is None else state.latency_ewma * 1000,
+                    "baseline_ms": None if state.baseline is None else state.baseline * 1000,
+                }
+                for endpoint, state in self._endpoints.items()
+            }
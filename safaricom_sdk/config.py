@@ -1,6 +1,6 @@
 import os
-from typing import Optional
-from pydantic import BaseModel, HttpUrl, field_validator
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator
 import requests
 import base64
 
@@ -11,6 +11,9 @@ class Configuration(BaseModel):
     consumer_secret: str = os.getenv('MPESA_CONSUMER_SECRET', '')
     environment: str = os.getenv('MPESA_ENVIRONMENT', '')
     timeout: int = 30
+    token_timeout: float = 15
+    connect_timeout: Optional[float] = None  # Overrides timeout/token_timeout for connecting
+    read_timeout: Optional[float] = None  # Overrides timeout/token_timeout for reading
     max_retries: int = 3
     app_name: str = os.getenv('APP_NAME', '')
     verify_ssl: bool = True
@@ -25,46 +28,86 @@ class Configuration(BaseModel):
         return v
 
     # API endpoints
-    base_url: HttpUrl = "https://apisandbox.safaricom.et"
+    base_url: HttpUrl = Field("https://apisandbox.safaricom.et", validate_default=True)
+    base_urls: Tuple[HttpUrl, ...] = ()  # Failover endpoints tried after base_url, ranked by health
     auth_url: str = "/oauth/v1/generate?grant_type=client_credentials"
+    token_url: str = "/v1/token/generate?grant_type=client_credentials"
     stkpush_url: str = "/mpesa/stkpush/v1/processrequest"
+    stkpush_query_url: str = "/mpesa/stkpushquery/v1/query"
     b2c_url: str = "/mpesa/b2c/v1/paymentrequest"
     c2b_register_url: str = "/mpesa/c2b/v1/registerurl"
     c2b_payment_url: str = "/mpesa/c2b/v1/simulate"
     
     # Optional configurations
     api_key: Optional[str] = None  # Update if you have an API key
+    shortcode: Optional[str] = os.getenv('MPESA_SHORTCODE')
     initiator_name: Optional[str] = None
     security_credential: Optional[str] = None
     
+    @field_validator('base_urls', mode='before')
+    @classmethod
+    def split_base_urls(cls, v):
+        # Comma-separated in environment variables and .env files
+        if isinstance(v, str):
+            return tuple(url.strip() for url in v.split(",") if url.strip())
+        return v
+
+    @property
+    def endpoints(self) -> List[str]:
+        """base_url followed by the failover base_urls, without duplicates or trailing slashes"""
+        urls = [str(self.base_url)] + [str(url) for url in self.base_urls]
+        return list(dict.fromkeys(url.rstrip('/') for url in urls))
+
     @property
     def is_production(self) -> bool:
         """Check if environment is production"""
         return self.environment.lower() == "production"
     
+    def _build_url(self, path: str) -> str:
+        """Join the base URL and an endpoint path without doubling the slash"""
+        return f"{str(self.base_url).rstrip('/')}{path}"
+
     def get_auth_url(self) -> str:
         """Get the complete authentication URL"""
-        return f"{self.base_url}{self.auth_url}"
+        return self._build_url(self.auth_url)
+
+    def get_token_url(self) -> str:
+        """Get the complete token generation URL"""
+        return self._build_url(self.token_url)
     
     def get_stkpush_url(self) -> str:
         """Get the complete STK push URL"""
-        return f"{self.base_url}{self.stkpush_url}"
+        return self._build_url(self.stkpush_url)
+
+    def get_stkpush_query_url(self) -> str:
+        """Get the complete STK push status query URL"""
+        return self._build_url(self.stkpush_query_url)
     
     def get_b2c_url(self) -> str:
         """Get the complete B2C URL"""
-        return f"{self.base_url}{self.b2c_url}"
+        return self._build_url(self.b2c_url)
     
     def get_c2b_register_url(self) -> str:
         """Get the complete C2B registration URL"""
-        return f"{self.base_url}{self.c2b_register_url}"
+        return self._build_url(self.c2b_register_url)
+
+    def get_c2b_register_url_with_key(self) -> str:
+        """Get the C2B registration URL with the consumer key as ``apikey`` query parameter"""
+        return f"{self.get_c2b_register_url()}?apikey={self.consumer_key}"
     
     def get_c2b_payment_url(self) -> str:
         """Get the complete C2B payment URL"""
-        return f"{self.base_url}{self.c2b_payment_url}"
+        return self._build_url(self.c2b_payment_url)
+
+    def freeze(self) -> "FrozenConfiguration":
+        """Return an immutable, hashable copy with all endpoint URLs resolved once"""
+        if isinstance(self, FrozenConfiguration):
+            return self
+        return FrozenConfiguration(**self.model_dump(warnings=False))
 
     def get_access_token(self):
         """Get access token from Safaricom API"""
-        url = f"{self.base_url}{self.auth_url}"
+        url = self.get_auth_url()
         
         # Use base64 encoded credentials
         credentials = f"{self.consumer_key}:{self.consumer_secret}"
@@ -96,6 +139,70 @@ class Configuration(BaseModel):
             print(f"Response content: {response.text}")
             return None
 
+
+class FrozenConfiguration(Configuration):
+    """
+    Immutable Configuration with precomputed endpoint URLs
+
+    All endpoint URLs (including the token URL and the C2B registration URL
+    with its ``apikey`` parameter) are resolved once at construction, so the
+    getters are plain lookups. Instances are hashable and can be used as
+    cache keys; use ``replace()`` to derive a changed config.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    def model_post_init(self, __context) -> None:
+        c2b_register = self._build_url(self.c2b_register_url)
+        # Stored as a plain instance attribute: pydantic private attributes are
+        # resolved through __getattr__, which costs more than rebuilding the URL
+        object.__setattr__(self, "_urls", {
+            "auth": self._build_url(self.auth_url),
+            "token": self._build_url(self.token_url),
+            "stkpush": self._build_url(self.stkpush_url),
+            "stkpush_query": self._build_url(self.stkpush_query_url),
+            "b2c": self._build_url(self.b2c_url),
+            "c2b_register": c2b_register,
+            "c2b_register_with_key": f"{c2b_register}?apikey={self.consumer_key}",
+            "c2b_payment": self._build_url(self.c2b_payment_url),
+        })
+
+    def replace(self, **changes) -> "FrozenConfiguration":
+        """Return a new validated FrozenConfiguration with the given fields changed"""
+        fields = self.model_dump(warnings=False)
+        fields.update(changes)
+        return FrozenConfiguration(**fields)
+
+    def model_copy(self, *, update=None, deep: bool = False) -> "FrozenConfiguration":
+        """Copy, rebuilding the URL table (via ``replace()``) when fields are updated"""
+        if update:
+            return self.replace(**update)
+        return super().model_copy(deep=deep)
+
+    def get_auth_url(self) -> str:
+        return self._urls["auth"]
+
+    def get_token_url(self) -> str:
+        return self._urls["token"]
+
+    def get_stkpush_url(self) -> str:
+        return self._urls["stkpush"]
+
+    def get_stkpush_query_url(self) -> str:
+        return self._urls["stkpush_query"]
+
+    def get_b2c_url(self) -> str:
+        return self._urls["b2c"]
+
+    def get_c2b_register_url(self) -> str:
+        return self._urls["c2b_register"]
+
+    def get_c2b_register_url_with_key(self) -> str:
+        return self._urls["c2b_register_with_key"]
+
+    def get_c2b_payment_url(self) -> str:
+        return self._urls["c2b_payment"]
+
 # Example of calling the method
 # config = Configuration()
 # token = config.get_access_token()
@@ -0,0 +1,303 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence
+
+from pydantic import ValidationError as PydanticValidationError
+
+from .config import Configuration, FrozenConfiguration
+from .exceptions import ConfigurationError
+from .utils import logger
+
+if TYPE_CHECKING:
+    from .client import MPESAClient
+
+# Environment variables read for backwards compatibility, besides MPESA_<FIELD>
+_LEGACY_ENV = {"APP_NAME": "app_name"}
+
+
+def _env_fields(variables: Mapping[str, Optional[str]], prefix: str) -> Dict[str, Any]:
+    """Configuration fields from ``<prefix><FIELD_NAME>`` variables (empty values ignored)"""
+    fields = {}
+    for name in Configuration.model_fields:
+        value = variables.get(f"{prefix}{name.upper()}")
+        if value not in (None, ""):
+            fields[name] = value
+    for variable, name in _LEGACY_ENV.items():
+        value = variables.get(variable)
+        if value not in (None, "") and name not in fields:
+            fields[name] = value
+    return fields
+
+
+def _file_fingerprint(path: str) -> Hashable:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class ConfigSource(ABC):
+    """
+    A place configuration values come from
+
+    ``fingerprint()`` must be cheap (a stat or a dict lookup): it is polled to
+    detect changes, and ``load()`` is only called when it changes.
+    """
+
+    @abstractmethod
+    def fingerprint(self) -> Hashable:
+        """Value that changes whenever ``load()`` would return something different"""
+
+    @abstractmethod
+    def load(self) -> Dict[str, Any]:
+        """Configuration fields from this source"""
+
+
+class EnvSource(ConfigSource):
+    """
+    Process environment: ``MPESA_CONSUMER_KEY``, ``MPESA_TIMEOUT``, ``MPESA_BASE_URL``, ...
+
+    Any Configuration field can be set as ``<prefix><FIELD NAME IN CAPS>``.
+    """
+
+    def __init__(self, prefix: str = "MPESA_", environ: Optional[Mapping[str, str]] = None):
+        self.prefix = prefix
+        self.environ = os.environ if environ is None else environ
+
+    def load(self) -> Dict[str, Any]:
+        return _env_fields(self.environ, self.prefix)
+
+    def fingerprint(self) -> Hashable:
+        return tuple(sorted(self.load().items()))
+
+
+class DotEnvSource(ConfigSource):
+    """``.env`` file with the same variable names as EnvSource; a missing file contributes nothing"""
+
+    def __init__(self, path: str = ".env", prefix: str = "MPESA_"):
+        self.path = path
+        self.prefix = prefix
+
+    def fingerprint(self) -> Hashable:
+        return _file_fingerprint(self.path)
+
+    def load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        from dotenv import dotenv_values
+        return _env_fields(dotenv_values(self.path), self.prefix)
+
+
+class FileSource(ConfigSource):
+    """
+    JSON or TOML file of Configuration fields, at the top level or under an ``[mpesa]`` table
+
+    TOML needs Python 3.11+ or the ``tomli`` package (``pip install safaricom_sdk[toml]``).
+    A missing file contributes nothing unless ``required``.
+    """
+
+    def __init__(self, path: str, required: bool = False):
+        self.path = path
+        self.required = required
+        if path.endswith(".toml"):
+            self._parse = self._parse_toml
+        elif path.endswith(".json"):
+            self._parse = json.loads
+        else:
+            raise ConfigurationError(f"Unsupported configuration file type: {path}")
+
+    @staticmethod
+    def _parse_toml(text: str) -> Dict[str, Any]:
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ConfigurationError(
+                    "TOML configuration files require Python 3.11+ or the 'tomli' package. "
+                    "Install it with: pip install safaricom_sdk[toml]"
+                )
+        return tomllib.loads(text)
+
+    def fingerprint(self) -> Hashable:
+        return _file_fingerprint(self.path)
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = self._parse(f.read())
+        except FileNotFoundError:
+            if self.required:
+                raise ConfigurationError(f"Configuration file not found: {self.path}")
+            return {}
+        except ValueError as e:
+            raise ConfigurationError(f"Invalid configuration file {self.path}: {e}")
+        if isinstance(data.get("mpesa"), dict):
+            data = data["mpesa"]
+        unknown = set(data) - set(Configuration.model_fields)
+        if unknown:
+            raise ConfigurationError(f"Unknown configuration fields in {self.path}: {', '.join(sorted(unknown))}")
+        return data
+
+
+def default_sources(path: Optional[str] = None) -> List[ConfigSource]:
+    """``.env`` file, then the optional JSON/TOML file, then the environment (highest precedence)"""
+    sources: List[ConfigSource] = [DotEnvSource()]
+    if path is not None:
+        sources.append(FileSource(path, required=True))
+    sources.append(EnvSource())
+    return sources
+
+
+class ConfigLoader:
+    """
+    Merges configuration sources into a validated, frozen Configuration
+
+    Later sources override earlier ones. ``load()`` only re-reads and
+    re-validates when a source's fingerprint has changed, and returns the
+    previous object when the merged values are unchanged, so it is cheap
+    enough to call on every poll.
+
+    Args:
+        sources (sequence of ConfigSource): Sources in increasing precedence (default: default_sources())
+        defaults (dict, optional): Values applied below every source
+    """
+
+    def __init__(self, sources: Optional[Sequence[ConfigSource]] = None, defaults: Optional[Dict[str, Any]] = None):
+        self.sources = list(sources) if sources is not None else default_sources()
+        self.defaults = dict(defaults or {})
+        self._lock = threading.Lock()
+        self._fingerprints: Optional[List[Hashable]] = None
+        self._fields: Optional[Dict[str, Any]] = None
+        self._config: Optional[FrozenConfiguration] = None
+
+    def changed(self) -> bool:
+        """Whether any source changed since the last load (stat/lookup only)"""
+        return [source.fingerprint() for source in self.sources] != self._fingerprints
+
+    def load(self) -> FrozenConfiguration:
+        """
+        The current configuration, re-validated only if a source changed
+
+        Raises:
+            ConfigurationError: If a source can't be read or the merged values are invalid
+        """
+        with self._lock:
+            fingerprints = [source.fingerprint() for source in self.sources]
+            if self._config is not None and fingerprints == self._fingerprints:
+                return self._config
+            try:
+                fields = dict(self.defaults)
+                for source in self.sources:
+                    fields.update(source.load())
+                if self._config is None or fields != self._fields:
+                    try:
+                        self._config = FrozenConfiguration(**fields)
+                    except PydanticValidationError as e:
+                        raise ConfigurationError(f"Invalid configuration: {e}")
+                    self._fields = fields
+            finally:
+                # A rejected change is reported once, not on every poll until it is fixed
+                self._fingerprints = fingerprints
+            return self._config
+
+
+class ConfigWatcher:
+    """
+    Polls a ConfigLoader and swaps new configurations into live clients
+
+    Each poll costs one stat per file source. When a source changes, the new
+    configuration is validated once and handed to every registered client's
+    ``update_config()``; sessions, connection pools and in-flight requests
+    are untouched. An invalid configuration is logged (and passed to
+    ``on_error``) and the clients keep their current one.
+
+    Args:
+        loader (ConfigLoader): Configuration sources
+        clients (iterable of MPESAClient): Clients to keep up to date; more can be added with ``register()``
+        interval (float): Seconds between polls (default: 5)
+        on_change (callable, optional): Called with each newly applied configuration
+        on_error (callable, optional): Called with the ConfigurationError of a rejected change
+    """
+
+    def __init__(
+        self,
+        loader: ConfigLoader,
+        clients: Iterable["MPESAClient"] = (),
+        interval: float = 5.0,
+        on_change: Optional[Callable[[FrozenConfiguration], None]] = None,
+        on_error: Optional[Callable[[ConfigurationError], None]] = None
+    ):
+        self.loader = loader
+        self.interval = interval
+        self.on_change = on_change
+        self.on_error = on_error
+        self._clients: List["MPESAClient"] = list(clients)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.config = loader.load()
+        self.reloads = 0
+        self.errors = 0
+
+    def register(self, client: "MPESAClient") -> None:
+        """Keep ``client`` up to date, applying the current configuration now"""
+        with self._lock:
+            self._clients.append(client)
+            config = self.config
+        client.update_config(config)
+
+    def check(self) -> bool:
+        """Poll once; returns True if a new configuration was applied"""
+        if not self.loader.changed():
+            return False
+        try:
+            config = self.loader.load()
+        except ConfigurationError as e:
+            self.errors += 1
+            logger.error("Configuration reload rejected, keeping the current configuration: %s", e)
+            if self.on_error is not None:
+                self.on_error(e)
+            return False
+        with self._lock:
+            if config is self.config:
+                return False
+            self.config = config
+            clients = list(self._clients)
+        for client in clients:
+            client.update_config(config)
+        self.reloads += 1
+        logger.info("Configuration reloaded and applied to %d clients", len(clients))
+        if self.on_change is not None:
+            self.on_change(config)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Configuration watcher failed: %s", e)
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="mpesa-config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,126 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple, Union
+
+from .exceptions import DeadlineExceededError
+
+# Deadline of the innermost active deadline_scope (None when unbounded)
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("mpesa_deadline", default=None)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class Deadline:
+    """
+    Absolute point in time by which an operation must finish
+
+    Based on the monotonic clock so wall-clock adjustments don't stretch or
+    shrink the budget.
+
+    Args:
+        seconds (float): Budget from now, in seconds
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def at(cls, expires_at: float) -> "Deadline":
+        """Deadline at an absolute ``time.monotonic()`` value"""
+        deadline = cls.__new__(cls)
+        deadline.expires_at = expires_at
+        return deadline
+
+    def remaining(self) -> float:
+        """Seconds left (negative once expired)"""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, operation: str = "request") -> float:
+        """Return the remaining budget, raising DeadlineExceededError if it is spent"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline exceeded before {operation}")
+        return remaining
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the active deadline_scope, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Union[None, float, Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Bound every SDK call made inside the block by a deadline
+
+    Token refresh and HTTP requests issued within the scope use whatever is
+    left of the budget for their connect/read timeouts. Nested scopes can
+    only tighten the budget, never extend it.
+
+    Args:
+        deadline (float | Deadline | None): Budget in seconds, a Deadline, or None to inherit
+
+    Yields:
+        Deadline: The effective deadline (None when unbounded)
+    """
+    if deadline is None:
+        yield _current_deadline.get()
+        return
+
+    if not isinstance(deadline, Deadline):
+        deadline = Deadline(deadline)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def resolve_timeout(
+    default: float,
+    connect: Optional[float] = None,
+    read: Optional[float] = None,
+    operation: str = "request"
+) -> Timeout:
+    """
+    Compute the ``timeout`` argument for a requests call
+
+    Uses the split connect/read timeouts when configured (falling back to
+    ``default`` for a missing half) and caps both by the active deadline.
+
+    Args:
+        default (float): Timeout used when no split timeouts are configured
+        connect (float, optional): Connect timeout in seconds
+        read (float, optional): Read timeout in seconds
+        operation (str): Description used in DeadlineExceededError messages
+
+    Returns:
+        float | tuple: A single timeout, or a (connect, read) tuple
+
+    Raises:
+        DeadlineExceededError: If the active deadline has already passed
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        if connect is None and read is None:
+            return default
+        return (connect if connect is not None else default, read if read is not None else default)
+
+    remaining = deadline.check(operation)
+    connect = min(connect if connect is not None else default, remaining)
+    read = min(read if read is not None else default, remaining)
+    return (connect, read)
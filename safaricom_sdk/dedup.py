@@ -0,0 +1,228 @@
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+from .bloom import BloomFilter
+
+T = TypeVar("T")
+
+
+def callback_key(payload: Mapping[str, Any]) -> Optional[str]:
+    """
+    Identify an M-PESA callback by its natural idempotency key
+
+    - STK Push callbacks: ``Body.stkCallback.CheckoutRequestID``
+    - B2C results: ``Result.ConversationID`` (falling back to the originator
+      conversation ID or the TransactionID)
+    - C2B confirmations/validations: ``TransID``
+
+    Returns:
+        str: Namespaced key such as ``"stk:ws_CO_..."``, or None if unrecognized
+    """
+    body = payload.get("Body")
+    if isinstance(body, Mapping):
+        stk = body.get("stkCallback")
+        if isinstance(stk, Mapping) and stk.get("CheckoutRequestID"):
+            return f"stk:{stk['CheckoutRequestID']}"
+
+    result = payload.get("Result")
+    if isinstance(result, Mapping):
+        for field in ("ConversationID", "OriginatorConversationID", "TransactionID"):
+            if result.get(field):
+                return f"b2c:{result[field]}"
+
+    if payload.get("TransID"):
+        return f"c2b:{payload['TransID']}"
+    return None
+
+
+class CallbackDeduplicator:
+    """
+    Drops repeated deliveries of the same callback in O(1)
+
+    Keys are remembered for ``window_seconds`` in an insertion-ordered map
+    capped at ``max_entries``, so memory has a fixed ceiling no matter how
+    many callbacks arrive. Two optional layers extend it:
+
+    - ``sqlite_path``: persistent record of seen keys that survives restarts
+      and is authoritative for anything outside the in-memory window.
+    - ``bloom_capacity``: a pair of rotating Bloom filters covering the window.
+      With SQLite it lets brand-new keys skip the lookup; without SQLite it
+      replaces exact tracking beyond ``max_entries`` at the cost of rare
+      false duplicates (at ``bloom_error_rate``).
+
+    Args:
+        window_seconds (float): How long a key is remembered (default: 24h)
+        max_entries (int): In-memory key ceiling (default: 100,000)
+        sqlite_path (str, optional): SQLite database for persistent deduplication
+        bloom_capacity (int, optional): Expected keys per window for the Bloom filters
+        bloom_error_rate (float): False-positive rate of the Bloom filters
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 86400,
+        max_entries: int = 100_000,
+        sqlite_path: Optional[str] = None,
+        bloom_capacity: Optional[int] = None,
+        bloom_error_rate: float = 0.0001,
+        clock: Callable[[], float] = time.time
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        # Keys released by forget() that a Bloom filter (which can't delete) still reports
+        self._released: "OrderedDict[str, None]" = OrderedDict()
+        self._counts = {"processed": 0, "duplicates": 0, "unkeyed": 0, "released": 0}
+
+        self._blooms = None
+        if bloom_capacity:
+            # Two generations rotated every window: a key stays in the filter
+            # for at least one full window, so a miss means "not seen recently"
+            self._blooms = [BloomFilter(bloom_capacity, bloom_error_rate), BloomFilter(bloom_capacity, bloom_error_rate)]
+            self._bloom_rotated_at = clock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._last_prune = clock()
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS mpesa_callback_keys (key TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS mpesa_callback_keys_seen_at ON mpesa_callback_keys (seen_at)"
+            )
+            if self._blooms is not None:
+                # Rebuild the filter after a restart so misses stay trustworthy
+                cursor = self._db.execute(
+                    "SELECT key FROM mpesa_callback_keys WHERE seen_at >= ?", (clock() - window_seconds,)
+                )
+                for (key,) in cursor:
+                    self._blooms[0].add(key)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        recent = self._recent
+        while recent:
+            key, seen_at = next(iter(recent.items()))
+            if seen_at > cutoff and len(recent) <= self.max_entries:
+                break
+            recent.popitem(last=False)
+
+        if self._blooms is not None and now - self._bloom_rotated_at >= self.window_seconds:
+            self._blooms = [BloomFilter(self.bloom_capacity, self.bloom_error_rate), self._blooms[0]]
+            self._bloom_rotated_at = now
+
+        if self._db is not None and now - self._last_prune >= min(self.window_seconds, 3600):
+            self._db.execute("DELETE FROM mpesa_callback_keys WHERE seen_at < ?", (cutoff,))
+            self._last_prune = now
+
+    def _check_and_add(self, key: str, now: float) -> bool:
+        if key in self._recent:
+            return True
+
+        duplicate = False
+        in_bloom = self._blooms is not None and (key in self._blooms[0] or key in self._blooms[1])
+        if self._db is not None:
+            if self._blooms is None or in_bloom:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO mpesa_callback_keys (key, seen_at) VALUES (?, ?)", (key, now)
+                )
+                duplicate = cursor.rowcount == 0
+            else:
+                # Bloom says definitely new: record without a lookup
+                self._db.execute("INSERT OR REPLACE INTO mpesa_callback_keys (key, seen_at) VALUES (?, ?)", (key, now))
+        else:
+            duplicate = in_bloom and key not in self._released
+
+        if not duplicate:
+            self._released.pop(key, None)
+            self._recent[key] = now
+            if len(self._recent) > self.max_entries:
+                self._recent.popitem(last=False)
+            if self._blooms is not None:
+                self._blooms[0].add(key)
+        return duplicate
+
+    def seen(self, key: str) -> bool:
+        """
+        Record a key and report whether it was already seen within the window
+
+        Returns:
+            bool: True if this is a duplicate delivery
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            duplicate = self._check_and_add(key, now)
+            self._counts["duplicates" if duplicate else "processed"] += 1
+        return duplicate
+
+    def forget(self, key: str) -> None:
+        """Release a key recorded by ``seen()``, so its next delivery is processed again"""
+        with self._lock:
+            self._recent.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM mpesa_callback_keys WHERE key = ?", (key,))
+            elif self._blooms is not None:
+                self._released[key] = None
+                if len(self._released) > self.max_entries:
+                    self._released.popitem(last=False)
+            self._counts["released"] += 1
+
+    def is_duplicate(self, payload: Mapping[str, Any]) -> bool:
+        """
+        Record a callback payload; unrecognized payloads are never treated as duplicates
+
+        The key counts as seen from now on. If processing the payload then
+        fails, call ``forget(callback_key(payload))`` so Safaricom's
+        redelivery isn't dropped (``wrap()`` does this for you).
+        """
+        key = callback_key(payload)
+        if key is None:
+            with self._lock:
+                self._counts["unkeyed"] += 1
+            return False
+        return self.seen(key)
+
+    def wrap(self, handler: Callable[[Mapping[str, Any]], T]) -> Callable[[Mapping[str, Any]], Optional[T]]:
+        """
+        Decorate a callback handler so duplicate deliveries return None without calling it
+
+        If the handler raises, its key is released before the error
+        propagates, so the redelivery of that callback is processed.
+        """
+        @functools.wraps(handler)
+        def deduplicated(payload: Mapping[str, Any]) -> Optional[T]:
+            if self.is_duplicate(payload):
+                return None
+            try:
+                return handler(payload)
+            except BaseException:
+                key = callback_key(payload)
+                if key is not None:
+                    self.forget(key)
+                raise
+        return deduplicated
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["tracked"] = len(self._recent)
+        return stats
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
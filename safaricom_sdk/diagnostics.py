@@ -0,0 +1,277 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .utils import logger
+
+# Phases of one request attempt, in the order they run
+PHASES = ("token", "slot_wait", "send", "parse")
+_NEXT_PHASE = {"token": "slot_wait", "slot_wait": "send", "send": "parse", "parse": "parse"}
+
+
+def _stack(frame: Any, depth: int) -> Tuple[str, ...]:
+    """``file:line function`` entries of a frame's stack, outermost first"""
+    entries = []
+    while frame is not None and len(entries) < depth:
+        code = frame.f_code
+        entries.append(f"{code.co_filename}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    entries.reverse()
+    return tuple(entries)
+
+
+class RequestTrace:
+    """
+    Phase timings of one request attempt, filled in by the client
+
+    ``mark(phase)`` closes ``phase`` at the current time; the next phase
+    starts there. Use it as a context manager (see
+    ``SlowRequestProfiler.trace``) so the attempt is always finished.
+    """
+
+    __slots__ = ("profiler", "method", "url", "thread_id", "started", "phase", "phases",
+                 "attempts", "status", "error", "samples", "sample_count", "finished", "_last")
+
+    def __init__(self, profiler: "SlowRequestProfiler", method: str, url: str):
+        self.profiler = profiler
+        self.method = method
+        self.url = url
+        self.thread_id = threading.get_ident()
+        self.started = self._last = time.perf_counter()
+        self.phase = PHASES[0]
+        self.phases: Dict[str, float] = {}
+        self.attempts = 0
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        # Written by the sampler thread under the profiler's lock; no samples are added once finished
+        self.samples: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self.sample_count = 0
+        self.finished = False
+
+    def mark(self, phase: str) -> None:
+        """Close ``phase``, which started at the previous mark"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+        self.phase = _NEXT_PHASE[phase]
+
+    def __enter__(self) -> "RequestTrace":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_value is not None:
+            self.error = f"{exc_type.__name__}: {exc_value}"
+        self.profiler.finish(self)
+
+
+class SlowRequestProfiler:
+    """
+    Records a phase breakdown of every request that takes longer than ``threshold``
+
+    Each request attempt is split into token acquisition, concurrency slot
+    wait, send (including endpoint failover) and response parsing. Requests
+    under the threshold cost a trace object, a clock read and a dict update
+    per phase mark, and a clock read and comparison when finished; with
+    ``sample_stacks`` they also take the profiler lock once at the start and
+    once at the end. Slow ones become reports in a ring buffer of the last ``capacity`` entries, which
+    ``dump()`` returns or writes out on demand. Reports are rate limited
+    with a token bucket (``rate`` per second, bursts of ``burst``) so a
+    latency incident can't flood the buffer or the log; each report carries
+    the number suppressed before it.
+
+    With ``sample_stacks`` a daemon thread samples the stack of every
+    request in flight for longer than ``sample_after`` every
+    ``sample_interval`` seconds, and the report lists the most frequent
+    stacks with the phase they were seen in.
+
+    For ``*_async`` calls the concurrency slot is awaited on the event loop
+    before the attempt starts, so that wait isn't part of ``slot_wait``.
+
+    Args:
+        threshold (float): Seconds above which a request is reported (default: 1)
+        capacity (int): Reports kept in the ring buffer (default: 100)
+        rate (float): Reports per second allowed on average (default: 1)
+        burst (int): Reports allowed back to back (default: 10)
+        sample_stacks (bool): Sample stacks of slow in-flight requests (default: False)
+        sample_interval (float): Seconds between stack samples (default: 0.01)
+        sample_after (float, optional): In-flight age at which sampling starts (default: threshold / 2)
+        max_samples (int): Samples kept per request (default: 500)
+        max_stacks (int): Distinct stacks listed per report (default: 5)
+        stack_depth (int): Frames kept per stack (default: 30)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        capacity: int = 100,
+        rate: float = 1.0,
+        burst: int = 10,
+        sample_stacks: bool = False,
+        sample_interval: float = 0.01,
+        sample_after: Optional[float] = None,
+        max_samples: int = 500,
+        max_stacks: int = 5,
+        stack_depth: int = 30
+    ):
+        self.threshold = threshold
+        self.rate = rate
+        self.burst = burst
+        self.sample_stacks = sample_stacks
+        self.sample_interval = sample_interval
+        self.sample_after = threshold / 2 if sample_after is None else sample_after
+        self.max_samples = max_samples
+        self.max_stacks = max_stacks
+        self.stack_depth = stack_depth
+        self._lock = threading.Lock()
+        self._reports: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._in_flight: Dict[int, RequestTrace] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.requests = 0
+        self.slow = 0
+        self.suppressed = 0
+        self._suppressed_since_report = 0
+
+    def trace(self, method: str, url: str) -> RequestTrace:
+        """Start timing one request attempt; finished when the returned trace's ``with`` block exits"""
+        trace = RequestTrace(self, method, url)
+        if self.sample_stacks:
+            with self._lock:
+                self._in_flight[id(trace)] = trace
+            if self._sampler is None:
+                self._start_sampler()
+        return trace
+
+    def finish(self, trace: RequestTrace) -> None:
+        """Report ``trace`` if it went over the threshold"""
+        elapsed = time.perf_counter() - trace.started
+        if self.sample_stacks:
+            with self._lock:
+                self._in_flight.pop(id(trace), None)
+                trace.finished = True
+        self.requests += 1  # approximate under concurrency; it is only a statistic
+        if elapsed < self.threshold:
+            return
+
+        with self._lock:
+            self.slow += 1
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens < 1:
+                self.suppressed += 1
+                self._suppressed_since_report += 1
+                return
+            self._tokens -= 1
+            suppressed, self._suppressed_since_report = self._suppressed_since_report, 0
+
+        report = self._report(trace, elapsed, suppressed)
+        with self._lock:
+            self._reports.append(report)
+        phases = report["phases"]
+        logger.warning(
+            "Slow M-PESA request %s %s took %.0f ms (token %.0f, slot wait %.0f, send %.0f, parse %.0f ms)",
+            trace.method, trace.url, report["elapsed_ms"],
+            phases["token_ms"], phases["slot_wait_ms"], phases["send_ms"], phases["parse_ms"]
+        )
+
+    def _report(self, trace: RequestTrace, elapsed: float, suppressed: int) -> Dict[str, Any]:
+        phases = {f"{phase}_ms": round(trace.phases.get(phase, 0.0) * 1000, 3) for phase in PHASES}
+        phases["other_ms"] = round(max(0.0, elapsed - sum(trace.phases.values())) * 1000, 3)
+        with self._lock:
+            samples, sample_count = list(trace.samples.items()), trace.sample_count
+        ranked = sorted(samples, key=lambda item: item[1], reverse=True)[:self.max_stacks]
+        return {
+            "timestamp": time.time(),
+            "method": trace.method,
+            "url": trace.url,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "phases": phases,
+            "attempts": trace.attempts,
+            "status": trace.status,
+            "error": trace.error,
+            "suppressed_before": suppressed,
+            "samples": sample_count,
+            "stacks": [
+                {"phase": phase, "count": count, "frames": list(frames)}
+                for (phase, frames), count in ranked
+            ],
+        }
+
+    def _start_sampler(self) -> None:
+        with self._lock:
+            if self._sampler is not None:
+                return
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="mpesa-stack-sampler", daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            self._sample_once()
+
+    def _sample_once(self) -> None:
+        """Take one stack sample of every request in flight past ``sample_after``"""
+        now = time.perf_counter()
+        with self._lock:
+            due = [trace for trace in self._in_flight.values()
+                   if now - trace.started >= self.sample_after and trace.sample_count < self.max_samples]
+        if not due:
+            return
+        # Walk the stacks outside the lock; record them under it, skipping requests that finished meanwhile
+        frames = sys._current_frames()
+        taken = []
+        for trace in due:
+            frame = frames.get(trace.thread_id)
+            if frame is not None:
+                taken.append((trace, (trace.phase, _stack(frame, self.stack_depth))))
+        del frames  # don't keep other threads' frames alive
+        with self._lock:
+            for trace, key in taken:
+                if not trace.finished:
+                    trace.samples[key] = trace.samples.get(key, 0) + 1
+                    trace.sample_count += 1
+
+    def dump(self, path: Optional[str] = None, clear: bool = False) -> List[Dict[str, Any]]:
+        """
+        Reports in the ring buffer, oldest first
+
+        Args:
+            path (str, optional): Also write them to this file, one JSON object per line
+            clear (bool): Empty the buffer afterwards
+
+        Returns:
+            list of dict: The reports
+        """
+        with self._lock:
+            reports = list(self._reports)
+            if clear:
+                self._reports.clear()
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                for report in reports:
+                    f.write(json.dumps(report) + "\n")
+        return reports
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests seen, slow requests, reports suppressed by the rate limit and reports buffered"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "slow": self.slow,
+                "suppressed": self.suppressed,
+                "buffered": len(self._reports),
+                "in_flight_sampled": len(self._in_flight),
+            }
+
+    def close(self) -> None:
+        """Stop the stack sampler thread, if running"""
+        self._stop.set()
+        sampler, self._sampler = self._sampler, None
+        if sampler is not None:
+            sampler.join()
@@ -12,11 +12,20 @@ class AuthenticationError(MPESAError):
 
 class APIError(MPESAError):
     """Raised when an API request fails"""
-    def __init__(self, message: str, response_code: str = None, response_description: str = None):
+    def __init__(self, message: str, response_code: str = None, response_description: str = None, status_code: int = None):
         self.response_code = response_code
         self.response_description = response_description
+        self.status_code = status_code
         super().__init__(message)
 
 class ValidationError(MPESAError):
     """Raised when request validation fails"""
     pass
+
+class DeadlineExceededError(MPESAError):
+    """Raised when a call's deadline expires before it could complete"""
+    pass
+
+class SinkFullError(MPESAError):
+    """Raised when an event sink's buffer stays full past the backpressure timeout"""
+    pass
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+from .deadline import current_deadline
+from .exceptions import APIError, DeadlineExceededError
+
+T = TypeVar("T")
+
+
+class _LatencyWindow:
+    """Sliding window of recent latencies for one operation"""
+
+    __slots__ = ("samples", "_sorted", "_dirty")
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self._sorted: list = []
+        self._dirty = False
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+        self._dirty = True
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        if self._dirty:
+            self._sorted = sorted(self.samples)
+            self._dirty = False
+        index = min(len(self._sorted) - 1, int(pct / 100.0 * len(self._sorted)))
+        return self._sorted[index]
+
+
+class RequestHedger:
+    """
+    Hedged requests for idempotent operations
+
+    Runs an attempt and, if it hasn't completed after the operation's observed
+    latency percentile, fires a second identical attempt and returns whichever
+    responds first. Extra load is capped by a token budget: every primary
+    attempt earns ``max_extra_load`` tokens and every hedge spends one, so at
+    most that fraction of requests is ever duplicated.
+
+    The losing attempt is not interrupted (requests cannot be cancelled
+    mid-flight); its result is discarded. Only hedge operations the server
+    treats idempotently.
+
+    Args:
+        percentile (float): Latency percentile used as the hedge delay (default: 95)
+        initial_delay (float): Hedge delay used until enough samples are collected
+        min_delay (float): Lower bound for the hedge delay in seconds
+        max_delay (float): Upper bound for the hedge delay in seconds
+        max_extra_load (float): Maximum fraction of requests that may be hedged
+        window (int): Number of recent latencies kept per operation
+        min_samples (int): Samples required before the percentile is trusted
+        max_workers (int): Threads available for running attempts
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.01,
+        max_delay: float = 5.0,
+        max_extra_load: float = 0.05,
+        window: int = 512,
+        min_samples: int = 20,
+        max_workers: int = 16
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        if not 0 <= max_extra_load <= 1:
+            raise ValueError("max_extra_load must be between 0 and 1")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_extra_load = max_extra_load
+        self.window = window
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._windows: Dict[str, _LatencyWindow] = {}
+        self._budget = 0.0
+        self._budget_cap = max(1.0, max_extra_load * 100)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="mpesa-hedge"
+                    )
+        return self._executor
+
+    def hedge_delay(self, operation: str) -> float:
+        """Current delay before a hedge is sent for an operation"""
+        with self._lock:
+            window = self._windows.get(operation)
+            if window is None or len(window.samples) < self.min_samples:
+                delay = self.initial_delay
+            else:
+                delay = window.percentile(self.percentile)
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def _record(self, operation: str, latency: float) -> None:
+        with self._lock:
+            window = self._windows.get(operation)
+            if window is None:
+                window = self._windows[operation] = _LatencyWindow(self.window)
+            window.add(latency)
+
+    def _earn_budget(self) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._budget = min(self._budget_cap, self._budget + self.max_extra_load)
+
+    def _spend_budget(self) -> bool:
+        with self._lock:
+            if self._budget >= 1.0:
+                self._budget -= 1.0
+                self._stats["hedges"] += 1
+                return True
+            self._stats["budget_denied"] += 1
+            return False
+
+    def _submit(self, operation: str, fn: Callable[[], T]) -> Future:
+        def attempt():
+            start = time.monotonic()
+            result = fn()
+            self._record(operation, time.monotonic() - start)
+            return result
+
+        # Each attempt runs in its own copy of the caller's context so the
+        # active deadline applies to it as well
+        return self._pool().submit(copy_context().run, attempt)
+
+    def run(self, operation: str, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` with hedging and return the first response
+
+        Transport failures of one attempt are ignored while the other is still
+        running; an APIError is a real response from the server and is raised
+        as soon as it arrives.
+
+        Args:
+            operation (str): Name used to track latency separately per endpoint
+            fn (callable): Zero-argument callable performing one attempt
+
+        Returns:
+            The result of whichever attempt completed first
+        """
+        self._earn_budget()
+        deadline = current_deadline()
+
+        primary = self._submit(operation, fn)
+        delay = self.hedge_delay(operation)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline.remaining()))
+        done, _ = wait([primary], timeout=delay)
+
+        pending = {primary}
+        hedge = None
+        if not done and self._spend_budget():
+            hedge = self._submit(operation, fn)
+            pending.add(hedge)
+
+        error: Optional[BaseException] = None
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline.remaining())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceededError(f"Deadline exceeded waiting for hedged {operation}")
+            for future in done:
+                exc = future.exception()
+                if exc is None or isinstance(exc, APIError):
+                    if future is hedge:
+                        with self._lock:
+                            self._stats["hedge_wins"] += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = exc
+
+        # Every attempt failed without a response: surface the last failure
+        raise error
+
+    def stats(self) -> Dict[str, object]:
+        """Counters and current hedge delays per operation"""
+        with self._lock:
+            stats: Dict[str, object] = dict(self._stats)
+            operations = list(self._windows)
+        stats["delays"] = {op: self.hedge_delay(op) for op in operations}
+        return stats
+
+    def close(self) -> None:
+        """Shut down the attempt thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextvars import copy_context
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from .exceptions import MPESAError
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+BACKGROUND = "background"
+
+
+class Lane:
+    """
+    Named priority lane
+
+    Args:
+        name (str): Lane name used when submitting work
+        weight (float): Share of worker time under contention, relative to other lanes
+        reserved (int): Workers kept free for this lane even when other lanes are backlogged
+        max_queue (int, optional): Queued jobs allowed before submissions are rejected
+    """
+
+    __slots__ = ("name", "weight", "reserved", "max_queue", "queue", "running", "vtime",
+                 "waits", "submitted", "completed", "failed", "rejected")
+
+    def __init__(self, name: str, weight: float = 1.0, reserved: int = 0, max_queue: Optional[int] = None):
+        if weight <= 0:
+            raise ValueError("Lane weight must be positive")
+        if reserved < 0:
+            raise ValueError("Lane reserved capacity must not be negative")
+        self.name = name
+        self.weight = weight
+        self.reserved = reserved
+        self.max_queue = max_queue
+        self.queue: Deque[tuple] = deque()
+        self.running = 0
+        self.vtime = 0.0
+        self.waits: Deque[float] = deque(maxlen=1024)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+
+def default_lanes() -> List[Lane]:
+    """interactive (weight 8, 2 reserved workers), bulk (weight 2), background (weight 1)"""
+    return [Lane(INTERACTIVE, weight=8, reserved=2), Lane(BULK, weight=2), Lane(BACKGROUND, weight=1)]
+
+
+class LaneScheduler:
+    """
+    Worker pool that shares its threads between priority lanes
+
+    Jobs are dispatched by weighted fair queuing: every lane has a virtual
+    clock advanced by ``1 / weight`` per job it starts, and an idle worker
+    always takes the next job from the backlogged lane with the smallest
+    virtual time. A lane with ``reserved`` capacity is guaranteed that many
+    workers: other lanes never occupy them, so a payroll batch in ``bulk``
+    cannot delay an STK Push in ``interactive`` beyond the jobs already
+    running on the reserved workers.
+
+    Args:
+        workers (int): Worker threads (default: 8)
+        lanes (iterable of Lane, optional): Lane definitions (default: default_lanes())
+    """
+
+    def __init__(self, workers: int = 8, lanes: Optional[Iterable[Lane]] = None):
+        self.lanes: Dict[str, Lane] = {lane.name: lane for lane in (lanes or default_lanes())}
+        total_reserved = sum(lane.reserved for lane in self.lanes.values())
+        if workers <= total_reserved:
+            raise ValueError(f"workers ({workers}) must exceed the total reserved capacity ({total_reserved})")
+        self.workers = workers
+        self._condition = threading.Condition()
+        self._running = 0
+        self._vclock = 0.0
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"mpesa-lane-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue ``fn(*args, **kwargs)`` on a lane
+
+        The caller's context variables (e.g. the active deadline) are carried
+        into the worker.
+
+        Returns:
+            Future: Resolves with the call's result or exception
+        """
+        future: Future = Future()
+        context = copy_context()
+        with self._condition:
+            if self._closed:
+                raise MPESAError("Scheduler is closed")
+            state = self.lanes.get(lane)
+            if state is None:
+                raise ValueError(f"Unknown lane: {lane!r}")
+            if state.max_queue is not None and len(state.queue) >= state.max_queue:
+                state.rejected += 1
+                raise MPESAError(f"Lane {lane!r} is full ({state.max_queue} queued jobs)")
+            if not state.queue and state.running == 0:
+                # An idle lane rejoins at the current virtual time instead of its old backlog credit
+                state.vtime = max(state.vtime, self._vclock)
+            state.queue.append((future, context, fn, args, kwargs, time.monotonic()))
+            state.submitted += 1
+            self._condition.notify()
+        return future
+
+    def _unused_reserve(self, excluding: Lane) -> int:
+        return sum(
+            max(0, lane.reserved - lane.running)
+            for lane in self.lanes.values() if lane is not excluding
+        )
+
+    def _next_lane(self) -> Optional[Lane]:
+        """Backlogged lane with the smallest virtual time that may use a free worker"""
+        best = None
+        for lane in self.lanes.values():
+            if not lane.queue:
+                continue
+            if self._running + self._unused_reserve(lane) >= self.workers:
+                continue
+            if best is None or lane.vtime < best.vtime:
+                best = lane
+        return best
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                lane = self._next_lane()
+                while lane is None:
+                    if self._closed and not any(l.queue for l in self.lanes.values()):
+                        return
+                    self._condition.wait()
+                    lane = self._next_lane()
+                future, context, fn, args, kwargs, queued_at = lane.queue.popleft()
+                self._vclock = lane.vtime
+                lane.vtime += 1.0 / lane.weight
+                lane.running += 1
+                self._running += 1
+                lane.waits.append(time.monotonic() - queued_at)
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = context.run(fn, *args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                    failed = True
+                else:
+                    future.set_result(result)
+                    failed = False
+            else:
+                failed = False
+
+            with self._condition:
+                lane.running -= 1
+                self._running -= 1
+                if failed:
+                    lane.failed += 1
+                else:
+                    lane.completed += 1
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, running jobs, counters and wait times (ms) per lane"""
+        with self._condition:
+            stats = {}
+            for lane in self.lanes.values():
+                waits = sorted(lane.waits)
+                entry: Dict[str, Any] = {
+                    "queued": len(lane.queue),
+                    "running": lane.running,
+                    "submitted": lane.submitted,
+                    "completed": lane.completed,
+                    "failed": lane.failed,
+                    "rejected": lane.rejected,
+                    "weight": lane.weight,
+                    "reserved": lane.reserved,
+                }
+                if waits:
+                    entry["wait_p50_ms"] = waits[len(waits) // 2] * 1000
+                    entry["wait_p95_ms"] = waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000
+                    entry["wait_max_ms"] = waits[-1] * 1000
+                stats[lane.name] = entry
+            return stats
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting work; queued jobs still run. Blocks until done when ``wait``"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,339 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .sinks import Event, EventSink, callback_event
+from .utils import validate_phone_number
+
+_PREFIX = "mpesa_ledger_"
+
+_COLUMNS = (
+    "kind", "merchant_request_id", "checkout_request_id", "conversation_id",
+    "originator_conversation_id", "transaction_id", "phone", "amount",
+    "result_code", "result_desc", "created_at", "payload",
+)
+
+# Indexed lookup columns accepted by find()/latest()
+LOOKUP_FIELDS = (
+    "merchant_request_id", "checkout_request_id", "conversation_id",
+    "originator_conversation_id", "transaction_id", "phone",
+)
+
+
+def _normalize_phone(phone: Any) -> Optional[str]:
+    if phone in (None, ""):
+        return None
+    try:
+        return validate_phone_number(str(phone))
+    except ValueError:
+        return str(phone)
+
+
+def _callback_fields(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """Pull the identifiers out of an STK callback, B2C result or C2B confirmation body"""
+    body = payload.get("Body")
+    if isinstance(body, Mapping) and isinstance(body.get("stkCallback"), Mapping):
+        stk = body["stkCallback"]
+        fields = {
+            "kind": "stk_callback",
+            "MerchantRequestID": stk.get("MerchantRequestID"),
+            "CheckoutRequestID": stk.get("CheckoutRequestID"),
+            "ResultCode": stk.get("ResultCode"),
+            "ResultDesc": stk.get("ResultDesc"),
+        }
+        items = (stk.get("CallbackMetadata") or {}).get("Item") or []
+        for item in items:
+            name = item.get("Name")
+            if name == "PhoneNumber":
+                fields["PhoneNumber"] = item.get("Value")
+            elif name == "Amount":
+                fields["Amount"] = item.get("Value")
+            elif name == "MpesaReceiptNumber":
+                fields["TransactionID"] = item.get("Value")
+        return fields
+
+    result = payload.get("Result")
+    if isinstance(result, Mapping):
+        fields = {
+            "kind": "b2c_result",
+            "ConversationID": result.get("ConversationID"),
+            "OriginatorConversationID": result.get("OriginatorConversationID"),
+            "TransactionID": result.get("TransactionID"),
+            "ResultCode": result.get("ResultCode"),
+            "ResultDesc": result.get("ResultDesc"),
+        }
+        params = (result.get("ResultParameters") or {}).get("ResultParameter") or []
+        for param in params:
+            if param.get("Key") == "TransactionAmount":
+                fields["Amount"] = param.get("Value")
+            elif param.get("Key") == "ReceiverPartyPublicName":
+                # "2547XXXXXXXX - Jane Doe"
+                fields["PhoneNumber"] = str(param.get("Value", "")).split(" - ")[0]
+        return fields
+
+    return {
+        "kind": "c2b_confirmation",
+        "TransactionID": payload.get("TransID"),
+        "PhoneNumber": payload.get("MSISDN"),
+        "Amount": payload.get("TransAmount"),
+    }
+
+
+def _row(event: Event) -> tuple:
+    payload = event.payload
+    fields = _callback_fields(payload) if event.kind == "callback" else payload
+    kind = fields.get("kind", event.kind) if event.kind == "callback" else event.kind
+    phone = fields.get("PhoneNumber") or fields.get("PartyB") or fields.get("MSISDN")
+    amount = fields.get("Amount", fields.get("TransAmount"))
+    result_code = fields.get("ResultCode", fields.get("ResponseCode"))
+    result_desc = fields.get("ResultDesc", fields.get("ResponseDescription"))
+    return (
+        kind,
+        fields.get("MerchantRequestID"),
+        fields.get("CheckoutRequestID"),
+        fields.get("ConversationID"),
+        fields.get("OriginatorConversationID"),
+        fields.get("TransactionID"),
+        _normalize_phone(phone),
+        None if amount is None else str(amount),
+        None if result_code is None else str(result_code),
+        result_desc,
+        event.created_at,
+        json.dumps(payload, separators=(",", ":"), default=str),
+    )
+
+
+class TransactionLedger(EventSink):
+    """
+    Local, indexed record of submitted transactions and their callbacks
+
+    Rows live in one SQLite table per calendar month (UTC), so old months can
+    be dropped instantly and time-bounded queries only touch the partitions
+    they overlap. Every partition is indexed on the request/conversation IDs,
+    phone number and timestamp, so lookups stay in the millisecond range.
+    Callbacks are appended as their own rows rather than updating the
+    submission, which keeps writes append-only; ``latest()`` returns the
+    newest row for an identifier.
+
+    The ledger is an EventSink: pass it as ``ledger=`` to MPESAClient, or wrap
+    it in a BatchingWriter for high-volume bursts.
+
+    Args:
+        path (str): SQLite database file (":memory:" for tests)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._partitions = set(self._list_partitions())
+
+    def _list_partitions(self) -> List[str]:
+        rows = self._db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ? ORDER BY name",
+            (_PREFIX + "%",)
+        ).fetchall()
+        return [name for (name,) in rows]
+
+    @staticmethod
+    def partition_for(timestamp: float) -> str:
+        """Table name of the monthly partition holding ``timestamp``"""
+        return _PREFIX + time.strftime("%Y%m", time.gmtime(timestamp))
+
+    def _ensure_partition(self, table: str) -> None:
+        if table in self._partitions:
+            return
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, "
+            "merchant_request_id TEXT, checkout_request_id TEXT, conversation_id TEXT, "
+            "originator_conversation_id TEXT, transaction_id TEXT, phone TEXT, amount TEXT, "
+            "result_code TEXT, result_desc TEXT, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        for column in LOOKUP_FIELDS:
+            index_columns = "phone, created_at" if column == "phone" else column
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({index_columns}) WHERE {column} IS NOT NULL"
+            )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+        self._partitions.add(table)
+
+    def write_batch(self, events: Sequence[Event]) -> None:
+        by_partition: Dict[str, List[tuple]] = {}
+        for event in events:
+            by_partition.setdefault(self.partition_for(event.created_at), []).append(_row(event))
+
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._db:
+            for table, rows in by_partition.items():
+                self._ensure_partition(table)
+                self._db.executemany(
+                    f"INSERT INTO {table} ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows
+                )
+
+    def record_callback(self, payload: Mapping[str, Any]) -> None:
+        """Append an STK callback, B2C result or C2B confirmation body"""
+        self.emit(callback_event(payload))
+
+    def _partitions_between(self, since: Optional[float], until: Optional[float]) -> List[str]:
+        """Partitions overlapping the time range, oldest first; the caller holds ``self._lock``"""
+        low = self.partition_for(since) if since is not None else None
+        high = self.partition_for(until) if until is not None else None
+        return [
+            table for table in sorted(self._partitions)
+            if (low is None or table >= low) and (high is None or table <= high)
+        ]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["payload"] = json.loads(record["payload"])
+        return record
+
+    def _query(
+        self,
+        filters: Mapping[str, Any],
+        since: Optional[float],
+        until: Optional[float],
+        kind: Optional[str],
+        newest_first: bool,
+        limit: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        unknown = set(filters) - set(LOOKUP_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported lookup fields: {', '.join(sorted(unknown))}")
+
+        conditions, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(_normalize_phone(value) if column == "phone" else str(value))
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if newest_first else "ASC"
+
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            self._db.row_factory = sqlite3.Row
+            try:
+                partitions = self._partitions_between(since, until)
+                for table in (reversed(partitions) if newest_first else partitions):
+                    sql = f"SELECT * FROM {table}{where} ORDER BY created_at {order}, id {order}"
+                    if limit is not None:
+                        sql += f" LIMIT {int(limit) - len(results)}"
+                    results.extend(self._to_dict(row) for row in self._db.execute(sql, params))
+                    if limit is not None and len(results) >= limit:
+                        break
+            finally:
+                self._db.row_factory = None
+        return results
+
+    def find(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+        **ids: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Rows matching every given identifier, oldest first
+
+        Args:
+            since (float, optional): Unix timestamp lower bound (inclusive)
+            until (float, optional): Unix timestamp upper bound (exclusive)
+            kind (str, optional): Row kind such as "stk_push" or "b2c_result"
+            limit (int, optional): Maximum number of rows
+            **ids: Any of merchant_request_id, checkout_request_id, conversation_id,
+                originator_conversation_id, transaction_id, phone
+
+        Returns:
+            list: Rows as dicts with the decoded ``payload``
+        """
+        return self._query(ids, since, until, kind, newest_first=False, limit=limit)
+
+    def latest(self, **ids: Any) -> Optional[Dict[str, Any]]:
+        """Newest row for an identifier, e.g. ``latest(originator_conversation_id=...)``"""
+        rows = self._query(ids, None, None, None, newest_first=True, limit=1)
+        return rows[0] if rows else None
+
+    def for_phone(self, phone: str, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """All rows for a phone number within a time range"""
+        return self.find(since=since, until=until, phone=phone)
+
+    def export(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        kind: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream rows in time order without loading them all into memory
+
+        File-backed ledgers read through a separate connection, so an export
+        does not block concurrent writes. In-memory ledgers share a single
+        connection, so each partition is read in full under the ledger lock.
+        """
+        reader = self._db if self.path == ":memory:" else sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            conditions, params = [], []
+            if kind is not None:
+                conditions.append("kind = ?")
+                params.append(kind)
+            if since is not None:
+                conditions.append("created_at >= ?")
+                params.append(since)
+            if until is not None:
+                conditions.append("created_at < ?")
+                params.append(until)
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            columns = ("id",) + _COLUMNS
+            with self._lock:
+                # Snapshot: writers add partitions under the lock while this export runs
+                partitions = self._partitions_between(since, until)
+
+            for table in partitions:
+                query = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY created_at, id"
+                if reader is self._db:
+                    with self._lock:
+                        if table not in self._partitions:
+                            continue  # dropped since the snapshot
+                        batches = [reader.execute(query, params).fetchall()]
+                else:
+                    cursor = reader.execute(query, params)
+                    batches = iter(lambda: cursor.fetchmany(batch_size), [])
+                for rows in batches:
+                    for row in rows:
+                        record = dict(zip(columns, row))
+                        record["payload"] = json.loads(record["payload"])
+                        yield record
+        finally:
+            if reader is not self._db:
+                reader.close()
+
+    def drop_before(self, timestamp: float) -> List[str]:
+        """Drop whole monthly partitions older than the month containing ``timestamp``"""
+        cutoff = self.partition_for(timestamp)
+        with self._lock, self._db:
+            dropped = [table for table in sorted(self._partitions) if table < cutoff]
+            for table in dropped:
+                self._db.execute(f"DROP TABLE {table}")
+                self._partitions.discard(table)
+        return dropped
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,7 +1,12 @@
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+class AccessTokenResponse(BaseModel):
+    """OAuth access token response model"""
+    access_token: str = Field(min_length=1)
+    expires_in: int = 3600
+
 class Parameter(BaseModel):
     """Key-value parameter model"""
     Key: str
@@ -49,6 +54,22 @@ class STKPushResponse(BaseModel):
     ResponseDescription: str
     CustomerMessage: str
 
+class STKPushQueryRequest(BaseModel):
+    """STK Push status query request model"""
+    BusinessShortCode: str
+    Password: str
+    Timestamp: str
+    CheckoutRequestID: str
+
+class STKPushQueryResponse(BaseModel):
+    """STK Push status query response model"""
+    ResponseCode: str
+    ResponseDescription: str
+    MerchantRequestID: Optional[str] = None
+    CheckoutRequestID: Optional[str] = None
+    ResultCode: Optional[str] = None
+    ResultDesc: Optional[str] = None
+
 class C2BRegisterURLRequest(BaseModel):
     """C2B URL registration request model"""
     ShortCode: str
@@ -57,6 +78,24 @@ class C2BRegisterURLRequest(BaseModel):
     ConfirmationURL: str
     ValidationURL: str
 
+class C2BConfirmation(BaseModel):
+    """C2B confirmation/validation callback payload posted to the registered URLs"""
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    TransactionType: Optional[str] = None
+    TransID: str
+    TransTime: Optional[str] = None
+    TransAmount: str
+    BusinessShortCode: Optional[str] = None
+    BillRefNumber: Optional[str] = None
+    InvoiceNumber: Optional[str] = None
+    OrgAccountBalance: Optional[str] = None
+    ThirdPartyTransID: Optional[str] = None
+    MSISDN: Optional[str] = None
+    FirstName: Optional[str] = None
+    MiddleName: Optional[str] = None
+    LastName: Optional[str] = None
+
 class C2BPaymentRequest(BaseModel):
     """C2B payment request model"""
     RequestRefID: str
@@ -0,0 +1,247 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .client import MPESAClient
+from .config import Configuration, FrozenConfiguration
+from .exceptions import MPESAError
+from .utils import logger
+
+
+def _normalize_base_url(base_url: Any) -> str:
+    """Comparable form of a base URL (pydantic adds a trailing slash to HttpUrl)"""
+    return str(base_url).rstrip("/")
+
+
+class ClientPool:
+    """
+    Registry of MPESAClient instances cached per tenant
+
+    A tenant is identified by its validated, frozen configuration, so two
+    calls that differ in any setting (timeout, passkey, ...) get separate
+    clients. ``get()`` remembers the configuration built for each set of
+    arguments, so configurations are validated and clients built only on a
+    cache miss and access tokens stay warm for as long as the tenant stays in
+    the pool.
+    Tenants hitting the same base URL share one ``requests.Session`` and
+    therefore one connection pool.
+
+    Args:
+        max_tenants (int): Maximum cached clients before least-recently-used eviction
+        pool_maxsize (int): Connections kept per host in each shared session
+        defaults (dict, optional): Configuration fields applied to every tenant
+    """
+
+    def __init__(
+        self,
+        max_tenants: int = 1000,
+        pool_maxsize: int = 50,
+        defaults: Optional[Dict[str, Any]] = None
+    ):
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1")
+        self.max_tenants = max_tenants
+        self.pool_maxsize = pool_maxsize
+        self.defaults = dict(defaults or {})
+
+        self._clients: "OrderedDict[FrozenConfiguration, MPESAClient]" = OrderedDict()
+        self._configs: "OrderedDict[Hashable, FrozenConfiguration]" = OrderedDict()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.RLock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_refresher = threading.Event()
+
+    @staticmethod
+    def _arguments_key(
+        consumer_key: str,
+        consumer_secret: str,
+        shortcode: Optional[str],
+        overrides: Dict[str, Any]
+    ) -> Optional[Tuple]:
+        """Hashable form of ``get()`` arguments, or None if an override is unhashable"""
+        key = (
+            consumer_key,
+            consumer_secret,
+            shortcode,
+            tuple(sorted(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in overrides.items()
+            )),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _session_for(self, base_url: str) -> requests.Session:
+        """Shared session (and connection pool) for a base URL"""
+        session = self._sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._sessions[base_url] = session
+        return session
+
+    def _client_for(self, key: FrozenConfiguration, config: Configuration) -> MPESAClient:
+        """Cached client for a frozen configuration, created from ``config`` on a miss"""
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            self._hits += 1
+            return client
+
+        self._misses += 1
+        client = MPESAClient(config, session=self._session_for(_normalize_base_url(key.base_url)))
+        self._clients[key] = client
+        while len(self._clients) > self.max_tenants:
+            evicted_key, _ = self._clients.popitem(last=False)
+            self._forget(evicted_key)
+            self._evictions += 1
+            logger.debug("Evicted M-PESA client for shortcode %s", evicted_key.shortcode)
+        return client
+
+    def _forget(self, config: FrozenConfiguration) -> None:
+        """Drop remembered ``get()`` arguments that resolve to an evicted configuration"""
+        for arguments in [arguments for arguments, known in self._configs.items() if known == config]:
+            del self._configs[arguments]
+
+    def get(
+        self,
+        consumer_key: str,
+        consumer_secret: str,
+        shortcode: Optional[str] = None,
+        **overrides: Any
+    ) -> MPESAClient:
+        """
+        Get the cached client for a tenant, creating it on first use
+
+        Args:
+            consumer_key (str): Tenant consumer key
+            consumer_secret (str): Tenant consumer secret
+            shortcode (str, optional): Tenant business shortcode
+            **overrides: Extra Configuration fields; different overrides give a different client
+
+        Returns:
+            MPESAClient: Client bound to the tenant's credentials
+        """
+        arguments = self._arguments_key(consumer_key, consumer_secret, shortcode, overrides)
+
+        with self._lock:
+            config = self._configs.get(arguments) if arguments is not None else None
+            if config is None:
+                fields = dict(self.defaults)
+                fields.update(overrides)
+                fields.update(consumer_key=consumer_key, consumer_secret=consumer_secret)
+                if shortcode is not None:
+                    fields["shortcode"] = shortcode
+                config = FrozenConfiguration(**fields)
+                if arguments is not None:
+                    self._configs[arguments] = config
+                    while len(self._configs) > self.max_tenants:
+                        self._configs.popitem(last=False)
+            elif arguments is not None:
+                self._configs.move_to_end(arguments)
+            return self._client_for(config, config)
+
+    def get_for_config(self, config: Configuration, shortcode: Optional[str] = None) -> MPESAClient:
+        """Get the cached client for an already-built Configuration (and optional shortcode)"""
+        if shortcode is not None and shortcode != config.shortcode:
+            config = config.model_copy(update={"shortcode": shortcode})
+        with self._lock:
+            return self._client_for(config.freeze(), config)
+
+    def evict(self, consumer_key: str, shortcode: Optional[str] = None) -> int:
+        """Drop every cached client for a consumer key (and shortcode, if given)"""
+        with self._lock:
+            keys = [
+                key for key in self._clients
+                if key.consumer_key == consumer_key and (shortcode is None or key.shortcode == shortcode)
+            ]
+            for key in keys:
+                del self._clients[key]
+                self._forget(key)
+            self._evictions += len(keys)
+            return len(keys)
+
+    def refresh_tokens(self, within_seconds: float = 120) -> int:
+        """
+        Refresh tokens that expire within the given window
+
+        Args:
+            within_seconds (float): Refresh tokens with less than this many seconds left
+
+        Returns:
+            int: Number of tokens refreshed
+        """
+        with self._lock:
+            clients: List[MPESAClient] = list(self._clients.values())
+
+        refreshed = 0
+        for client in clients:
+            try:
+                if client.auth.refresh_if_expiring(within_seconds):
+                    refreshed += 1
+            except MPESAError as e:
+                logger.warning("Token refresh failed for shortcode %s: %s", client.config.shortcode, e)
+        return refreshed
+
+    def start_token_refresher(self, interval: float = 30, within_seconds: float = 120) -> None:
+        """Keep tenant tokens warm from a background daemon thread"""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._stop_refresher.clear()
+
+        def run():
+            while not self._stop_refresher.wait(interval):
+                self.refresh_tokens(within_seconds)
+
+        self._refresher = threading.Thread(target=run, name="mpesa-token-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_token_refresher(self) -> None:
+        """Stop the background token refresher"""
+        self._stop_refresher.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for monitoring"""
+        with self._lock:
+            return {
+                "tenants": len(self._clients),
+                "sessions": len(self._sessions),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+    def close(self) -> None:
+        """Stop background work, drop cached clients and close shared sessions"""
+        self.stop_token_refresher()
+        with self._lock:
+            self._clients.clear()
+            self._configs.clear()
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,188 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from .models import B2CRequest, STKPushRequest
+from .utils import format_timestamp, generate_password, validate_phone_number
+
+_MODELS = {"b2c": B2CRequest, "stk_push": STKPushRequest}
+# Phone number fields normalised to the 251XXXXXXXXX format
+_PHONE_FIELDS = {"b2c": ("PartyB",), "stk_push": ("PhoneNumber", "PartyA")}
+# Request fields recorded with the transaction event (as the regular client methods do)
+_SUMMARY_FIELDS = {"b2c": ("Amount", "PartyB", "CommandID"), "stk_push": ("Amount", "PhoneNumber", "AccountReference")}
+# Seconds an STK Push Timestamp/Password may age before send_prepared() refuses it without a passkey
+STK_TIMESTAMP_MAX_AGE = 300
+
+
+class PreparedRequest(NamedTuple):
+    """
+    A validated request body ready to send with ``MPESAClient.send_prepared()``
+
+    ``body`` is the compact JSON encoding of the request; on failure it is
+    None and ``error`` says why the row was rejected. ``timestamp`` is the
+    STK Push ``Timestamp`` in the body (None for B2C).
+    """
+    index: int
+    kind: str
+    body: Optional[bytes]
+    summary: Dict[str, Any]
+    error: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def age(self) -> Optional[float]:
+        """Seconds since the STK Push ``Timestamp`` (None without one)"""
+        if self.timestamp is None:
+            return None
+        return (datetime.now() - datetime.strptime(self.timestamp, "%Y%m%d%H%M%S")).total_seconds()
+
+
+def refresh_password(prepared: PreparedRequest, passkey: str) -> PreparedRequest:
+    """
+    Re-stamp a prepared STK Push body with the current ``Timestamp`` and its ``Password``
+
+    Safaricom rejects stale timestamps, so long-running batches call this
+    (through ``send_prepared(passkey=...)``) at send time.
+    """
+    body = json.loads(prepared.body)
+    timestamp = format_timestamp()
+    body["Timestamp"] = timestamp
+    body["Password"] = generate_password(str(body["BusinessShortCode"]), passkey, timestamp)
+    return prepared._replace(body=json.dumps(body, separators=(",", ":")).encode(), timestamp=timestamp)
+
+
+def _prepare_chunk(
+    kind: str,
+    start: int,
+    rows: List[Dict[str, Any]],
+    defaults: Dict[str, Any],
+    passkey: Optional[str],
+    timestamp: str
+) -> List[PreparedRequest]:
+    """Validate and serialise one chunk of rows (runs in a worker process)"""
+    model = _MODELS[kind]
+    passwords: Dict[str, str] = {}
+    prepared = []
+    for offset, row in enumerate(rows):
+        index = start + offset
+        try:
+            fields = {**defaults, **row}
+            for name in _PHONE_FIELDS[kind]:
+                if fields.get(name) is not None:
+                    fields[name] = validate_phone_number(str(fields[name]))
+            if kind == "stk_push" and passkey:
+                shortcode = str(fields["BusinessShortCode"])
+                if shortcode not in passwords:
+                    passwords[shortcode] = generate_password(shortcode, passkey, timestamp)
+                fields["Password"] = passwords[shortcode]
+                fields["Timestamp"] = timestamp
+            request = model(**fields)
+        except (KeyError, TypeError, ValueError, PydanticValidationError) as e:
+            prepared.append(PreparedRequest(index, kind, None, {}, f"{type(e).__name__}: {e}"))
+            continue
+        summary = {name: getattr(request, name) for name in _SUMMARY_FIELDS[kind]}
+        stamp = request.Timestamp if kind == "stk_push" else None
+        prepared.append(PreparedRequest(index, kind, request.model_dump_json().encode(), summary, timestamp=stamp))
+    return prepared
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    iterator = iter(rows)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def prepare_batch(
+    rows: Iterable[Dict[str, Any]],
+    kind: str,
+    defaults: Optional[Dict[str, Any]] = None,
+    passkey: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    ordered: bool = True,
+    executor: Optional[Executor] = None
+) -> Iterator[PreparedRequest]:
+    """
+    Validate and serialise a large batch of requests across processes
+
+    Rows are plain dicts of request fields, merged over ``defaults`` (fields
+    shared by every row, e.g. ``InitiatorName`` or ``ResultURL``). Phone
+    numbers are normalised, STK Push passwords are generated from ``passkey``
+    with one timestamp for the whole batch, and each request is validated
+    with its pydantic model and encoded to compact JSON bytes. That timestamp
+    goes stale on a long run: pass the passkey to ``send_prepared()`` too so
+    it is regenerated at send time.
+
+    Rows are sent to the workers in chunks, and at most two chunks per worker
+    are in flight, so the input can be a generator of any length. Invalid
+    rows come back with ``error`` set instead of stopping the batch.
+
+    Args:
+        rows (iterable of dict): Request fields per row
+        kind (str): "b2c" or "stk_push"
+        defaults (dict, optional): Fields shared by every row
+        passkey (str, optional): Lipa Na M-PESA passkey; fills ``Password``/``Timestamp`` for STK Push
+        workers (int, optional): Worker processes (default: CPU count); 0 prepares in this process
+        chunk_size (int): Rows per task (default: 1000)
+        ordered (bool): Yield in input order (default) or as chunks finish
+        executor (Executor, optional): Existing pool to use instead of a new ProcessPoolExecutor
+
+    Returns:
+        iterator of PreparedRequest: One per row, ``index`` being its position in ``rows``
+    """
+    if kind not in _MODELS:
+        raise ValueError(f"Unsupported request kind: {kind!r}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    defaults = dict(defaults or {})
+    timestamp = format_timestamp()
+    chunks = _chunks(rows, chunk_size)
+
+    if executor is None and workers == 0:
+        for start, chunk in chunks:
+            yield from _prepare_chunk(kind, start, chunk, defaults, passkey, timestamp)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        submit = lambda start, chunk: pool.submit(_prepare_chunk, kind, start, chunk, defaults, passkey, timestamp)
+        window = 2 * workers
+        if ordered:
+            pending: Deque[Future] = deque()
+            for start, chunk in chunks:
+                pending.append(submit(start, chunk))
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            in_flight: Set[Future] = set()
+            for start, chunk in chunks:
+                in_flight.add(submit(start, chunk))
+                if len(in_flight) >= window:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+    finally:
+        if executor is None:
+            # At most one window of chunks is still running if the caller stopped early
+            pool.shutdown(wait=True)
@@ -0,0 +1,319 @@
+from itertools import chain
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Union
+
+from .models import C2BConfirmation
+from .utils import validate_phone_number
+
+# Match statuses reported for each confirmation event
+MATCHED = "matched"        # Payment settled the invoice exactly
+PARTIAL = "partial"        # Payment applied, balance still outstanding
+OVERPAID = "overpaid"      # Payment exceeded the outstanding balance
+DUPLICATE = "duplicate"    # TransID was already processed
+UNMATCHED = "unmatched"    # No open invoice could be identified
+INVALID = "invalid"        # Event amount could not be parsed
+
+
+class Invoice(NamedTuple):
+    """Expected receivable loaded into the reconciliation engine"""
+    invoice_id: str
+    amount: Union[str, int, float, Decimal]
+    bill_ref: Optional[str] = None
+    phone: Optional[str] = None
+
+
+class ReconciliationResult(NamedTuple):
+    """Outcome of matching one C2B confirmation"""
+    status: str
+    trans_id: str
+    invoice_id: Optional[str] = None
+    amount: Optional[Decimal] = None
+    remaining: Optional[Decimal] = None
+    matched_by: Optional[str] = None
+
+
+class _OpenInvoice:
+    __slots__ = ("invoice_id", "bill_ref", "phone", "amount", "paid")
+
+    def __init__(self, invoice_id: str, bill_ref: Optional[str], phone: Optional[str], amount: int):
+        self.invoice_id = invoice_id
+        self.bill_ref = bill_ref
+        self.phone = phone
+        self.amount = amount
+        self.paid = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.amount - self.paid
+
+
+def _to_cents(value: Any) -> int:
+    amount = Decimal(str(value))
+    if not amount.is_finite():
+        raise ValueError(f"Amount is not a finite number: {value}")
+    return int((amount * 100).to_integral_value())
+
+
+def _from_cents(cents: int) -> Decimal:
+    return Decimal(cents) / 100
+
+
+def _normalize_ref(bill_ref: Optional[str]) -> Optional[str]:
+    if not bill_ref:
+        return None
+    ref = bill_ref.strip().upper()
+    return ref or None
+
+
+def _normalize_phone(phone: Optional[str]) -> Optional[str]:
+    if not phone:
+        return None
+    try:
+        return validate_phone_number(str(phone))
+    except ValueError:
+        return None
+
+
+def _index_add(index: Dict[Any, Any], key: Any, invoice_id: str) -> None:
+    # Most keys map to a single invoice, so store a bare id and only upgrade
+    # to an insertion-ordered dict (O(1) removal) on collision
+    existing = index.get(key)
+    if existing is None:
+        index[key] = invoice_id
+    elif isinstance(existing, dict):
+        existing[invoice_id] = None
+    else:
+        index[key] = {existing: None, invoice_id: None}
+
+
+def _index_remove(index: Dict[Any, Any], key: Any, invoice_id: str) -> None:
+    existing = index.get(key)
+    if existing is None:
+        return
+    if isinstance(existing, dict):
+        existing.pop(invoice_id, None)
+        if len(existing) == 1:
+            index[key] = next(iter(existing))
+    elif existing == invoice_id:
+        del index[key]
+
+
+def _index_get(index: Dict[Any, Any], key: Any) -> Iterable[str]:
+    existing = index.get(key)
+    if existing is None:
+        return ()
+    if isinstance(existing, dict):
+        return existing
+    return (existing,)
+
+
+class ReconciliationEngine:
+    """
+    Incremental matcher of C2B confirmations against expected invoices
+
+    Open invoices are held in hash indexes on bill reference, normalized
+    phone number and amount bucket, so each confirmation is matched in O(1)
+    regardless of how many invoices are loaded. Settled invoices are dropped
+    from memory as soon as they are paid, and processed transaction IDs are
+    tracked in a bounded window for duplicate detection.
+
+    Matching order: bill reference, then phone number (preferring an invoice
+    whose balance equals the payment), then a unique open invoice whose
+    balance is within ``amount_tolerance`` of the payment. Balances are
+    bucketed by ``amount_tolerance + 1`` cents so an amount lookup only
+    inspects the neighbouring buckets.
+
+    Args:
+        amount_tolerance (int): Allowed difference in cents for amount-only matches (default: 0)
+        max_tracked_transactions (int): TransIDs remembered for duplicate detection
+    """
+
+    def __init__(self, amount_tolerance: int = 0, max_tracked_transactions: int = 1_000_000):
+        if amount_tolerance < 0:
+            raise ValueError("amount_tolerance must not be negative")
+        self.amount_tolerance = amount_tolerance
+        self.amount_bucket = amount_tolerance + 1
+        self.max_tracked_transactions = max_tracked_transactions
+
+        self._open: Dict[str, _OpenInvoice] = {}
+        self._by_ref: Dict[str, Any] = {}
+        self._by_phone: Dict[str, Any] = {}
+        self._by_bucket: Dict[int, Any] = {}
+        self._seen: Dict[str, None] = {}
+        self._counts: Dict[str, int] = {
+            MATCHED: 0, PARTIAL: 0, OVERPAID: 0, DUPLICATE: 0, UNMATCHED: 0, INVALID: 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def load(self, invoices: Iterable[Union[Invoice, Mapping[str, Any]]]) -> int:
+        """
+        Index expected receivables from any iterable (e.g. a DB cursor or CSV reader)
+
+        Rows may be Invoice tuples or mappings with ``invoice_id``, ``amount``
+        and optional ``bill_ref`` / ``phone`` keys.
+
+        Returns:
+            int: Number of invoices loaded
+        """
+        loaded = 0
+        for row in invoices:
+            if not isinstance(row, Invoice):
+                row = Invoice(
+                    invoice_id=str(row["invoice_id"]),
+                    amount=row["amount"],
+                    bill_ref=row.get("bill_ref"),
+                    phone=row.get("phone"),
+                )
+            self.add_invoice(row)
+            loaded += 1
+        return loaded
+
+    def add_invoice(self, invoice: Invoice) -> None:
+        """Index a single expected receivable (replacing one with the same id)"""
+        if invoice.invoice_id in self._open:
+            self._close(self._open[invoice.invoice_id])
+
+        entry = _OpenInvoice(
+            invoice.invoice_id,
+            _normalize_ref(invoice.bill_ref),
+            _normalize_phone(invoice.phone),
+            _to_cents(invoice.amount),
+        )
+        self._open[entry.invoice_id] = entry
+        if entry.bill_ref:
+            _index_add(self._by_ref, entry.bill_ref, entry.invoice_id)
+        if entry.phone:
+            _index_add(self._by_phone, entry.phone, entry.invoice_id)
+        _index_add(self._by_bucket, entry.remaining // self.amount_bucket, entry.invoice_id)
+
+    def _close(self, entry: _OpenInvoice) -> None:
+        del self._open[entry.invoice_id]
+        if entry.bill_ref:
+            _index_remove(self._by_ref, entry.bill_ref, entry.invoice_id)
+        if entry.phone:
+            _index_remove(self._by_phone, entry.phone, entry.invoice_id)
+        _index_remove(self._by_bucket, entry.remaining // self.amount_bucket, entry.invoice_id)
+
+    def _pick(self, candidates: Iterable[str], amount: int) -> Optional[_OpenInvoice]:
+        """First candidate whose balance equals the amount, else the first candidate"""
+        first = None
+        for invoice_id in candidates:
+            invoice = self._open[invoice_id]
+            if invoice.remaining == amount:
+                return invoice
+            if first is None:
+                first = invoice
+        return first
+
+    def _pick_unique(self, candidates: Iterable[str], amount: int) -> Optional[_OpenInvoice]:
+        """The only candidate within tolerance of the amount (None if none or ambiguous)"""
+        found = None
+        for invoice_id in candidates:
+            invoice = self._open[invoice_id]
+            if abs(invoice.remaining - amount) <= self.amount_tolerance:
+                if found is not None:
+                    return None
+                found = invoice
+        return found
+
+    def _find(self, bill_ref: Optional[str], phone: Optional[str], amount: int):
+        if bill_ref:
+            invoice = self._pick(_index_get(self._by_ref, bill_ref), amount)
+            if invoice is not None:
+                return invoice, "bill_ref"
+        if phone:
+            candidates = _index_get(self._by_phone, phone)
+            if len(candidates) > 1:
+                invoice = self._pick_unique(candidates, amount)
+            else:
+                invoice = self._pick(candidates, amount)
+            if invoice is not None:
+                return invoice, "phone"
+
+        bucket = amount // self.amount_bucket
+        if self.amount_tolerance:
+            candidates = chain.from_iterable(
+                _index_get(self._by_bucket, b) for b in (bucket - 1, bucket, bucket + 1)
+            )
+        else:
+            candidates = _index_get(self._by_bucket, bucket)
+        invoice = self._pick_unique(candidates, amount)
+        if invoice is not None:
+            return invoice, "amount"
+        return None, None
+
+    def _remember(self, trans_id: str) -> None:
+        self._seen[trans_id] = None
+        if len(self._seen) > self.max_tracked_transactions:
+            del self._seen[next(iter(self._seen))]
+
+    def match(self, event: Union[C2BConfirmation, Mapping[str, Any]]) -> ReconciliationResult:
+        """
+        Match one C2B confirmation and apply it to the invoice it pays
+
+        Args:
+            event (C2BConfirmation | dict): Confirmation payload from the ConfirmationURL
+
+        Returns:
+            ReconciliationResult: Status, matched invoice and remaining balance
+        """
+        if not isinstance(event, C2BConfirmation):
+            event = C2BConfirmation.model_validate(event)
+        trans_id = event.TransID
+
+        if trans_id in self._seen:
+            self._counts[DUPLICATE] += 1
+            return ReconciliationResult(DUPLICATE, trans_id)
+
+        try:
+            amount = _to_cents(event.TransAmount)
+        except (InvalidOperation, ValueError):
+            self._counts[INVALID] += 1
+            return ReconciliationResult(INVALID, trans_id)
+
+        self._remember(trans_id)
+        invoice, matched_by = self._find(_normalize_ref(event.BillRefNumber), _normalize_phone(event.MSISDN), amount)
+        if invoice is None:
+            self._counts[UNMATCHED] += 1
+            return ReconciliationResult(UNMATCHED, trans_id, amount=_from_cents(amount))
+
+        _index_remove(self._by_bucket, invoice.remaining // self.amount_bucket, invoice.invoice_id)
+        invoice.paid += amount
+        remaining = invoice.remaining
+
+        if remaining > 0:
+            status = PARTIAL
+            _index_add(self._by_bucket, remaining // self.amount_bucket, invoice.invoice_id)
+        else:
+            status = MATCHED if remaining == 0 else OVERPAID
+            # Settled invoices leave memory (the bucket entry is already gone)
+            self._close(invoice)
+
+        self._counts[status] += 1
+        return ReconciliationResult(
+            status, trans_id, invoice.invoice_id, _from_cents(amount), _from_cents(remaining), matched_by
+        )
+
+    def process(self, events: Iterable[Union[C2BConfirmation, Mapping[str, Any]]]) -> Iterator[ReconciliationResult]:
+        """Match a stream of confirmations, yielding results as they are produced"""
+        for event in events:
+            yield self.match(event)
+
+    def open_invoices(self) -> Iterator[ReconciliationResult]:
+        """Invoices still unpaid or partially paid"""
+        for invoice in list(self._open.values()):
+            yield ReconciliationResult(
+                UNMATCHED if invoice.paid == 0 else PARTIAL,
+                trans_id="",
+                invoice_id=invoice.invoice_id,
+                amount=_from_cents(invoice.paid),
+                remaining=_from_cents(invoice.remaining),
+            )
+
+    def summary(self) -> Dict[str, int]:
+        """Counts per match status plus the number of invoices still open"""
+        summary = dict(self._counts)
+        summary["open_invoices"] = len(self._open)
+        return summary
@@ -0,0 +1,338 @@
+import functools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, TypeVar, Union
+from urllib.parse import urlsplit
+
+from .utils import logger
+
+if TYPE_CHECKING:
+    from .client import MPESAClient
+
+T = TypeVar("T")
+
+# Credentials: replaced outright
+SECRET_FIELDS = frozenset({
+    "Password", "SecurityCredential", "InitiatorPassword", "SecretKey", "access_token",
+    "FirstName", "MiddleName", "LastName", "ReceiverPartyPublicName",
+})
+# Customer identifiers: all but the last three digits masked, keeping the length
+PHONE_FIELDS = frozenset({"PhoneNumber", "MSISDN", "PartyA", "PartyB"})
+
+
+def _mask_phone(value: Any) -> Any:
+    text = str(value)
+    digits = sum(c.isdigit() for c in text)
+    if digits < 9:
+        return value  # a shortcode, not a customer number
+    masked, seen = [], 0
+    for c in text:
+        if c.isdigit():
+            seen += 1
+            masked.append("X" if seen <= digits - 3 else c)
+        else:
+            masked.append(c)
+    return "".join(masked)
+
+
+def redact(value: Any, secret_fields: Iterable[str] = SECRET_FIELDS, phone_fields: Iterable[str] = PHONE_FIELDS) -> Any:
+    """
+    Copy of a request, response or callback body with credentials and customer identifiers removed
+
+    Nested dicts and lists are walked, including the ``{"Name": ..., "Value": ...}``
+    items of callback metadata.
+    """
+    secret_fields = frozenset(secret_fields)
+    phone_fields = frozenset(phone_fields)
+
+    def walk(node: Any) -> Any:
+        if isinstance(node, Mapping):
+            name = node.get("Name") or node.get("Key")
+            redacted = {}
+            for key, item in node.items():
+                if key in secret_fields:
+                    redacted[key] = "***"
+                elif key in phone_fields:
+                    redacted[key] = _mask_phone(item)
+                elif key == "Value" and name in secret_fields:
+                    redacted[key] = "***"
+                elif key == "Value" and name in phone_fields:
+                    redacted[key] = _mask_phone(item)
+                else:
+                    redacted[key] = walk(item)
+            return redacted
+        if isinstance(node, list):
+            return [walk(item) for item in node]
+        return node
+
+    return walk(value)
+
+
+class TrafficRecorder:
+    """
+    Append-only recorder of API traffic and callbacks for load-test replay
+
+    Every API request sent by a client configured with this recorder, and
+    every callback passed to ``record_callback()`` (or a handler decorated
+    with ``wrap()``), is written as one compact JSON line: the start time,
+    endpoint path, redacted request and response bodies, status code and
+    latency. Credentials are dropped and phone numbers masked before
+    anything reaches the file; the Authorization header is never recorded.
+
+    Lines are buffered and written every ``flush_every`` records; the file is
+    only ever appended to, so several runs can share it. Recording never
+    raises into the request path.
+
+    Args:
+        path (str): Recording file (JSON lines)
+        flush_every (int): Records buffered before a write (default: 100)
+        secret_fields (iterable of str): Fields replaced with "***"
+        phone_fields (iterable of str): Fields masked to their last three digits
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_every: int = 100,
+        secret_fields: Iterable[str] = SECRET_FIELDS,
+        phone_fields: Iterable[str] = PHONE_FIELDS
+    ):
+        self.path = path
+        self.flush_every = flush_every
+        self.secret_fields = frozenset(secret_fields)
+        self.phone_fields = frozenset(phone_fields)
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._file = open(path, "a", encoding="utf-8")
+        self.recorded = 0
+
+    def _redact(self, value: Any) -> Any:
+        return redact(value, self.secret_fields, self.phone_fields)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._buffer.append(line)
+            self.recorded += 1
+            if len(self._buffer) >= self.flush_every:
+                self._write()
+
+    def _write(self) -> None:
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        self._buffer.clear()
+
+    def record_request(
+        self,
+        method: str,
+        url: str,
+        body: Union[None, Dict, bytes],
+        started: float,
+        elapsed: float,
+        status: Optional[int] = None,
+        response: Optional[bytes] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Record one API request; ``started`` is a Unix timestamp, ``elapsed`` in seconds"""
+        try:
+            if isinstance(body, bytes):
+                body = json.loads(body)
+            try:
+                response_body = json.loads(response) if response else None
+            except ValueError:
+                response_body = None
+            self._append({
+                "t": round(started, 6),
+                "type": "request",
+                "method": method,
+                "path": urlsplit(url).path,
+                "ms": round(elapsed * 1000, 3),
+                "status": status,
+                "request": self._redact(body),
+                "response": self._redact(response_body),
+                "error": error,
+            })
+        except Exception as e:
+            logger.error("Failed to record request to %s: %s", url, e)
+
+    def record_callback(self, payload: Mapping[str, Any], path: Optional[str] = None) -> None:
+        """Record a callback body as received (before any processing)"""
+        try:
+            self._append({"t": round(time.time(), 6), "type": "callback", "path": path, "body": self._redact(payload)})
+        except Exception as e:
+            logger.error("Failed to record callback: %s", e)
+
+    def wrap(self, handler: Callable[[Mapping[str, Any]], T], path: Optional[str] = None) -> Callable[[Mapping[str, Any]], T]:
+        """Decorate a callback handler so every delivery is recorded before it is handled"""
+        @functools.wraps(handler)
+        def recorded(payload: Mapping[str, Any]) -> T:
+            self.record_callback(payload, path)
+            return handler(payload)
+        return recorded
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None and self._buffer:
+                self._write()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            if self._buffer:
+                self._write()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_recording(path: str, types: Iterable[str] = ("request", "callback")) -> Iterator[Dict[str, Any]]:
+    """Records from a recording file in time order of writing, skipping a torn last line"""
+    wanted = set(types)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # partially written line from a crash
+            if record.get("type") in wanted:
+                yield record
+
+
+class ReplayReport(NamedTuple):
+    """Outcome of a replay; latencies in milliseconds"""
+    sent: int
+    errors: int
+    duration_s: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    recorded_p50_ms: float
+    recorded_p99_ms: float
+    max_lag_ms: float
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class TrafficReplayer:
+    """
+    Replay a recording against a client, preserving inter-arrival times
+
+    Each recorded request is re-sent to the same endpoint path on the
+    client's configured base URL (point it at a local stand-in), at its
+    original offset from the first record divided by ``speed``. Requests run
+    on a pool of ``concurrency`` threads so slow responses don't delay later
+    arrivals; if the pool saturates, the growing schedule lag is reported
+    as ``max_lag_ms``. Recorded callbacks are POSTed to ``callback_url`` when
+    one is given.
+
+    Bodies are replayed as recorded, i.e. redacted; the stand-in must not
+    validate credentials.
+
+    Args:
+        client (MPESAClient): Client to drive (its recorder, if any, should be unset)
+        path (str): Recording file
+        speed (float): Time compression factor, e.g. 1 for real time, 10 for 10x (default: 1)
+        concurrency (int): Replay threads (default: 64)
+        callback_url (str, optional): Endpoint that recorded callbacks are POSTed to
+    """
+
+    def __init__(
+        self,
+        client: "MPESAClient",
+        path: str,
+        speed: float = 1.0,
+        concurrency: int = 64,
+        callback_url: Optional[str] = None
+    ):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.client = client
+        self.path = path
+        self.speed = speed
+        self.concurrency = concurrency
+        self.callback_url = callback_url
+
+    def _send(self, record: Dict[str, Any]) -> float:
+        started = time.perf_counter()
+        if record["type"] == "callback":
+            self.client._request(
+                method="POST", url=self.callback_url, json=record["body"],
+                timeout=self.client._timeout("callback replay"), verify=self.client.config.verify_ssl
+            ).close()
+        else:
+            url = self.client.config._build_url(record["path"])
+            self.client._make_request(record["method"], url, record["request"], self.client.config.verify_ssl)
+        return (time.perf_counter() - started) * 1000
+
+    def run(self) -> ReplayReport:
+        """Replay the whole recording and report throughput and latency percentiles"""
+        types = ("request", "callback") if self.callback_url else ("request",)
+        latencies: List[float] = []
+        recorded: List[float] = []
+        errors = [0]
+        sent = 0
+        max_lag = 0.0
+        first_t: Optional[float] = None
+        last_t = 0.0
+        lock = threading.Lock()
+
+        def collect(future) -> None:
+            # Results are folded in as they finish so memory doesn't grow with pending futures
+            with lock:
+                try:
+                    latencies.append(future.result())
+                except Exception as e:
+                    errors[0] += 1
+                    logger.debug("Replayed request failed: %s", e)
+
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="mpesa-replay") as pool:
+            for record in read_recording(self.path, types):
+                if first_t is None:
+                    first_t = last_t = record["t"]
+                # Concurrent requests are written as they finish, so times can step back slightly
+                last_t = max(last_t, record["t"])
+                due = started + (last_t - first_t) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay * 1000)
+                if record.get("ms") is not None:
+                    recorded.append(record["ms"])
+                pool.submit(self._send, record).add_done_callback(collect)
+                sent += 1
+
+        duration = time.monotonic() - started
+        latencies.sort()
+        recorded.sort()
+        return ReplayReport(
+            sent=sent,
+            errors=errors[0],
+            duration_s=duration,
+            throughput=sent / duration if duration else 0.0,
+            p50_ms=_percentile(latencies, 50),
+            p95_ms=_percentile(latencies, 95),
+            p99_ms=_percentile(latencies, 99),
+            max_ms=latencies[-1] if latencies else 0.0,
+            recorded_p50_ms=_percentile(recorded, 50),
+            recorded_p99_ms=_percentile(recorded, 99),
+            max_lag_ms=max_lag,
+        )
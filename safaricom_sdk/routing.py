@@ -0,0 +1,266 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError, SSLError
+
+from .utils import logger
+
+
+def never_sent(error: BaseException) -> bool:
+    """
+    Whether a transport error happened before the request left this host
+
+    DNS failures, refused connections, connect timeouts and TLS handshake
+    failures qualify; such requests are safe to retry elsewhere even when
+    they are not idempotent. Errors after sending (read timeouts, dropped
+    connections) do not.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError):
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, "reason", reason)  # unwrap urllib3's MaxRetryError
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError, SSLError))
+    return False
+
+
+class _Endpoint:
+    __slots__ = ("url", "latency", "error_rate", "consecutive_failures", "ejected_until",
+                 "requests", "failures", "probes")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.probes = 0
+
+
+class EndpointRouter:
+    """
+    Health-weighted routing across equivalent M-PESA API base URLs
+
+    Every request outcome updates its endpoint's EWMA latency and error
+    rate (passive health); optional background probes keep idle and ejected
+    endpoints measured (active health). Requests go to the endpoint with the
+    best score, ``latency * (1 + error_penalty * error_rate)``; the current
+    endpoint is kept until another beats it by ``hysteresis``, so similar
+    endpoints don't flap. After ``eject_after`` consecutive failures an
+    endpoint is skipped for ``cooldown`` seconds, then tried again.
+
+    ``send()`` fails over to the next endpoint when the request provably
+    never left this host (see ``never_sent``) or, for idempotent calls such
+    as the token fetch, on any transport error. Payment requests that may
+    have reached an endpoint are never replayed against another one.
+
+    Args:
+        endpoints (iterable of str): Base URLs in order of preference
+        alpha (float): EWMA weight of the newest observation (default: 0.2)
+        error_penalty (float): Score multiplier per unit of error rate (default: 10)
+        eject_after (int): Consecutive failures before ejection (default: 3)
+        cooldown (float): Seconds an ejected endpoint is skipped (default: 30)
+        hysteresis (float): Relative improvement needed to switch endpoints (default: 0.2)
+        max_attempts (int, optional): Endpoints tried per request (default: all)
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[str],
+        alpha: float = 0.2,
+        error_penalty: float = 10.0,
+        eject_after: int = 3,
+        cooldown: float = 30.0,
+        hysteresis: float = 0.2,
+        max_attempts: Optional[int] = None
+    ):
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.eject_after = eject_after
+        self.cooldown = cooldown
+        self.hysteresis = hysteresis
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._endpoints: List[_Endpoint] = []
+        self._active: Optional[_Endpoint] = None
+        self._failovers = 0
+        self._probe_stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+        self.set_endpoints(endpoints)
+
+    def set_endpoints(self, endpoints: Iterable[str]) -> None:
+        """Replace the endpoint list, keeping the health history of endpoints that remain"""
+        urls = list(dict.fromkeys(url.rstrip("/") for url in endpoints))
+        if not urls:
+            raise ValueError("At least one endpoint is required")
+        with self._lock:
+            known = {endpoint.url: endpoint for endpoint in self._endpoints}
+            self._endpoints = [known.get(url) or _Endpoint(url) for url in urls]
+            if self._active not in self._endpoints:
+                self._active = self._endpoints[0]
+
+    @property
+    def endpoints(self) -> List[str]:
+        return [endpoint.url for endpoint in self._endpoints]
+
+    def _score(self, endpoint: _Endpoint, default_latency: float) -> float:
+        latency = endpoint.latency if endpoint.latency is not None else default_latency
+        return latency * (1 + self.error_penalty * endpoint.error_rate)
+
+    def order(self) -> List[str]:
+        """Endpoints to try, healthiest first (ejected ones last)"""
+        now = time.monotonic()
+        with self._lock:
+            known = [e.latency for e in self._endpoints if e.latency is not None]
+            # Unmeasured endpoints rank with the best measured one; ties keep configured order
+            default_latency = min(known) if known else 0.0
+            ranked = sorted(
+                enumerate(self._endpoints),
+                key=lambda item: (item[1].ejected_until > now, self._score(item[1], default_latency), item[0])
+            )
+            order = [endpoint for _, endpoint in ranked]
+            active = self._active
+            if (
+                active is not None and order[0] is not active and active.ejected_until <= now
+                and self._score(active, default_latency) <= self._score(order[0], default_latency) * (1 + self.hysteresis)
+            ):
+                order.remove(active)
+                order.insert(0, active)
+            if order[0] is not self._active:
+                logger.info("Routing M-PESA requests to %s", order[0].url)
+                self._active = order[0]
+        return [endpoint.url for endpoint in order]
+
+    def record(self, endpoint: str, latency: float, ok: bool, probe: bool = False) -> None:
+        """Fold one observed outcome into an endpoint's health"""
+        with self._lock:
+            state = next((e for e in self._endpoints if e.url == endpoint), None)
+            if state is None:
+                return
+            if probe:
+                state.probes += 1
+            else:
+                state.requests += 1
+            if ok:
+                state.latency = latency if state.latency is None else (
+                    self.alpha * latency + (1 - self.alpha) * state.latency
+                )
+                state.error_rate *= 1 - self.alpha
+                state.consecutive_failures = 0
+                state.ejected_until = 0.0
+            else:
+                state.failures += 1
+                state.error_rate = self.alpha + (1 - self.alpha) * state.error_rate
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.eject_after:
+                    if state.ejected_until <= time.monotonic():
+                        logger.warning("Ejecting M-PESA endpoint %s after %d consecutive failures",
+                                       state.url, state.consecutive_failures)
+                    state.ejected_until = time.monotonic() + self.cooldown
+
+    def send(
+        self,
+        url: str,
+        base_url: str,
+        send: Callable[[str], requests.Response],
+        idempotent: bool = False
+    ) -> requests.Response:
+        """
+        Send ``url`` (built on ``base_url``) to the healthiest endpoint, failing over where safe
+
+        Args:
+            url (str): Request URL as built by the Configuration
+            base_url (str): The Configuration's base URL, replaced by each endpoint
+            send (callable): Performs the request for a rewritten URL
+            idempotent (bool): Fail over on any transport error, not just unsent requests
+
+        Returns:
+            requests.Response: First response received (any status)
+        """
+        base_url = base_url.rstrip("/")
+        if not url.startswith(base_url):
+            return send(url)
+        path = url[len(base_url):]
+        candidates = self.order()[:self.max_attempts]
+        for attempt, endpoint in enumerate(candidates):
+            started = time.perf_counter()
+            try:
+                response = send(endpoint + path)
+            except requests.exceptions.RequestException as e:
+                self.record(endpoint, time.perf_counter() - started, ok=False)
+                if attempt + 1 == len(candidates) or not (idempotent or never_sent(e)):
+                    raise
+                with self._lock:
+                    self._failovers += 1
+                logger.warning("M-PESA endpoint %s failed (%s), failing over", endpoint, e)
+                continue
+            self.record(endpoint, time.perf_counter() - started, ok=response.status_code < 500)
+            return response
+        raise AssertionError("unreachable")
+
+    def probe(
+        self,
+        path: str = "/",
+        timeout: float = 2.0,
+        session: Optional[requests.Session] = None,
+        verify: bool = True
+    ) -> None:
+        """Probe every endpoint once; any HTTP response below 500 counts as healthy"""
+        for endpoint in self.endpoints:
+            started = time.perf_counter()
+            try:
+                response = (session or requests).request(
+                    "HEAD", endpoint + path, timeout=timeout, verify=verify, allow_redirects=False
+                )
+                response.close()
+                ok = response.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            self.record(endpoint, time.perf_counter() - started, ok, probe=True)
+
+    def start_probes(self, interval: float = 10.0, **probe_kwargs: Any) -> None:
+        """Probe all endpoints every ``interval`` seconds on a daemon thread"""
+        if self._probe_thread is not None and self._probe_thread.is_alive():
+            return
+        self._probe_stop.clear()
+
+        def run() -> None:
+            while not self._probe_stop.is_set():
+                try:
+                    self.probe(**probe_kwargs)
+                except Exception as e:
+                    logger.error("Endpoint probe failed: %s", e)
+                self._probe_stop.wait(interval)
+
+        self._probe_thread = threading.Thread(target=run, name="mpesa-endpoint-probe", daemon=True)
+        self._probe_thread.start()
+
+    def stop_probes(self) -> None:
+        self._probe_stop.set()
+        if self._probe_thread is not None:
+            self._probe_thread.join()
+            self._probe_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Active endpoint, failover count and per-endpoint health"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "active": self._active.url if self._active else None,
+                "failovers": self._failovers,
+                "endpoints": {
+                    e.url: {
+                        "latency_ms": e.latency * 1000 if e.latency is not None else None,
+                        "error_rate": e.error_rate,
+                        "requests": e.requests,
+                        "failures": e.failures,
+                        "probes": e.probes,
+                        "ejected": e.ejected_until > now,
+                    }
+                    for e in self._endpoints
+                },
+            }
@@ -0,0 +1,416 @@
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .checkpoint import is_ambiguous
+from .exceptions import MPESAError
+from .models import B2CRequest, STKPushRequest
+from .utils import format_timestamp, generate_password, logger
+
+if TYPE_CHECKING:
+    from .client import MPESAClient
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"            # Error response: not processed, safe to reschedule
+UNCERTAIN = "uncertain"      # Timed out or interrupted mid-flight: reconcile before resending
+MISSED = "missed"            # Skipped by the misfire policy
+CANCELLED = "cancelled"
+
+# Misfire policies for jobs found overdue by more than ``misfire_grace``
+RUN_LATE = "run"
+SKIP = "skip"
+
+_KINDS = {"b2c": B2CRequest, "stk_push": STKPushRequest}
+_METHODS = {"b2c": "process_b2c_payment", "stk_push": "stk_push"}
+
+
+class PaymentScheduler:
+    """
+    Durable scheduler for one-off and recurring B2C payouts and STK Push requests
+
+    Jobs live in SQLite (WAL) with a partial index on ``(status, due_at)``,
+    and only the slice due within ``horizon`` seconds is held in memory, in a
+    min-heap. A single timer thread sleeps until the earliest due job (or a
+    newly scheduled earlier one), claims it with a conditional UPDATE and
+    dispatches it through the client on a bounded worker pool; when all
+    workers are busy the timer waits, so lateness shows up in the lag
+    metrics rather than as unbounded threads. Every database read is an
+    index range scan, so restarts and refills never scan the whole table.
+
+    On restart, jobs left ``running`` by a crash are marked ``uncertain``
+    instead of being resent. Jobs overdue by more than ``misfire_grace``
+    seconds are run late or skipped according to ``misfire_policy``;
+    recurring jobs then continue from their next future occurrence.
+
+    STK Push password and timestamp are regenerated at dispatch time when a
+    ``passkey`` is given, since Safaricom rejects stale timestamps.
+
+    Args:
+        client (MPESAClient): Client used to send the requests
+        path (str): SQLite database file
+        max_concurrency (int): Jobs in flight at once (default: 8)
+        misfire_grace (float): Seconds a job may be late before the misfire policy applies (default: 300)
+        misfire_policy (str): "run" (default) to send late jobs, "skip" to mark them missed
+        horizon (float): Seconds ahead loaded into memory (default: 300)
+        max_loaded (int): Maximum jobs loaded per refill (default: 10,000)
+        passkey (str, optional): Lipa Na M-PESA passkey for regenerating STK Push passwords
+        job_timeout (float, optional): Deadline for each dispatched call in seconds
+        clock (callable): Time source returning Unix seconds (default: time.time)
+    """
+
+    def __init__(
+        self,
+        client: "MPESAClient",
+        path: str,
+        max_concurrency: int = 8,
+        misfire_grace: float = 300,
+        misfire_policy: str = RUN_LATE,
+        horizon: float = 300,
+        max_loaded: int = 10_000,
+        passkey: Optional[str] = None,
+        job_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        if misfire_policy not in (RUN_LATE, SKIP):
+            raise ValueError(f"misfire_policy must be {RUN_LATE!r} or {SKIP!r}")
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.misfire_grace = misfire_grace
+        self.misfire_policy = misfire_policy
+        self.horizon = horizon
+        self.max_loaded = max_loaded
+        self.passkey = passkey
+        self.job_timeout = job_timeout
+        self._clock = clock
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS mpesa_scheduled_jobs ("
+            "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, due_at REAL NOT NULL, "
+            "interval REAL, status TEXT NOT NULL, runs INTEGER NOT NULL DEFAULT 0, "
+            "last_run_at REAL, last_error TEXT, result TEXT, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS mpesa_scheduled_jobs_due ON mpesa_scheduled_jobs (due_at, id) "
+            "WHERE status = 'pending'"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS mpesa_scheduled_jobs_running ON mpesa_scheduled_jobs (id) "
+            "WHERE status = 'running'"
+        )
+        self._db_lock = threading.Lock()
+
+        self._condition = threading.Condition()
+        self._heap: List[Tuple[float, int]] = []
+        # Every pending job at or before this (due_at, id) key is already in the heap
+        self._loaded_until: Tuple[float, float] = (float("-inf"), -1)
+        # Jobs armed past the mark while a refill's SELECT runs; the refill adds those its new mark covers
+        self._refill_lock = threading.Lock()
+        self._armed_during_refill: Optional[List[Tuple[float, int]]] = None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._timer: Optional[threading.Thread] = None
+        self._stopping = False
+        self._lags: deque = deque(maxlen=4096)
+        self._counts = {"dispatched": 0, DONE: 0, FAILED: 0, UNCERTAIN: 0, MISSED: 0, "recovered": 0}
+
+        self._recover()
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with self._db_lock:
+            return self._db.execute(sql, params)
+
+    def _recover(self) -> None:
+        """Jobs left running by a crash may have been sent: flag them instead of resending"""
+        cursor = self._execute(
+            "UPDATE mpesa_scheduled_jobs SET status = ?, last_error = ? WHERE status = 'running'",
+            (UNCERTAIN, "Interrupted while in flight; reconcile before resending")
+        )
+        if cursor.rowcount:
+            self._counts["recovered"] = cursor.rowcount
+            logger.warning("%d scheduled jobs were in flight during shutdown and are marked uncertain", cursor.rowcount)
+
+    def schedule(
+        self,
+        request: Union[B2CRequest, STKPushRequest],
+        run_at: Union[datetime, float],
+        interval: Optional[float] = None
+    ) -> int:
+        """
+        Persist a job and arm its timer
+
+        Args:
+            request (B2CRequest | STKPushRequest): Request to send
+            run_at (datetime | float): When to send (datetime or Unix timestamp)
+            interval (float, optional): Repeat every ``interval`` seconds
+
+        Returns:
+            int: Job id
+        """
+        kind = next((k for k, model in _KINDS.items() if isinstance(request, model)), None)
+        if kind is None:
+            raise ValueError(f"Unsupported request type: {type(request).__name__}")
+        if interval is not None and interval <= 0:
+            raise ValueError("interval must be positive")
+        due_at = run_at.timestamp() if isinstance(run_at, datetime) else float(run_at)
+
+        cursor = self._execute(
+            "INSERT INTO mpesa_scheduled_jobs (kind, payload, due_at, interval, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, request.model_dump_json(), due_at, interval, PENDING, self._clock())
+        )
+        self._arm(due_at, cursor.lastrowid)
+        return cursor.lastrowid
+
+    def _arm(self, due_at: float, job_id: int) -> None:
+        with self._condition:
+            if (due_at, job_id) <= self._loaded_until:
+                heapq.heappush(self._heap, (due_at, job_id))
+                self._condition.notify()
+            elif self._armed_during_refill is not None:
+                self._armed_during_refill.append((due_at, job_id))
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a pending job; returns False if it already ran or is running"""
+        cursor = self._execute(
+            "UPDATE mpesa_scheduled_jobs SET status = ? WHERE id = ? AND status = 'pending'", (CANCELLED, job_id)
+        )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            self._db.row_factory = sqlite3.Row
+            try:
+                row = self._db.execute("SELECT * FROM mpesa_scheduled_jobs WHERE id = ?", (job_id,)).fetchone()
+            finally:
+                self._db.row_factory = None
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _refill(self, now: float) -> None:
+        """Load the next slice of pending jobs (index range scan on due_at, id)"""
+        limit_due = now + self.horizon
+        with self._refill_lock:
+            with self._condition:
+                after_due, after_id = self._loaded_until
+                if after_due >= limit_due:
+                    return
+                self._armed_during_refill = []
+            try:
+                rows = self._execute(
+                    "SELECT due_at, id FROM mpesa_scheduled_jobs WHERE status = 'pending' "
+                    "AND (due_at > ? OR (due_at = ? AND id > ?)) AND due_at <= ? ORDER BY due_at, id LIMIT ?",
+                    (after_due, after_due, after_id, limit_due, self.max_loaded)
+                ).fetchall()
+            except BaseException:
+                with self._condition:
+                    self._armed_during_refill = None
+                raise
+            with self._condition:
+                armed, self._armed_during_refill = self._armed_during_refill, None
+                loaded = set()
+                for row in rows:
+                    heapq.heappush(self._heap, (row[0], row[1]))
+                    loaded.add((row[0], row[1]))
+                if len(rows) == self.max_loaded:
+                    self._loaded_until = (rows[-1][0], rows[-1][1])
+                else:
+                    self._loaded_until = (limit_due, float("inf"))
+                # Scheduled or re-armed after the SELECT's snapshot: only _arm saw these
+                for key in armed:
+                    if key <= self._loaded_until and key not in loaded:
+                        heapq.heappush(self._heap, key)
+
+    def _claim(self, due_at: float, job_id: int) -> Optional[Tuple[str, str, Optional[float]]]:
+        """Atomically move a pending job to running; None if it was cancelled or already claimed"""
+        with self._db_lock:
+            cursor = self._db.execute(
+                "UPDATE mpesa_scheduled_jobs SET status = 'running', last_run_at = ? "
+                "WHERE id = ? AND due_at = ? AND status = 'pending'",
+                (self._clock(), job_id, due_at)
+            )
+            if cursor.rowcount != 1:
+                return None
+            return self._db.execute(
+                "SELECT kind, payload, interval FROM mpesa_scheduled_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+    def _next_due(self, due_at: float, interval: float, now: float) -> float:
+        """Next occurrence strictly after now, coalescing any missed ones"""
+        if due_at + interval > now:
+            return due_at + interval
+        return due_at + interval * (int((now - due_at) // interval) + 1)
+
+    def _finish(self, job_id: int, due_at: float, interval: Optional[float], status: str,
+                result: Optional[BaseModel] = None, error: Optional[str] = None) -> None:
+        now = self._clock()
+        result_json = result.model_dump_json() if result is not None else None
+        with self._condition:
+            self._counts[status] += 1
+        if interval is not None and status != UNCERTAIN:
+            next_due = self._next_due(due_at, interval, now)
+            self._execute(
+                "UPDATE mpesa_scheduled_jobs SET status = 'pending', due_at = ?, runs = runs + ?, "
+                "last_error = ?, result = COALESCE(?, result) WHERE id = ?",
+                (next_due, 0 if status == MISSED else 1, error, result_json, job_id)
+            )
+            self._arm(next_due, job_id)
+        else:
+            self._execute(
+                "UPDATE mpesa_scheduled_jobs SET status = ?, runs = runs + ?, last_error = ?, result = ? WHERE id = ?",
+                (status, 0 if status == MISSED else 1, error, result_json, job_id)
+            )
+
+    def _prepare(self, kind: str, payload: str) -> Union[B2CRequest, STKPushRequest]:
+        request = _KINDS[kind].model_validate_json(payload)
+        if kind == "stk_push" and self.passkey:
+            timestamp = format_timestamp()
+            request = request.model_copy(update={
+                "Timestamp": timestamp,
+                "Password": generate_password(request.BusinessShortCode, self.passkey, timestamp),
+            })
+        return request
+
+    def _run_job(self, job_id: int, due_at: float, kind: str, payload: str, interval: Optional[float]) -> None:
+        try:
+            request = self._prepare(kind, payload)
+            response = getattr(self.client, _METHODS[kind])(request, deadline=self.job_timeout)
+        except MPESAError as e:
+            self._finish(job_id, due_at, interval, UNCERTAIN if is_ambiguous(e) else FAILED, error=str(e))
+        except Exception as e:
+            logger.error("Scheduled job %s failed: %s", job_id, e)
+            self._finish(job_id, due_at, interval, FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job_id, due_at, interval, DONE, result=response)
+        finally:
+            self._slots.release()
+
+    def _dispatch(self, due_at: float, job_id: int, now: float) -> bool:
+        """Claim and start one due job; returns False if it was skipped"""
+        # Take the worker slot first: a job waiting for one is still pending (cancellable, not in flight)
+        self._slots.acquire()
+        claimed = self._claim(due_at, job_id)
+        if claimed is None:
+            self._slots.release()
+            return False
+        kind, payload, interval = claimed
+        if now - due_at > self.misfire_grace and self.misfire_policy == SKIP:
+            self._slots.release()
+            self._finish(job_id, due_at, interval, MISSED, error=f"Missed by {now - due_at:.0f}s")
+            return False
+
+        with self._condition:
+            self._lags.append(now - due_at)
+            self._counts["dispatched"] += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="mpesa-scheduler")
+        self._executor.submit(self._run_job, job_id, due_at, kind, payload, interval)
+        return True
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """
+        Dispatch every job due by ``now`` (default: the current time) and wait for them
+
+        Useful for tests and for cron-style drivers that don't run the timer thread.
+
+        Returns:
+            int: Jobs dispatched
+        """
+        dispatched = 0
+        now = self._clock() if now is None else now
+        self._refill(now)
+        while True:
+            with self._condition:
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due_at, job_id = heapq.heappop(self._heap)
+            dispatched += self._dispatch(due_at, job_id, now)
+            if self._needs_refill(now):
+                self._refill(now)
+        for _ in range(self.max_concurrency):
+            self._slots.acquire()
+        for _ in range(self.max_concurrency):
+            self._slots.release()
+        return dispatched
+
+    def _needs_refill(self, now: float) -> bool:
+        # Keep the heap bounded: an overdue backlog is paged in as it drains
+        return len(self._heap) < self.max_loaded // 2 and now + self.horizon / 2 >= self._loaded_until[0]
+
+    def _loop(self) -> None:
+        while True:
+            now = self._clock()
+            if self._needs_refill(now):
+                self._refill(now)
+            with self._condition:
+                if self._stopping:
+                    return
+                if self._heap and self._heap[0][0] <= now:
+                    due_at, job_id = heapq.heappop(self._heap)
+                else:
+                    wait = self.horizon / 2
+                    if self._heap:
+                        wait = min(wait, self._heap[0][0] - now)
+                    if len(self._heap) < self.max_loaded // 2:
+                        wait = min(wait, self._loaded_until[0] - self.horizon / 2 - now)
+                    self._condition.wait(max(0.01, wait))
+                    continue
+            try:
+                self._dispatch(due_at, job_id, now)
+            except Exception as e:
+                logger.error("Failed to dispatch scheduled job %s: %s", job_id, e)
+
+    def start(self) -> None:
+        """Start the timer thread"""
+        if self._timer is not None and self._timer.is_alive():
+            return
+        self._stopping = False
+        self._timer = threading.Thread(target=self._loop, name="mpesa-scheduler-timer", daemon=True)
+        self._timer.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop dispatching; with ``wait``, let in-flight jobs finish"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._timer is not None:
+            self._timer.join()
+            self._timer = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def close(self) -> None:
+        self.stop()
+        with self._db_lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Outcome counters, pending/running counts (index lookups) and dispatch lag (ms)"""
+        pending = self._execute("SELECT COUNT(*) FROM mpesa_scheduled_jobs WHERE status = 'pending'").fetchone()[0]
+        running = self._execute("SELECT COUNT(*) FROM mpesa_scheduled_jobs WHERE status = 'running'").fetchone()[0]
+        stats: Dict[str, Any] = dict(self._counts)
+        stats.update(pending=pending, running=running, loaded=len(self._heap))
+        lags = sorted(self._lags)
+        if lags:
+            stats["lag_p50_ms"] = lags[len(lags) // 2] * 1000
+            stats["lag_p99_ms"] = lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000
+        return stats
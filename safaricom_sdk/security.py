@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .exceptions import ConfigurationError
+
+CertificateSource = Union[str, bytes, "os.PathLike[str]"]
+
+
+def _load_public_key(certificate: CertificateSource) -> Any:
+    """Parse a PEM or DER X.509 certificate (path or raw bytes) and return its public key"""
+    try:
+        from cryptography import x509
+    except ImportError:
+        raise ConfigurationError(
+            "SecurityCredential generation requires the 'cryptography' package. "
+            "Install it with: pip install safaricom_sdk[security]"
+        )
+
+    if isinstance(certificate, bytes):
+        data = certificate
+    else:
+        with open(certificate, "rb") as f:
+            data = f.read()
+
+    try:
+        if b"-----BEGIN CERTIFICATE-----" in data:
+            cert = x509.load_pem_x509_certificate(data)
+        else:
+            cert = x509.load_der_x509_certificate(data)
+    except ValueError as e:
+        raise ConfigurationError(f"Invalid M-PESA public certificate: {e}")
+    return cert.public_key()
+
+
+class SecurityCredentialProvider:
+    """
+    Generates and caches B2C ``SecurityCredential`` values
+
+    The initiator password is encrypted with Safaricom's public certificate
+    (RSA, PKCS#1 v1.5) and base64-encoded. The certificate is parsed once and
+    the resulting credential is cached per initiator, so bulk disbursements
+    pay for RSA only when a password or certificate changes.
+
+    Args:
+        certificate (str | bytes | PathLike): Certificate file path, or PEM/DER bytes
+        max_age (float, optional): Re-encrypt cached credentials older than this many seconds
+    """
+
+    def __init__(self, certificate: CertificateSource, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self._public_key = _load_public_key(certificate)
+        self._lock = threading.Lock()
+        # initiator name -> (password digest, credential, created at)
+        self._cache: Dict[str, Tuple[bytes, str, float]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _digest(password: str) -> bytes:
+        return hashlib.sha256(password.encode()).digest()
+
+    def encrypt(self, initiator_password: str) -> str:
+        """Encrypt a password without caching (always pays for RSA)"""
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        ciphertext = self._public_key.encrypt(initiator_password.encode(), padding.PKCS1v15())
+        return base64.b64encode(ciphertext).decode()
+
+    def get(self, initiator_name: str, initiator_password: str) -> str:
+        """
+        Get the SecurityCredential for an initiator, encrypting only on a cache miss
+
+        A changed password for the same initiator replaces the cached entry.
+
+        Args:
+            initiator_name (str): B2C initiator name
+            initiator_password (str): Plain-text initiator password
+
+        Returns:
+            str: Base64-encoded encrypted credential
+        """
+        if not initiator_name or not initiator_password:
+            raise ValueError("Initiator name and password must not be empty")
+
+        digest = self._digest(initiator_password)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(initiator_name)
+            if entry is not None and entry[0] == digest and (
+                self.max_age is None or now - entry[2] < self.max_age
+            ):
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            public_key = self._public_key
+
+        credential = self.encrypt(initiator_password)
+        with self._lock:
+            # Don't cache a credential made with a key that was rotated meanwhile
+            if public_key is self._public_key:
+                self._cache[initiator_name] = (digest, credential, now)
+        return credential
+
+    def invalidate(self, initiator_name: Optional[str] = None) -> None:
+        """Drop the cached credential for one initiator, or for all when no name is given"""
+        with self._lock:
+            if initiator_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(initiator_name, None)
+
+    def rotate_certificate(self, certificate: CertificateSource) -> None:
+        """Switch to a new public certificate and invalidate every cached credential"""
+        public_key = _load_public_key(certificate)
+        with self._lock:
+            self._public_key = public_key
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for monitoring"""
+        with self._lock:
+            return {"initiators": len(self._cache), "hits": self._hits, "misses": self._misses}
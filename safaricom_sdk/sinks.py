@@ -0,0 +1,263 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Sequence
+
+from .dedup import callback_key
+from .exceptions import SinkFullError
+from .utils import logger
+
+
+class Event(NamedTuple):
+    """A callback or transaction record to persist"""
+    kind: str                   # e.g. "stk_push", "b2c_payment", "callback"
+    key: Optional[str]          # Natural identifier (CheckoutRequestID, ConversationID, ...)
+    payload: Dict[str, Any]
+    created_at: float
+
+
+def make_event(kind: str, key: Optional[str], payload: Mapping[str, Any]) -> Event:
+    return Event(kind, key, dict(payload), time.time())
+
+
+def callback_event(payload: Mapping[str, Any]) -> Event:
+    """Wrap a raw STK/B2C/C2B callback body as an event keyed by its idempotency ID"""
+    return make_event("callback", callback_key(payload), payload)
+
+
+class EventSink(ABC):
+    """
+    Destination for SDK events
+
+    Subclasses implement ``write_batch``; ``emit`` writes a single event
+    synchronously unless overridden (see BatchingWriter).
+    """
+
+    def emit(self, event: Event) -> None:
+        self.write_batch([event])
+
+    @abstractmethod
+    def write_batch(self, events: Sequence[Event]) -> None:
+        """Persist ``events``, all or nothing where the backend allows"""
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteEventSink(EventSink):
+    """
+    Stores events in a SQLite table, one transaction per batch
+
+    Args:
+        path (str): Database file (":memory:" for tests)
+        table (str): Table name (default: "mpesa_events")
+    """
+
+    def __init__(self, path: str, table: str = "mpesa_events"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.table = table
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, key TEXT, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_kind_key ON {table} (kind, key)")
+        self._db.commit()
+
+    def write_batch(self, events: Sequence[Event]) -> None:
+        rows = [
+            (e.kind, e.key, json.dumps(e.payload, separators=(",", ":"), default=str), e.created_at)
+            for e in events
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT INTO {self.table} (kind, key, payload, created_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def count(self, kind: Optional[str] = None) -> int:
+        with self._lock:
+            if kind is None:
+                row = self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            else:
+                row = self._db.execute(f"SELECT COUNT(*) FROM {self.table} WHERE kind = ?", (kind,)).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_STOP = object()
+
+
+class BatchingWriter(EventSink):
+    """
+    Buffers events and hands them to another sink in batches
+
+    A background thread flushes when ``max_batch`` events are buffered or
+    ``flush_interval`` seconds have passed since the first buffered event.
+    When the buffer holds ``max_queue`` events, ``emit`` blocks for up to
+    ``put_timeout`` seconds (forever if None) and then raises SinkFullError,
+    so a slow database pushes back on producers instead of growing memory.
+    ``close`` drains everything still buffered.
+
+    Args:
+        sink (EventSink): Destination receiving whole batches
+        max_batch (int): Events per write (default: 500)
+        flush_interval (float): Maximum seconds an event waits in the buffer (default: 1.0)
+        max_queue (int): Buffer capacity (default: 10,000)
+        put_timeout (float, optional): Seconds ``emit`` may block when the buffer is full
+        max_retries (int): Attempts per batch before it is counted as failed (default: 3)
+    """
+
+    def __init__(
+        self,
+        sink: EventSink,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10_000,
+        put_timeout: Optional[float] = None,
+        max_retries: int = 3
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.sink = sink
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max(1, max_retries)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._counts = {"emitted": 0, "written": 0, "batches": 0, "failed": 0, "rejected": 0}
+        # Guards the counts, the closed flag and the number of producers between that check and their put()
+        self._state = threading.Condition()
+        self._producers = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="mpesa-event-writer", daemon=True)
+        self._worker.start()
+
+    def _enter(self) -> bool:
+        """Register a producer about to put(); False once closed"""
+        with self._state:
+            if self._closed:
+                return False
+            self._producers += 1
+            return True
+
+    def _leave(self) -> None:
+        with self._state:
+            self._producers -= 1
+            if not self._producers:
+                self._state.notify_all()
+
+    def emit(self, event: Event) -> None:
+        """Buffer an event, blocking while the buffer is full"""
+        if not self._enter():
+            raise SinkFullError("Event writer is closed")
+        try:
+            try:
+                self._queue.put(event, timeout=self.put_timeout)
+            except queue.Full:
+                with self._state:
+                    self._counts["rejected"] += 1
+                raise SinkFullError(f"Event buffer full ({self._queue.maxsize} events)")
+            with self._state:
+                self._counts["emitted"] += 1
+        finally:
+            self._leave()
+
+    def write_batch(self, events: Sequence[Event]) -> None:
+        for event in events:
+            self.emit(event)
+
+    def _write(self, batch: Sequence[Event]) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.sink.write_batch(batch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._state:
+                        self._counts["failed"] += len(batch)
+                    logger.error("Dropping %d events after %d failed writes: %s", len(batch), attempt, e)
+                    return
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+            else:
+                with self._state:
+                    self._counts["written"] += len(batch)
+                    self._counts["batches"] += 1
+                return
+
+    def _run(self) -> None:
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None or item is _STOP or isinstance(item, threading.Event):
+                if batch:
+                    self._write(batch)
+                    batch = []
+                deadline = None
+                if isinstance(item, threading.Event):
+                    item.set()
+                if item is _STOP:
+                    return
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.max_batch:
+                self._write(batch)
+                batch = []
+                deadline = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything buffered so far; returns False if it didn't finish within ``timeout``"""
+        if not self._enter():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done)
+        finally:
+            self._leave()
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Drain the buffer, stop the background thread and close the wrapped sink"""
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            # Producers already past the closed check get their events in ahead of the stop marker
+            while self._producers:
+                self._state.wait()
+        self._queue.put(_STOP)
+        self._worker.join()
+        self.sink.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._state:
+            stats = dict(self._counts)
+        stats["queued"] = self._queue.qsize()
+        return stats
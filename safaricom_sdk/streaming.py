@@ -0,0 +1,122 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple, Optional, Set, Tuple, Union
+
+from .deadline import Deadline
+from .exceptions import MPESAError
+
+
+class StreamResult(NamedTuple):
+    """Outcome of one streamed request; exactly one of ``response`` and ``error`` is set"""
+    correlation_id: Any
+    request: Any
+    response: Any
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _aiter(items: Union[AsyncIterable, Iterable]) -> AsyncIterator:
+    if hasattr(items, "__aiter__"):
+        iterator = items.__aiter__()
+        try:
+            async for item in iterator:
+                yield item
+        finally:
+            # Close the producer too (e.g. release its consumer-group membership)
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+    else:
+        for item in items:
+            yield item
+
+
+async def _next(iterator: AsyncIterator) -> Any:
+    return await iterator.__anext__()
+
+
+async def stream_requests(
+    items: Union[AsyncIterable, Iterable],
+    call: Callable[..., Awaitable[Any]],
+    correlation_id: Callable[[int, Any], Any],
+    concurrency: int = 16,
+    deadline: Union[None, float, Deadline] = None
+) -> AsyncIterator[StreamResult]:
+    """
+    Send requests from a (possibly endless) stream with bounded concurrency
+
+    The next input item is pulled only while fewer than ``concurrency``
+    requests are in flight, so a fast producer is slowed to the rate the API
+    sustains and memory stays flat however long the stream is. Results are
+    yielded in completion order. Items are requests or ``(correlation_id,
+    request)`` pairs; for bare requests ``correlation_id(index, request)``
+    supplies the id.
+
+    API errors are yielded as results rather than raised. When the consumer
+    stops iterating or the task is cancelled, in-flight requests are
+    cancelled and the input iterator is closed. A request already handed to
+    a worker thread still completes on the wire, so cancelled requests must
+    be treated as uncertain.
+
+    Args:
+        items (iterable | async iterable): Requests or (correlation_id, request) pairs
+        call (callable): Async client method, called as ``call(request, deadline=...)``
+        correlation_id (callable): Id for a bare request from its stream position
+        concurrency (int): Maximum requests in flight (default: 16)
+        deadline (float | Deadline, optional): Seconds allowed for each request; a
+            ``Deadline`` object is shared by every request, so it bounds the whole stream
+
+    Returns:
+        async iterator of StreamResult
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    source = _aiter(items)
+    in_flight: Set[asyncio.Future] = set()
+    fetch: Optional[asyncio.Future] = None
+    index = 0
+
+    async def send(key: Any, request: Any) -> StreamResult:
+        try:
+            return StreamResult(key, request, await call(request, deadline=deadline), None)
+        except MPESAError as e:
+            return StreamResult(key, request, None, e)
+
+    try:
+        while True:
+            if fetch is None and source is not None and len(in_flight) < concurrency:
+                fetch = asyncio.ensure_future(_next(source))
+            waiting = in_flight | ({fetch} if fetch is not None else set())
+            if not waiting:
+                return
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if fetch in done:
+                try:
+                    item = fetch.result()
+                except StopAsyncIteration:
+                    source = None
+                else:
+                    key, request = _split(item, index, correlation_id)
+                    index += 1
+                    in_flight.add(asyncio.ensure_future(send(key, request)))
+                fetch = None
+            for task in done:
+                if task in in_flight:
+                    in_flight.discard(task)
+                    yield task.result()
+    finally:
+        pending = list(in_flight) + ([fetch] if fetch is not None else [])
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if source is not None:
+            await source.aclose()
+
+
+def _split(item: Any, index: int, correlation_id: Callable[[int, Any], Any]) -> Tuple[Any, Any]:
+    if isinstance(item, tuple) and len(item) == 2:
+        return item
+    return correlation_id(index, item), item
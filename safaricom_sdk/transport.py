@@ -0,0 +1,199 @@
+import asyncio
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import NewConnectionError
+
+from .exceptions import ConfigurationError
+from .utils import logger
+
+TimeoutValue = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+def http2_available() -> bool:
+    """Whether the optional HTTP/2 dependencies (httpx with h2) are installed"""
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTP2Transport:
+    """
+    HTTP/2 transport for MPESAClient and Authentication, backed by httpx
+
+    Pass it as the client's ``session``: it exposes the ``request()``
+    signature of ``requests.Session``, so every SDK feature (deadlines,
+    hedging, routing, recording) works unchanged. Concurrent requests to a
+    host are multiplexed as streams over at most ``max_connections`` HTTP/2
+    connections instead of one HTTP/1.1 connection each, which keeps the
+    socket and TLS handshake count flat during bursts. Hosts that don't
+    negotiate HTTP/2 (via TLS ALPN) are served over HTTP/1.1.
+
+    Responses are returned as fully read ``requests.Response`` objects, and
+    httpx errors are re-raised as the equivalent ``requests`` exceptions,
+    preserving the distinction between connect failures (never sent) and
+    read failures (outcome unknown).
+
+    Requests run on one event loop thread owned by the transport, using
+    httpx's async client: the sync HTTP/2 client mutates shared connection
+    state from every calling thread and can put streams on the wire out of
+    order under concurrency, which makes the server drop the connection.
+    ``request()`` blocks the calling thread as usual.
+
+    Requires ``pip install safaricom_sdk[http2]``.
+
+    Args:
+        max_connections (int): Connections per client (default: 4)
+        keepalive_expiry (float): Seconds an idle connection is kept (default: 60)
+        prior_knowledge (bool): Speak HTTP/2 without negotiation, needed for
+            cleartext ``http://`` servers such as local stand-ins (default: False)
+    """
+
+    def __init__(self, max_connections: int = 4, keepalive_expiry: float = 60.0, prior_knowledge: bool = False):
+        if not http2_available():
+            raise ConfigurationError(
+                "The HTTP/2 transport requires the 'httpx' and 'h2' packages. "
+                "Install them with: pip install safaricom_sdk[http2]"
+            )
+        import httpx
+        self._httpx = httpx
+        self._http1 = not prior_knowledge
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # httpx fixes certificate verification per client, so one client per verify setting.
+        # Only touched on the loop thread.
+        self._clients: Dict[bool, Any] = {}
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is None:
+            with self._lock:
+                loop = self._loop
+                if loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="mpesa-http2", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return loop
+
+    def _client(self, verify: bool) -> Any:
+        client = self._clients.get(verify)
+        if client is None:
+            client = self._httpx.AsyncClient(http1=self._http1, http2=True, verify=verify, limits=self._limits)
+            self._clients[verify] = client
+        return client
+
+    def _timeout(self, timeout: TimeoutValue) -> Any:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+        return self._httpx.Timeout(timeout)
+
+    @staticmethod
+    def _response(response: Any) -> requests.Response:
+        """Copy an (already read) httpx response into a ``requests.Response``"""
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.url = str(response.url)
+        result.reason = response.reason_phrase
+        result.encoding = response.encoding
+        result.elapsed = response.elapsed
+        result._content = response.content
+        result._content_consumed = True  # nothing left to read, so close() is a no-op
+        return result
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: TimeoutValue = None,
+        verify: bool = True,
+        allow_redirects: bool = True,
+        **kwargs: Any
+    ) -> requests.Response:
+        """Send a request; same keyword arguments, response and error types as ``requests.Session.request``"""
+        httpx = self._httpx
+        body: Dict[str, Any] = {}
+        if json is not None:
+            body["json"] = json
+        elif isinstance(data, (bytes, str)):
+            body["content"] = data
+        elif data is not None:
+            body["data"] = data
+
+        async def send() -> Any:
+            return await self._client(verify).request(
+                method, url, headers=headers, timeout=self._timeout(timeout),
+                follow_redirects=allow_redirects, **body, **kwargs
+            )
+
+        try:
+            return self._response(asyncio.run_coroutine_threadsafe(send(), self._event_loop()).result())
+        except (httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            # The request never left this host
+            raise requests.exceptions.ConnectTimeout(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e)) from e
+        except httpx.ConnectError as e:
+            raise requests.exceptions.ConnectionError(NewConnectionError(None, str(e))) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def close_clients() -> None:
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients.clear()
+
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def create_transport(http2: bool = True, max_connections: int = 4) -> Union[HTTP2Transport, requests.Session]:
+    """
+    Shared transport for MPESAClient(session=...)
+
+    Returns an HTTP2Transport when ``http2`` is requested and its
+    dependencies are installed, otherwise a pooled ``requests.Session``.
+    """
+    if http2:
+        if http2_available():
+            return HTTP2Transport(max_connections=max_connections)
+        logger.info("httpx/h2 not installed; using the HTTP/1.1 requests transport")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, max_connections))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
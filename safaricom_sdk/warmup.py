@@ -0,0 +1,130 @@
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .deadline import Deadline, deadline_scope
+from .utils import logger
+
+if TYPE_CHECKING:
+    from .client import MPESAClient
+
+
+class WarmUpReport(NamedTuple):
+    """Timings (milliseconds) of a client warm-up; failed steps are listed in ``errors``"""
+    total_ms: float
+    dns_ms: Optional[float]
+    token_ms: Optional[float]
+    connections_ms: Optional[float]
+    connections_opened: int
+    errors: Dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _hosts(client: "MPESAClient") -> Dict[Tuple[str, int], str]:
+    """Distinct (host, port) pairs the client talks to, with a URL for each"""
+    hosts = {}
+    for url in (client.config.get_token_url(), client.config.get_stkpush_url()):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        hosts.setdefault((parts.hostname, port), f"{parts.scheme}://{parts.netloc}/")
+    return hosts
+
+
+def _ensure_session(client: "MPESAClient", connections: int) -> requests.Session:
+    """Give the client (and its auth) a pooled session so warmed connections are reused"""
+    if client.session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, connections))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        client.session = session
+        client.auth.session = session
+    return client.session
+
+
+def _timed(step: Callable[[], Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = step()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def warm_up(client: "MPESAClient", connections: int = 4, timeout: float = 10.0) -> WarmUpReport:
+    """
+    Pay cold-start costs before the first real request
+
+    Resolves the API hosts, fetches the access token and opens ``connections``
+    TLS connections concurrently, leaving the connections idle in the
+    client's session pool. A client without a session gets a pooled one.
+    Failures are logged and reported, never raised: a failed warm-up only
+    means the first requests pay the cold-start cost.
+
+    Args:
+        client (MPESAClient): Client to warm up
+        connections (int): Idle connections to open per host (default: 4)
+        timeout (float): Overall budget in seconds (default: 10)
+
+    Returns:
+        WarmUpReport: Per-step timings and errors
+    """
+    started = time.perf_counter()
+    session = _ensure_session(client, connections)
+    hosts = _hosts(client)
+    errors: Dict[str, str] = {}
+    timings: Dict[str, Optional[float]] = {"dns": None, "token": None, "connections": None}
+    opened = 0
+
+    def resolve() -> None:
+        # Primes the system resolver cache ahead of the connection attempts
+        for host, port in hosts:
+            socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+
+    def open_connection(url: str) -> None:
+        # Concurrent requests each check out their own pooled connection, which
+        # returns to the pool idle (TLS session established) when the response is read
+        client._request(
+            method="HEAD", url=url, timeout=client._timeout("connection warm-up"),
+            verify=client.config.verify_ssl, allow_redirects=False
+        ).close()
+
+    with deadline_scope(Deadline(timeout)):
+        with ThreadPoolExecutor(max_workers=2 + connections * len(hosts), thread_name_prefix="mpesa-warmup") as pool:
+            submit = lambda fn, *args: pool.submit(copy_context().run, _timed, lambda: fn(*args))
+            dns = submit(resolve)
+            token = submit(client.auth.get_access_token)
+            conns_started = time.perf_counter()
+            conns = [submit(open_connection, url) for url in hosts.values() for _ in range(connections)]
+
+            for name, future in (("dns", dns), ("token", token)):
+                try:
+                    timings[name] = future.result()[0]
+                except Exception as e:
+                    errors[name] = str(e)
+            for future in conns:
+                try:
+                    future.result()
+                    opened += 1
+                except Exception as e:
+                    errors["connections"] = str(e)
+            if opened:
+                timings["connections"] = (time.perf_counter() - conns_started) * 1000
+
+    report = WarmUpReport(
+        total_ms=(time.perf_counter() - started) * 1000,
+        dns_ms=timings["dns"],
+        token_ms=timings["token"],
+        connections_ms=timings["connections"],
+        connections_opened=opened,
+        errors=errors,
+    )
+    if errors:
+        logger.warning("Client warm-up incomplete: %s", errors)
+    return report
@@ -9,6 +9,16 @@ setup(
         "pydantic>=2.0.0",
         "python-dotenv>=0.19.0",
     ],
+    extras_require={
+        "security": ["cryptography>=3.4"],
+        "toml": ["tomli>=1.1; python_version < '3.11'"],
+        "http2": ["httpx[http2]>=0.23"],
+    },
+    entry_points={
+        "console_scripts": [
+            "safaricom-sdk=safaricom_sdk.cli:main",
+        ],
+    },
     author="Your Name",
     author_email="your.email@example.com",
     description="A Python SDK for Safaricom M-PESA API integration",
@@ -9,8 +9,41 @@ from .test_config import TestConfiguration  # Configuration settings for the SDK
 from .test_auth import TestAuthentication  # Authentication methods for API access
 from .test_utils import TestUtils
 from .test_exceptions import TestExceptions
+from .test_pool import TestClientPool
+from .test_deadline import TestDeadline, TestDeadlinePropagation
+from .test_hedging import TestRequestHedger, TestClientHedging
+from .test_security import TestSecurityCredentialProvider
+from .test_reconciliation import TestReconciliationEngine
+from .test_c2b_validation import TestBloomFilter, TestC2BValidationService
+from .test_dedup import TestCallbackDeduplicator
+from .test_sinks import TestBatchingWriter, TestSQLiteEventSink
+from .test_ledger import TestTransactionLedger
+from .test_concurrency import TestAdaptiveConcurrencyLimiter, TestClientConcurrencyLimit
+from .test_lanes import TestLaneScheduler, TestClientLanes
+from .test_warmup import TestWarmUp
+from .test_cli import TestCLI
+from .test_checkpoint import TestBatchCheckpoint, TestRunBatch
+from .test_scheduler import TestPaymentScheduler
+from .test_preparation import TestPrepareBatch, TestSendPrepared
+from .test_streaming import TestStreamRequests, TestClientStreaming
+from .test_recording import TestTrafficRecorder
+from .test_config_sources import TestConfigSources, TestConfigWatcher
+from .test_routing import TestEndpointRouter, TestClientFailover
+from .test_transport import TestHTTP2Transport, TestCreateTransport
+from .test_diagnostics import TestSlowRequestProfiler, TestClientProfiling
 # Versioning information
 __version__ = "1.0.0"
 
 # Public API surface
-__all__ = ["TestMPESAClient", "TestConfiguration", "TestAuthentication", "TestUtils", "TestExceptions"]
\ No newline at end of file
+__all__ = ["TestMPESAClient", "TestConfiguration", "TestAuthentication", "TestUtils", "TestExceptions", "TestClientPool", "TestDeadline", "TestDeadlinePropagation",
+           "TestRequestHedger", "TestClientHedging",
+           "TestSecurityCredentialProvider", "TestReconciliationEngine",
+           "TestBloomFilter", "TestC2BValidationService", "TestCallbackDeduplicator",
+           "TestBatchingWriter", "TestSQLiteEventSink", "TestTransactionLedger",
+           "TestAdaptiveConcurrencyLimiter", "TestClientConcurrencyLimit",
+           "TestLaneScheduler", "TestClientLanes", "TestWarmUp", "TestCLI",
+           "TestBatchCheckpoint", "TestRunBatch", "TestPaymentScheduler",
+           "TestPrepareBatch", "TestSendPrepared", "TestStreamRequests", "TestClientStreaming",
+           "TestTrafficRecorder", "TestConfigSources", "TestConfigWatcher",
+           "TestEndpointRouter", "TestClientFailover", "TestHTTP2Transport", "TestCreateTransport",
+           "TestSlowRequestProfiler", "TestClientProfiling"]
\ No newline at end of file
@@ -18,6 +18,7 @@ class TestAuthentication(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.text = '{"access_token": "mock_access_token", "expires_in": 3600}'
+        mock_response.content = mock_response.text.encode()
         mock_request.return_value = mock_response
         
         # Act
@@ -49,5 +50,37 @@ class TestAuthentication(unittest.TestCase):
         with self.assertRaises(MPESAError):
             auth._refresh_access_token()
 
+    @patch('safaricom_sdk.auth.requests.request')
+    def test_missing_access_token(self, mock_request):
+        config = Configuration(consumer_key='test_key', consumer_secret='test_secret', timeout=5)
+        auth = Authentication(config)
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b'{"expires_in": "3599"}'
+        mock_request.return_value = mock_response
+
+        with self.assertRaises(MPESAError):
+            auth.get_access_token()
+
+        # String expiry values from the API are accepted
+        mock_response.content = b'{"access_token": "token", "expires_in": "3599"}'
+        self.assertEqual(auth.get_access_token(), "token")
+
+    def test_token_cleared_by_config_update_mid_call(self):
+        config = Configuration(consumer_key='test_key', consumer_secret='test_secret')
+        auth = Authentication(config)
+        auth._access_token = "token"
+
+        class Expiry:
+            # Rotates the credentials (as another thread could) while the expiry is being checked
+            def __gt__(self, now):
+                auth.update_config(Configuration(consumer_key='new_key', consumer_secret='new_secret'))
+                return True
+
+        auth._token_expiry = Expiry()
+        self.assertEqual(auth.get_access_token(), "token")
+        self.assertIsNone(auth._access_token)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
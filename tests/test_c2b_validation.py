@@ -0,0 +1,102 @@
+# tests/test_c2b_validation.py
+import threading
+import unittest
+
+from safaricom_sdk.bloom import BloomFilter
+from safaricom_sdk.exceptions import ConfigurationError
+from safaricom_sdk.c2b_validation import (
+    C2BValidationService, amount_range, valid_msisdn,
+    ACCEPT, REJECT_INVALID_ACCOUNT, REJECT_INVALID_AMOUNT, REJECT_INVALID_MSISDN
+)
+
+
+def payment(account, amount='100.00', msisdn='251712345678'):
+    return {'TransID': 'T1', 'TransAmount': amount, 'BillRefNumber': account, 'MSISDN': msisdn}
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_membership(self):
+        bloom = BloomFilter.from_iterable((f'ACC-{i}' for i in range(1000)), capacity=1000, error_rate=0.01)
+        self.assertTrue(all(f'ACC-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'OTHER-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        # Count is approximate: an insert that collides looks like a duplicate
+        self.assertGreater(len(bloom), 980)
+
+
+class TestC2BValidationService(unittest.TestCase):
+    def setUp(self):
+        self.accounts = ['ACC-001', 'acc-002 ']
+        self.service = C2BValidationService(lambda: self.accounts)
+        self.service.refresh()
+
+    def test_accepts_known_accounts(self):
+        self.assertEqual(self.service.decide(payment('acc-001')), ACCEPT)
+        self.assertEqual(self.service.decide(payment('ACC-002')), ACCEPT)
+        self.assertEqual(self.service.handle(payment('ACC-404')), {'ResultCode': 'C2B00012', 'ResultDesc': 'Invalid Account Number'})
+
+        stats = self.service.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertEqual((stats['accepted'], stats['rejected']), (2, 1))
+        self.assertIn('latency_p99_us', stats)
+
+    def test_refresh_swaps_index(self):
+        self.accounts = ['ACC-003']
+        self.assertEqual(self.service.refresh(), 1)
+        self.assertEqual(self.service.decide(payment('ACC-001')), REJECT_INVALID_ACCOUNT)
+        self.assertEqual(self.service.decide(payment('ACC-003')), ACCEPT)
+
+    def test_failed_refresh_keeps_previous_index(self):
+        def broken():
+            raise ConnectionError('database unavailable')
+        self.service.loader = broken
+
+        self.assertEqual(self.service.refresh(), -1)
+        self.assertEqual(self.service.decide(payment('ACC-001')), ACCEPT)
+        self.assertEqual(self.service.stats()['refresh_failures'], 1)
+
+    def test_rules_run_first(self):
+        self.service.add_rule(amount_range(minimum=10, maximum=1000))
+        self.service.add_rule(valid_msisdn)
+
+        self.assertEqual(self.service.decide(payment('ACC-001', amount='5')), REJECT_INVALID_AMOUNT)
+        self.assertEqual(self.service.decide(payment('ACC-001', msisdn='123')), REJECT_INVALID_MSISDN)
+        self.assertEqual(self.service.decide(payment('ACC-001')), ACCEPT)
+
+    def test_non_finite_amounts_rejected(self):
+        self.service.add_rule(amount_range(minimum=10))
+        for amount in ('NaN', 'inf', '-inf'):
+            self.assertEqual(self.service.decide(payment('ACC-001', amount=amount)), REJECT_INVALID_AMOUNT)
+
+    def test_bloom_index_streams_loader(self):
+        def loader():
+            return (f'ACC-{i}' for i in range(5000))
+
+        service = C2BValidationService(loader, use_bloom=True, bloom_capacity=5000)
+        self.assertEqual(service.refresh(), 5000)
+        self.assertEqual(service.stats()['index'], 'bloom')
+        self.assertEqual(service._accounts.capacity, 5000)
+        self.assertEqual(service.decide(payment('acc-42')), ACCEPT)
+
+        # A sized result provides its own capacity; an unsized one needs bloom_capacity
+        sized = C2BValidationService(lambda: ['ACC-1', 'ACC-2'], use_bloom=True)
+        self.assertEqual(sized.refresh(), 2)
+        with self.assertRaises(ConfigurationError):
+            C2BValidationService(loader, use_bloom=True).refresh()
+
+    def test_counters_are_consistent_under_concurrency(self):
+        def decide_many():
+            for _ in range(2000):
+                self.service.decide(payment('ACC-001'))
+
+        threads = [threading.Thread(target=decide_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.service.stats()
+        self.assertEqual((stats['hits'], stats['accepted']), (8000, 8000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+# tests/test_checkpoint.py
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from safaricom_sdk.checkpoint import BatchCheckpoint, is_ambiguous
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import APIError, MPESAError
+
+
+class TestBatchCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "batch.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_high_water_mark_with_out_of_order_completion(self):
+        checkpoint = BatchCheckpoint(self.path, flush_every=1000, reserve_block=10)
+        checkpoint.reserve(0)
+        for index in (0, 1, 3, 4):
+            checkpoint.mark_done(index)
+        checkpoint.mark_failed(5, "invalid phone")
+        checkpoint.flush()
+
+        with open(self.path) as f:
+            state = json.load(f)
+        self.assertEqual(state["high_water"], 2)
+        self.assertEqual(state["done_above"], [3, 4, 5])
+        self.assertEqual(state["dispatched"], 1)
+        self.assertEqual(state["reserved"], 10)
+        self.assertEqual(state["failed"], {"5": "invalid phone"})
+
+    def test_writes_are_batched(self):
+        checkpoint = BatchCheckpoint(self.path, flush_every=100, flush_interval=60, reserve_block=1000)
+        checkpoint.reserve(0)
+        for index in range(1000):
+            checkpoint.mark_done(index)
+        self.assertLessEqual(checkpoint.writes, 11)
+        checkpoint.finish(1000)
+        self.assertEqual(BatchCheckpoint(self.path).resume_index, 1000)
+
+    def test_crash_mid_block(self):
+        checkpoint = BatchCheckpoint(self.path, flush_every=1000, reserve_block=10)
+        for index in range(5):
+            checkpoint.reserve(index)
+        for index in range(3):
+            checkpoint.mark_done(index)
+        checkpoint.flush()
+
+        # Hard crash: the whole reserved block may have been sent
+        crashed = BatchCheckpoint(self.path)
+        self.assertEqual([i for i in range(12) if crashed.was_interrupted(i)], list(range(3, 10)))
+
+        # Orderly stop: only the dispatched rows may have been; the rest of the block is pending
+        checkpoint.release()
+        stopped = BatchCheckpoint(self.path)
+        self.assertEqual([i for i in range(12) if stopped.was_interrupted(i)], [3, 4])
+        self.assertEqual(stopped.resume_index, 3)
+
+    def test_is_ambiguous(self):
+        self.assertTrue(is_ambiguous(APIError("boom", status_code=503)))
+        self.assertFalse(is_ambiguous(APIError("bad", status_code=400)))
+        try:
+            try:
+                raise requests.exceptions.ReadTimeout()
+            except requests.exceptions.RequestException as e:
+                raise MPESAError(str(e))
+        except MPESAError as error:
+            self.assertTrue(is_ambiguous(error))
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "batch.ckpt")
+        self.client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_never_resends(self):
+        sent = []
+
+        def crash_after_30(n):
+            if n == 30:
+                raise KeyboardInterrupt()
+            sent.append(n)
+            return n
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.client.run_batch(range(100), crash_after_30, checkpoint=self.path, parallel=1)
+        first_run = list(sent)
+
+        interrupted = []
+        result = self.client.run_batch(
+            range(100), lambda n: sent.append(n) or n, checkpoint=self.path, parallel=4,
+            on_result=lambda i, item, response, error: error is not None and interrupted.append(i)
+        )
+        self.assertEqual(len(sent), len(set(sent)))          # nothing sent twice
+        self.assertEqual(sorted(sent + interrupted), list(range(100)))
+        self.assertIn(30, interrupted)
+        self.assertEqual(result.resumed_from, len(first_run))
+        self.assertEqual(result.uncertain, len(interrupted))
+
+        # A completed batch resumes at its end
+        again = self.client.run_batch(range(100), lambda n: self.fail("resent"), checkpoint=self.path)
+        self.assertEqual(again.skipped, 100)
+
+    def test_crash_mid_block_resends_unsent_rows(self):
+        sent = []
+
+        def crash_at_30(n):
+            if n == 30:
+                raise KeyboardInterrupt()
+            sent.append(n)
+            return n
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.client.run_batch(range(100), crash_at_30, checkpoint=self.path, parallel=1)
+        self.assertLess(max(sent), 63)  # stopped well inside the first reserved block
+
+        interrupted = []
+        self.client.run_batch(
+            range(100), lambda n: sent.append(n) or n, checkpoint=self.path, parallel=4,
+            on_result=lambda i, item, response, error: error is not None and interrupted.append(i)
+        )
+        self.assertEqual(interrupted, [30])
+        self.assertEqual(sorted(sent), [n for n in range(100) if n != 30])
+
+    def test_client_method_failures_are_classified(self):
+        self.client.auth._access_token = "token"
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        from safaricom_sdk.models import B2CRequest
+        request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+        responses = [
+            MagicMock(status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "ok"}'),
+            MagicMock(status_code=400, content=b'{"errorCode": "400.002.02"}'),
+            MagicMock(status_code=500, content=b'{}'),
+        ]
+        with patch('safaricom_sdk.client.requests.request', side_effect=responses):
+            result = self.client.run_batch([request] * 3, "process_b2c_payment", checkpoint=self.path, parallel=1)
+        self.assertEqual((result.succeeded, result.failed, result.uncertain), (1, 1, 1))
+        checkpoint = BatchCheckpoint(self.path)
+        self.assertEqual(list(checkpoint.failed), [1])
+        self.assertEqual(list(checkpoint.uncertain), [2])
+
+    def test_unreadable_success_body_does_not_abort_batch(self):
+        self.client.auth._access_token = "token"
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        from safaricom_sdk.models import B2CRequest
+        request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+        responses = [
+            MagicMock(status_code=200, content=b'<html>Service Unavailable</html>'),
+            MagicMock(status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "ok"}'),
+        ]
+        errors = []
+        with patch('safaricom_sdk.client.requests.request', side_effect=responses):
+            result = self.client.run_batch(
+                [request] * 2, "process_b2c_payment", checkpoint=self.path, parallel=1,
+                on_result=lambda i, item, response, error: error is not None and errors.append(error)
+            )
+        self.assertEqual((result.succeeded, result.failed, result.uncertain), (1, 0, 1))
+        self.assertIsInstance(errors[0], APIError)
+        self.assertEqual(list(BatchCheckpoint(self.path).uncertain), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
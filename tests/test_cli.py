@@ -0,0 +1,106 @@
+# tests/test_cli.py
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from safaricom_sdk.cli import main
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubServer  # noqa: E402
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().__enter__()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.common = ["--base-url", self.server.base_url, "--consumer-key", "k", "--consumer-secret", "s"]
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = main(self.common + list(argv))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def read_results(self, name):
+        with open(self.path(name)) as f:
+            return [json.loads(line) for line in f]
+
+    def test_token(self):
+        code, out, _ = self.run_cli("token")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["status"], "ok")
+
+    def test_bulk_b2c_with_checkpoint_resume(self):
+        with open(self.path("payouts.csv"), "w") as f:
+            f.write("phone,amount,remarks\n")
+            for i in range(20):
+                f.write(f"07123456{i:02d},{100 + i},Salary\n")
+            f.write("12345,100,Bad phone\n")
+
+        args = ["b2c", self.path("payouts.csv"), "--shortcode", "600000", "--initiator-name", "api_op",
+                "--security-credential", "cred", "--result-url", "https://r", "--timeout-url", "https://t",
+                "--parallel", "4", "--checkpoint", self.path("b2c.ckpt"), "--output", self.path("b2c.jsonl")]
+        code, _, err = self.run_cli(*args)
+        self.assertEqual(code, 0, err)
+        results = self.read_results("b2c.jsonl")
+        self.assertEqual(sum(r["status"] == "ok" for r in results), 20)
+        self.assertEqual([r["id"] for r in results if r["status"] == "invalid"], ["21"])
+
+        # Rerun skips every checkpointed row
+        code, _, err = self.run_cli(*args)
+        self.assertEqual(code, 0)
+        self.assertEqual(len(self.read_results("b2c.jsonl")), 21)
+        self.assertIn("skipped=21", err)
+
+    def test_non_finite_amounts_are_invalid_rows(self):
+        with open(self.path("payouts.csv"), "w") as f:
+            f.write("phone,amount\n0712345600,inf\n0712345601,nan\n0712345602,-inf\n0712345603,100\n")
+
+        code, _, err = self.run_cli(
+            "b2c", self.path("payouts.csv"), "--shortcode", "600000", "--initiator-name", "api_op",
+            "--security-credential", "cred", "--result-url", "https://r", "--timeout-url", "https://t",
+            "--output", self.path("b2c.jsonl")
+        )
+        self.assertEqual(code, 0, err)
+        statuses = {r["id"]: r["status"] for r in self.read_results("b2c.jsonl")}
+        self.assertEqual(statuses, {"1": "invalid", "2": "invalid", "3": "invalid", "4": "ok"})
+
+    def test_stk_push_then_reconcile(self):
+        with open(self.path("customers.csv"), "w") as f:
+            f.write("id,phone,amount,account_reference\n")
+            for i in range(5):
+                f.write(f"C{i},07123456{i:02d},10,INV-{i}\n")
+
+        stk = ["stk-push", self.path("customers.csv"), "--shortcode", "174379", "--passkey", "pk",
+               "--callback-url", "https://cb", "--output", self.path("stk.jsonl"), "--no-warm-up"]
+        self.assertEqual(self.run_cli(*stk)[0], 0)
+        reconcile = ["reconcile", self.path("stk.jsonl"), "--shortcode", "174379", "--passkey", "pk",
+                     "--output", self.path("status.jsonl"), "--no-warm-up"]
+        self.assertEqual(self.run_cli(*reconcile)[0], 0)
+
+        statuses = self.read_results("status.jsonl")
+        self.assertEqual(sorted(r["id"] for r in statuses), [f"C{i}" for i in range(5)])
+        self.assertTrue(all(r["status"] == "ok" for r in statuses))
+
+    def test_missing_passkey(self):
+        with open(self.path("customers.csv"), "w") as f:
+            f.write("phone,amount\n0712345678,10\n")
+        code, _, err = self.run_cli("stk-push", self.path("customers.csv"), "--shortcode", "174379",
+                                    "--passkey", "", "--callback-url", "https://cb")
+        self.assertEqual(code, 2)
+        self.assertIn("--passkey", err)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ import pytest
 
 from safaricom_sdk.client import MPESAClient
 from safaricom_sdk.config import Configuration
-from safaricom_sdk.exceptions import MPESAError
+from safaricom_sdk.exceptions import MPESAError, APIError
 from safaricom_sdk.models import (
     STKPushRequest, 
     C2BPaymentRequest, 
@@ -48,6 +48,7 @@ class TestMPESAClient(unittest.TestCase):
             "ResponseDescription": "Success",
             "CustomerMessage": "Request accepted"
         }
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
         mock_request.return_value = mock_response
 
         request = STKPushRequest(
@@ -79,6 +80,7 @@ class TestMPESAClient(unittest.TestCase):
             "OriginatorConversationID": "test_originator_id",
             "TransactionID": "test_transaction_id"
         }
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
         mock_request.return_value = mock_response
 
         request = C2BPaymentRequest(
@@ -109,6 +111,7 @@ class TestMPESAClient(unittest.TestCase):
             "OriginatorConversationID": "test_originator_id",
             "TransactionID": "test_transaction_id"
         }
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
         mock_request.return_value = mock_response
 
         request = B2CRequest(
@@ -134,6 +137,7 @@ class TestMPESAClient(unittest.TestCase):
             "errorCode": "400",
             "errorMessage": "Bad Request"
         }
+        mock_response.content = json.dumps(mock_response.json.return_value).encode()
         mock_request.return_value = mock_response
 
         request = STKPushRequest(
@@ -153,5 +157,35 @@ class TestMPESAClient(unittest.TestCase):
         with self.assertRaises(MPESAError):
             self.client.stk_push(request)  # Pass the request object directly
 
+    @patch('safaricom_sdk.client.requests.request')
+    def test_error_response_decoded_from_bytes(self, mock_request):
+        mock_response = MagicMock()
+        mock_response.status_code = 400
+        mock_response.content = b'{"errorCode": "400.002.02", "errorMessage": "Bad Request - Invalid Amount"}'
+        mock_request.return_value = mock_response
+
+        request = B2CRequest(
+            InitiatorName='your_initiator_name',
+            SecurityCredential='your_security_credential',
+            Amount=100,
+            PartyA='your_business_shortcode',
+            PartyB='recipient_phone_number',
+            Remarks='Payment for testing',
+            QueueTimeOutURL='your_timeout_url',
+            ResultURL='your_result_url'
+        )
+
+        with self.assertRaises(APIError) as ctx:
+            self.client.process_b2c_payment(request)
+        self.assertEqual(ctx.exception.response_code, "400.002.02")
+        self.assertEqual(ctx.exception.response_description, "Bad Request - Invalid Amount")
+
+        # Non-JSON error bodies (e.g. gateway HTML pages) still raise APIError
+        mock_response.status_code = 502
+        mock_response.content = b'<html>Bad Gateway</html>'
+        with self.assertRaises(APIError) as ctx:
+            self.client.process_b2c_payment(request)
+        self.assertIsNone(ctx.exception.response_code)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
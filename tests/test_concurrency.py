@@ -0,0 +1,123 @@
+# tests/test_concurrency.py
+import asyncio
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.concurrency import AdaptiveConcurrencyLimiter
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.deadline import deadline_scope
+from safaricom_sdk.exceptions import APIError, DeadlineExceededError, MPESAError
+from safaricom_sdk.models import B2CRequest
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    def test_additive_increase_when_healthy(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+        for _ in range(50):
+            slots = [limiter.acquire("/b2c") for _ in range(limiter.limit("/b2c"))]
+            for slot in slots:
+                slot.success()
+        self.assertEqual(limiter.limit("/b2c"), 4)
+
+    def test_multiplicative_decrease_on_overload(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16)
+        with self.assertRaises(requests.exceptions.Timeout):
+            with limiter.acquire("/stk"):
+                raise requests.exceptions.Timeout()
+        self.assertEqual(limiter.limit("/stk"), 8)
+
+        with self.assertRaises(APIError):
+            with limiter.acquire("/other"):
+                raise APIError("throttled", status_code=429)
+        self.assertEqual(limiter.limit("/other"), 8)
+
+        # Client errors say nothing about capacity
+        with self.assertRaises(APIError):
+            with limiter.acquire("/other"):
+                raise APIError("bad request", status_code=400)
+        self.assertEqual(limiter.limit("/other"), 8)
+        self.assertEqual(limiter.stats()["/stk"]["drops"], 1)
+
+    def test_endpoint_ceiling_and_waiting(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, endpoint_limits={"/b2c": 1})
+        slot = limiter.acquire("/b2c")
+        with self.assertRaises(MPESAError):
+            limiter.acquire("/b2c", timeout=0.01)
+
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(limiter.acquire("/b2c", timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(limiter.stats()["/b2c"]["waiting"], 1)
+        slot.success()
+        waiter.join()
+        self.assertEqual(len(acquired), 1)
+        self.assertEqual(limiter.stats()["/b2c"]["in_flight"], 1)
+
+    def test_wait_bounded_by_deadline(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        limiter.acquire("/stk")
+        with deadline_scope(0.01):
+            with self.assertRaises(DeadlineExceededError):
+                limiter.acquire("/stk")
+
+    def test_async_acquire(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            async with await limiter.acquire_async("/b2c"):
+                peak = max(peak, limiter.stats()["/b2c"]["in_flight"])
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(*(worker() for _ in range(10)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.stats()["/b2c"]["in_flight"], 0)
+        self.assertEqual(limiter.stats()["/b2c"]["successes"], 10)
+
+
+class TestClientConcurrencyLimit(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        self.client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"), limiter=self.limiter)
+        self.client.auth._access_token = "token"
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        self.request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                                  PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+
+    def test_sync_and_async_paths_feed_limiter(self):
+        body = {"ResponseCode": "0", "ResponseDescription": "Accepted", "ConversationID": "AG_1"}
+        ok = MagicMock(status_code=200, content=json.dumps(body).encode())
+        throttled = MagicMock(status_code=429, content=b'{"errorCode": "429.001.01"}')
+        endpoint = "/mpesa/b2c/v1/paymentrequest"
+
+        with patch('safaricom_sdk.client.requests.request', return_value=ok):
+            self.client.process_b2c_payment(self.request)
+
+            async def main():
+                return await asyncio.gather(*(self.client.process_b2c_payment_async(self.request) for _ in range(8)))
+            responses = asyncio.run(main())
+        self.assertEqual(len(responses), 8)
+        self.assertEqual(self.limiter.stats()[endpoint]["successes"], 9)
+        self.assertEqual(self.limiter.stats()[endpoint]["in_flight"], 0)
+
+        with patch('safaricom_sdk.client.requests.request', return_value=throttled):
+            with self.assertRaises(APIError):
+                self.client.process_b2c_payment(self.request)
+        self.assertEqual(self.limiter.stats()[endpoint]["drops"], 1)
+        self.assertLess(self.limiter.limit(endpoint), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
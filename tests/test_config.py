@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from safaricom_sdk.config import Configuration
+from safaricom_sdk.config import Configuration, FrozenConfiguration
 
 class TestConfiguration(unittest.TestCase):
     
@@ -19,5 +19,57 @@ class TestConfiguration(unittest.TestCase):
         self.assertEqual(token['access_token'], "mock_access_token")
         print("Mocked access token retrieved successfully:", token)
 
+    def test_endpoint_urls(self):
+        config = Configuration(consumer_key='test_key', consumer_secret='test_secret')
+        self.assertEqual(
+            config.get_token_url(),
+            'https://apisandbox.safaricom.et/v1/token/generate?grant_type=client_credentials'
+        )
+        self.assertEqual(config.get_stkpush_url(), 'https://apisandbox.safaricom.et/mpesa/stkpush/v1/processrequest')
+        self.assertEqual(
+            config.get_c2b_register_url_with_key(),
+            'https://apisandbox.safaricom.et/mpesa/c2b/v1/registerurl?apikey=test_key'
+        )
+
+    def test_frozen_configuration(self):
+        config = Configuration(consumer_key='test_key', consumer_secret='test_secret')
+        frozen = config.freeze()
+
+        self.assertIsInstance(frozen, FrozenConfiguration)
+        self.assertIs(frozen.freeze(), frozen)
+        for getter in ('get_auth_url', 'get_token_url', 'get_stkpush_url', 'get_stkpush_query_url', 'get_b2c_url',
+                       'get_c2b_register_url', 'get_c2b_register_url_with_key', 'get_c2b_payment_url'):
+            self.assertEqual(getattr(frozen, getter)(), getattr(config, getter)())
+
+        # Immutable and usable as a cache key
+        with self.assertRaises(Exception):
+            frozen.timeout = 10
+        self.assertEqual(hash(frozen), hash(config.freeze()))
+        self.assertEqual({frozen: 'client'}[config.freeze()], 'client')
+
+    def test_frozen_replace(self):
+        frozen = FrozenConfiguration(consumer_key='test_key', consumer_secret='test_secret')
+        changed = frozen.replace(base_url='https://api.example.com', timeout=10)
+
+        self.assertEqual(changed.timeout, 10)
+        self.assertEqual(changed.get_b2c_url(), 'https://api.example.com/mpesa/b2c/v1/paymentrequest')
+        self.assertNotEqual(frozen, changed)
+
+    def test_frozen_model_copy_rebuilds_urls(self):
+        frozen = FrozenConfiguration(consumer_key='test_key', consumer_secret='test_secret')
+        copied = frozen.model_copy(update={'base_url': 'https://api.example.com'})
+
+        self.assertEqual(copied.get_stkpush_url(), 'https://api.example.com/mpesa/stkpush/v1/processrequest')
+        self.assertEqual(frozen.model_copy().get_stkpush_url(), frozen.get_stkpush_url())
+
+    def test_frozen_equality_round_trip(self):
+        frozen = FrozenConfiguration(consumer_key='test_key', consumer_secret='test_secret')
+        thawed = Configuration(consumer_key='test_key', consumer_secret='test_secret')
+
+        for same in (frozen.replace(timeout=frozen.timeout), thawed.freeze(), frozen.model_copy(update={'timeout': 30})):
+            self.assertEqual(same, frozen)
+            self.assertEqual(hash(same), hash(frozen))
+        self.assertEqual(frozen.base_url, thawed.freeze().base_url)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
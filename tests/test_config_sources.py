@@ -0,0 +1,131 @@
+# tests/test_config_sources.py
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.config_sources import (
+    ConfigLoader, ConfigSource, ConfigWatcher, DotEnvSource, EnvSource, FileSource
+)
+from safaricom_sdk.exceptions import ConfigurationError
+
+
+class TestConfigSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.mtime = 1_700_000_000
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        # Distinct mtimes even on filesystems with coarse timestamps
+        self.mtime += 1
+        os.utime(path, (self.mtime, self.mtime))
+        return path
+
+    def test_incomplete_source_fails_at_construction(self):
+        class NoFingerprint(ConfigSource):
+            def load(self):
+                return {}
+
+        with self.assertRaises(TypeError):
+            NoFingerprint()
+
+    def test_precedence_and_coercion(self):
+        dotenv = self.write(".env", "MPESA_CONSUMER_KEY=from-dotenv\nMPESA_CONSUMER_SECRET=s\nMPESA_TIMEOUT=10\n")
+        toml = self.write("mpesa.toml", '[mpesa]\nconsumer_key = "from-toml"\ntimeout = 20\nverify_ssl = false\n')
+        environ = {"MPESA_TIMEOUT": "40", "APP_NAME": "payroll"}
+        config = ConfigLoader([DotEnvSource(dotenv), FileSource(toml), EnvSource(environ=environ)]).load()
+        self.assertEqual(config.consumer_key, "from-toml")
+        self.assertEqual(config.consumer_secret, "s")
+        self.assertEqual(config.timeout, 40)
+        self.assertFalse(config.verify_ssl)
+        self.assertEqual(config.app_name, "payroll")
+
+    def test_reload_only_when_a_source_changes(self):
+        path = self.write("mpesa.json", json.dumps({"consumer_key": "k", "consumer_secret": "s"}))
+        loader = ConfigLoader([FileSource(path)])
+        first = loader.load()
+        self.assertFalse(loader.changed())
+        self.assertIs(loader.load(), first)
+
+        self.write("mpesa.json", json.dumps({"consumer_key": "k", "consumer_secret": "s", "timeout": 5}))
+        self.assertTrue(loader.changed())
+        second = loader.load()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.timeout, 5)
+
+    def test_invalid_files(self):
+        with self.assertRaises(ConfigurationError):
+            FileSource(os.path.join(self.tmp.name, "mpesa.yaml"))
+        path = self.write("mpesa.json", json.dumps({"consumer_key": "k", "consumer_secret": "s", "colour": "red"}))
+        with self.assertRaises(ConfigurationError):
+            ConfigLoader([FileSource(path)]).load()
+        with self.assertRaises(ConfigurationError):
+            ConfigLoader([FileSource(os.path.join(self.tmp.name, "missing.json"), required=True)]).load()
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "mpesa.json")
+        self.mtime = 1_700_000_000
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, **fields):
+        with open(self.path, "w") as f:
+            json.dump(fields, f)
+        self.mtime += 1
+        os.utime(self.path, (self.mtime, self.mtime))
+
+    def test_swaps_config_into_live_clients(self):
+        self.write(consumer_key="k", consumer_secret="s", timeout=30)
+        client = MPESAClient(Configuration(consumer_key="old", consumer_secret="old"))
+        session = client.session = object()
+        changes = []
+        watcher = ConfigWatcher(ConfigLoader([FileSource(self.path)]), on_change=changes.append)
+        watcher.register(client)
+        self.assertEqual(client.config.consumer_key, "k")
+        self.assertIs(client.auth.config, client.config)
+
+        client.auth._access_token = "token"
+        client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        self.write(consumer_key="k", consumer_secret="s", timeout=5)
+        self.assertTrue(watcher.check())
+        self.assertEqual(client.config.timeout, 5)
+        self.assertEqual(client.auth._access_token, "token")  # same credentials: token kept
+        self.assertIs(client.session, session)
+        self.assertEqual(len(changes), 1)
+
+        self.write(consumer_key="rotated", consumer_secret="s2", timeout=5)
+        self.assertTrue(watcher.check())
+        self.assertIsNone(client.auth._access_token)
+        self.assertFalse(watcher.check())
+
+    def test_invalid_change_keeps_current_config(self):
+        self.write(consumer_key="k", consumer_secret="s")
+        client = MPESAClient(Configuration(consumer_key="old", consumer_secret="old"))
+        errors = []
+        watcher = ConfigWatcher(ConfigLoader([FileSource(self.path)]), on_error=errors.append)
+        watcher.register(client)
+        current = client.config
+
+        self.write(consumer_key="k", consumer_secret="s", timeout="soon")
+        self.assertFalse(watcher.check())
+        self.assertIs(client.config, current)
+        self.assertEqual(len(errors), 1)
+        self.assertFalse(watcher.check())  # reported once per change
+        self.assertEqual(watcher.errors, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
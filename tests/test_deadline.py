@@ -0,0 +1,115 @@
+# tests/test_deadline.py
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from safaricom_sdk.auth import Authentication
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.deadline import Deadline, current_deadline, deadline_scope, resolve_timeout
+from safaricom_sdk.exceptions import DeadlineExceededError, MPESAError
+from safaricom_sdk.models import B2CRequest
+
+
+class TestDeadline(unittest.TestCase):
+    def test_resolve_timeout_without_deadline(self):
+        self.assertEqual(resolve_timeout(30), 30)
+        self.assertEqual(resolve_timeout(30, connect=3.05), (3.05, 30))
+        self.assertEqual(resolve_timeout(30, connect=3, read=10), (3, 10))
+
+    def test_resolve_timeout_capped_by_deadline(self):
+        with deadline_scope(2.0):
+            connect, read = resolve_timeout(30, connect=5)
+        self.assertLessEqual(connect, 2.0)
+        self.assertLessEqual(read, 2.0)
+        self.assertGreater(read, 1.5)
+
+    def test_expired_deadline_raises(self):
+        with deadline_scope(Deadline.at(time.monotonic() - 1)):
+            with self.assertRaises(DeadlineExceededError):
+                resolve_timeout(30)
+
+    def test_nested_scope_only_tightens(self):
+        with deadline_scope(1.0) as outer:
+            with deadline_scope(60.0) as inner:
+                self.assertIs(inner, outer)
+            with deadline_scope(0.5) as tighter:
+                self.assertIs(current_deadline(), tighter)
+            self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+
+
+class TestDeadlinePropagation(unittest.TestCase):
+    def setUp(self):
+        self.config = Configuration(consumer_key='test_key', consumer_secret='test_secret', connect_timeout=3)
+        self.client = MPESAClient(self.config)
+        self.client.auth._access_token = 'token'
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        self.request = B2CRequest(
+            InitiatorName='initiator',
+            SecurityCredential='credential',
+            Amount=100,
+            PartyA='600000',
+            PartyB='251712345678',
+            Remarks='Payment for testing',
+            QueueTimeOutURL='https://example.com/timeout',
+            ResultURL='https://example.com/result'
+        )
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_split_timeouts_without_deadline(self, mock_request):
+        mock_request.return_value = MagicMock(
+            status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "Success"}'
+        )
+        self.client.process_b2c_payment(self.request)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (3, 30))
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_deadline_caps_request_timeout(self, mock_request):
+        mock_request.return_value = MagicMock(
+            status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "Success"}'
+        )
+        self.client.process_b2c_payment(self.request, deadline=1.0)
+        connect, read = mock_request.call_args.kwargs['timeout']
+        self.assertLessEqual(connect, 1.0)
+        self.assertLessEqual(read, 1.0)
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_timeout_after_deadline_raises_deadline_exceeded(self, mock_request):
+        def slow(**kwargs):
+            time.sleep(0.05)
+            raise requests.exceptions.ReadTimeout("read timed out")
+        mock_request.side_effect = slow
+
+        with self.assertRaises(DeadlineExceededError):
+            self.client.process_b2c_payment(self.request, deadline=0.01)
+
+    @patch('safaricom_sdk.auth.requests.request')
+    def test_token_refresh_uses_deadline(self, mock_request):
+        mock_request.return_value = MagicMock(
+            status_code=200, content=b'{"access_token": "fresh", "expires_in": 3600}'
+        )
+        auth = Authentication(self.config)
+        with deadline_scope(2.0):
+            self.assertEqual(auth.get_access_token(), 'fresh')
+        connect, read = mock_request.call_args.kwargs['timeout']
+        self.assertLessEqual(connect, 2.0)
+        self.assertLessEqual(read, 2.0)
+
+    def test_token_refresh_lock_respects_deadline(self):
+        auth = Authentication(self.config)
+        auth._refresh_lock.acquire()
+        try:
+            with deadline_scope(0.05):
+                with self.assertRaises(DeadlineExceededError):
+                    auth.get_access_token()
+        finally:
+            auth._refresh_lock.release()
+        self.assertTrue(issubclass(DeadlineExceededError, MPESAError))
+
+
+if __name__ == '__main__':
+    unittest.main()
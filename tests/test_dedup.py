@@ -0,0 +1,109 @@
+# tests/test_dedup.py
+import os
+import tempfile
+import unittest
+
+from safaricom_sdk.dedup import CallbackDeduplicator, callback_key
+
+
+STK_CALLBACK = {
+    "Body": {"stkCallback": {
+        "MerchantRequestID": "29115-34620561-1",
+        "CheckoutRequestID": "ws_CO_191220191020363925",
+        "ResultCode": 0,
+        "ResultDesc": "The service request is processed successfully."
+    }}
+}
+B2C_RESULT = {"Result": {"ResultType": 0, "ResultCode": 0, "ConversationID": "AG_20191219_00005797af5d7d75f652",
+                         "TransactionID": "NLJ41HAY6Q"}}
+C2B_CONFIRMATION = {"TransID": "RKTQDM7W6S", "TransAmount": "10", "BillRefNumber": "ACC-001"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCallbackDeduplicator(unittest.TestCase):
+    def test_callback_key(self):
+        self.assertEqual(callback_key(STK_CALLBACK), "stk:ws_CO_191220191020363925")
+        self.assertEqual(callback_key(B2C_RESULT), "b2c:AG_20191219_00005797af5d7d75f652")
+        self.assertEqual(callback_key(C2B_CONFIRMATION), "c2b:RKTQDM7W6S")
+        self.assertIsNone(callback_key({"unexpected": True}))
+
+    def test_wrap_drops_duplicates(self):
+        dedup = CallbackDeduplicator()
+        handled = []
+        handler = dedup.wrap(lambda payload: handled.append(payload) or "ok")
+
+        self.assertEqual(handler(STK_CALLBACK), "ok")
+        self.assertIsNone(handler(STK_CALLBACK))
+        self.assertEqual(handler(B2C_RESULT), "ok")
+        self.assertEqual(handler({"unexpected": True}), "ok")
+        self.assertEqual(len(handled), 3)
+        self.assertEqual(dedup.stats(), {"processed": 2, "duplicates": 1, "unkeyed": 1, "released": 0, "tracked": 2})
+
+    def test_failed_handler_lets_redelivery_through(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for options in ({}, {"sqlite_path": os.path.join(tmp, "dedup.db")},
+                            {"max_entries": 1, "bloom_capacity": 1000}):
+                dedup = CallbackDeduplicator(**options)
+                attempts = []
+
+                def handle(payload):
+                    attempts.append(payload)
+                    if len(attempts) == 1:
+                        raise RuntimeError("database unavailable")
+                    return "ok"
+
+                handler = dedup.wrap(handle)
+                with self.assertRaises(RuntimeError):
+                    handler(STK_CALLBACK)
+                self.assertEqual(handler(STK_CALLBACK), "ok", options)  # redelivery processed
+                self.assertIsNone(handler(STK_CALLBACK))                # later repeats still dropped
+                self.assertEqual(len(attempts), 2)
+                self.assertEqual(dedup.stats()["released"], 1)
+                dedup.close()
+
+    def test_window_expiry_and_memory_ceiling(self):
+        clock = FakeClock()
+        dedup = CallbackDeduplicator(window_seconds=60, max_entries=3, clock=clock)
+
+        self.assertFalse(dedup.seen("a"))
+        clock.now += 61
+        self.assertFalse(dedup.seen("a"))  # forgotten after the window
+
+        for key in ("b", "c", "d", "e"):
+            dedup.seen(key)
+        self.assertLessEqual(dedup.stats()["tracked"], 3)
+
+    def test_sqlite_backing_survives_restart(self):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            first = CallbackDeduplicator(sqlite_path=path, max_entries=1)
+            self.assertFalse(first.is_duplicate(C2B_CONFIRMATION))
+            self.assertFalse(first.seen("other"))  # pushes the key out of memory
+            self.assertTrue(first.is_duplicate(C2B_CONFIRMATION))
+            first.close()
+
+            restarted = CallbackDeduplicator(sqlite_path=path, bloom_capacity=1000)
+            self.assertTrue(restarted.is_duplicate(C2B_CONFIRMATION))
+            self.assertFalse(restarted.seen("new-key"))
+            restarted.close()
+        finally:
+            os.remove(path)
+
+    def test_bloom_without_sqlite(self):
+        dedup = CallbackDeduplicator(max_entries=1, bloom_capacity=1000)
+        self.assertFalse(dedup.seen("a"))
+        self.assertFalse(dedup.seen("b"))
+        # Out of the exact window but still in the filter
+        self.assertTrue(dedup.seen("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
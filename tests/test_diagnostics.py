@@ -0,0 +1,134 @@
+# tests/test_diagnostics.py
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.diagnostics import SlowRequestProfiler
+from safaricom_sdk.exceptions import MPESAError
+from safaricom_sdk.models import B2CRequest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubServer  # noqa: E402
+
+B2C = B2CRequest(
+    InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+    PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r"
+)
+
+
+class TestSlowRequestProfiler(unittest.TestCase):
+    def test_rate_limit_and_ring_buffer(self):
+        profiler = SlowRequestProfiler(threshold=0.0, capacity=2, rate=0.0, burst=3)
+        for i in range(5):
+            with profiler.trace("POST", f"https://x/{i}"):
+                pass
+        reports = profiler.dump()
+        self.assertEqual([r["url"] for r in reports], ["https://x/1", "https://x/2"])
+        self.assertEqual(profiler.stats(), {
+            "requests": 5, "slow": 5, "suppressed": 2, "buffered": 2, "in_flight_sampled": 0
+        })
+
+        profiler.rate = 1000.0
+        time.sleep(0.01)
+        with profiler.trace("POST", "https://x/5"):
+            pass
+        self.assertEqual(profiler.dump()[-1]["suppressed_before"], 2)
+
+    def test_fast_requests_are_not_reported(self):
+        profiler = SlowRequestProfiler(threshold=10.0)
+        with profiler.trace("POST", "https://x") as trace:
+            trace.mark("token")
+        self.assertEqual(profiler.dump(), [])
+        self.assertEqual(profiler.stats()["requests"], 1)
+
+    def test_samples_stacks_of_slow_requests(self):
+        profiler = SlowRequestProfiler(threshold=0.05, sample_stacks=True, sample_interval=0.005)
+        try:
+            with profiler.trace("POST", "https://x") as trace:
+                trace.mark("token")
+                trace.mark("slot_wait")
+                time.sleep(0.15)
+        finally:
+            profiler.close()
+        report = profiler.dump()[0]
+        self.assertGreater(report["samples"], 0)
+        top = report["stacks"][0]
+        self.assertEqual(top["phase"], "send")
+        self.assertIn("test_samples_stacks_of_slow_requests", top["frames"][-1])
+
+    def test_finished_request_is_not_sampled(self):
+        profiler = SlowRequestProfiler(threshold=0, sample_stacks=True, sample_interval=3600, sample_after=0)
+        self.addCleanup(profiler.close)
+        trace = profiler.trace("POST", "https://x")
+        current_frames = sys._current_frames
+
+        def finish_then_sample():
+            # The request completes while the sampler is walking stacks
+            trace.__exit__(None, None, None)
+            return current_frames()
+
+        with patch("safaricom_sdk.diagnostics.sys._current_frames", finish_then_sample):
+            profiler._sample_once()
+        self.assertTrue(trace.finished)
+        self.assertEqual(trace.sample_count, 0)
+        self.assertEqual(profiler.dump()[0]["samples"], 0)
+
+    def test_dump_to_file(self):
+        profiler = SlowRequestProfiler(threshold=0.0)
+        with self.assertRaises(ValueError):
+            with profiler.trace("POST", "https://x"):
+                raise ValueError("boom")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "slow.jsonl")
+            profiler.dump(path, clear=True)
+            with open(path) as f:
+                reports = [json.loads(line) for line in f]
+        self.assertEqual(reports[0]["error"], "ValueError: boom")
+        self.assertEqual(profiler.dump(), [])
+
+
+class TestClientProfiling(unittest.TestCase):
+    def test_phase_breakdown_of_slow_request(self):
+        profiler = SlowRequestProfiler(threshold=0.1)
+        with StubServer(latency=0.06) as server:
+            client = MPESAClient(
+                Configuration(consumer_key="k", consumer_secret="s", base_url=server.base_url),
+                profiler=profiler
+            )
+            client.process_b2c_payment(B2C)  # token fetch + payment, both slow
+            client.process_b2c_payment(B2C)  # cached token, under the threshold
+
+        self.assertEqual(profiler.stats()["requests"], 2)
+        [report] = profiler.dump()
+        self.assertTrue(report["url"].endswith("/mpesa/b2c/v1/paymentrequest"))
+        self.assertEqual((report["status"], report["attempts"], report["error"]), (200, 1, None))
+        phases = report["phases"]
+        self.assertGreaterEqual(phases["token_ms"], 60)
+        self.assertGreaterEqual(phases["send_ms"], 60)
+        self.assertLess(phases["parse_ms"], 50)
+
+    def test_failed_request_is_reported(self):
+        profiler = SlowRequestProfiler(threshold=0.0)
+        with StubServer() as server:
+            client = MPESAClient(
+                Configuration(consumer_key="k", consumer_secret="s", base_url=server.base_url + "/missing"),
+                profiler=profiler
+            )
+            client.auth._access_token = "token"
+            client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+            with self.assertRaises(MPESAError):
+                client.process_b2c_payment(B2C)
+        [report] = profiler.dump()
+        self.assertEqual(report["status"], 404)
+        self.assertTrue(report["error"].startswith("APIError"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# tests/test_hedging.py
+import itertools
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import APIError, MPESAError
+from safaricom_sdk.hedging import RequestHedger
+from safaricom_sdk.models import STKPushQueryRequest, STKPushRequest
+
+
+class TestRequestHedger(unittest.TestCase):
+    def setUp(self):
+        self.hedger = RequestHedger(initial_delay=0.02, max_extra_load=1.0)
+
+    def tearDown(self):
+        self.hedger.close()
+
+    def test_fast_response_is_not_hedged(self):
+        calls = []
+        self.assertEqual(self.hedger.run("op", lambda: calls.append(1) or "ok"), "ok")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.hedger.stats()["hedges"], 0)
+
+    def test_slow_primary_loses_to_hedge(self):
+        attempt = itertools.count()
+
+        def call():
+            if next(attempt) == 0:
+                time.sleep(0.5)
+                return "primary"
+            return "hedge"
+
+        start = time.monotonic()
+        self.assertEqual(self.hedger.run("op", call), "hedge")
+        self.assertLess(time.monotonic() - start, 0.4)
+        stats = self.hedger.stats()
+        self.assertEqual(stats["hedges"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    def test_budget_caps_extra_load(self):
+        hedger = RequestHedger(initial_delay=0.01, max_extra_load=0.0)
+        calls = []
+
+        def call():
+            calls.append(1)
+            time.sleep(0.05)
+            return "ok"
+
+        try:
+            self.assertEqual(hedger.run("op", call), "ok")
+        finally:
+            hedger.close()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(hedger.stats()["budget_denied"], 1)
+
+    def test_transport_failure_falls_back_to_other_attempt(self):
+        attempt = itertools.count()
+
+        def call():
+            if next(attempt) == 0:
+                time.sleep(0.1)
+                raise MPESAError("connection reset")
+            time.sleep(0.2)
+            return "hedge"
+
+        self.assertEqual(self.hedger.run("op", call), "hedge")
+
+    def test_api_error_is_a_response(self):
+        def call():
+            raise APIError("API request failed: 400", response_code="400")
+
+        with self.assertRaises(APIError):
+            self.hedger.run("op", call)
+
+    def test_delay_tracks_latency_percentile(self):
+        hedger = RequestHedger(percentile=50, min_samples=5, min_delay=0.0)
+        for latency in (0.1, 0.2, 0.3, 0.4, 0.5):
+            hedger._record("op", latency)
+        self.assertEqual(hedger.hedge_delay("op"), 0.3)
+        self.assertEqual(hedger.hedge_delay("other"), hedger.initial_delay)
+
+
+class TestClientHedging(unittest.TestCase):
+    def setUp(self):
+        self.hedger = RequestHedger(initial_delay=0.02, max_extra_load=1.0)
+        self.client = MPESAClient(
+            Configuration(consumer_key='test_key', consumer_secret='test_secret'),
+            hedger=self.hedger
+        )
+        self.client.auth._access_token = 'token'
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+
+    def tearDown(self):
+        self.hedger.close()
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_stk_push_query_is_hedged(self, mock_request):
+        lock = threading.Lock()
+        attempts = []
+
+        def respond(**kwargs):
+            with lock:
+                attempts.append(kwargs['url'])
+                first = len(attempts) == 1
+            if first:
+                time.sleep(0.5)
+            return MagicMock(status_code=200, content=json.dumps({
+                "ResponseCode": "0",
+                "ResponseDescription": "Accepted",
+                "CheckoutRequestID": "ws_CO_1",
+                "ResultCode": "0",
+                "ResultDesc": "Processed"
+            }).encode())
+        mock_request.side_effect = respond
+
+        response = self.client.stk_push_query(STKPushQueryRequest(
+            BusinessShortCode='174379', Password='pw', Timestamp='20240101120000', CheckoutRequestID='ws_CO_1'
+        ))
+        self.assertEqual(response.ResultCode, "0")
+        self.assertEqual(len(attempts), 2)
+        self.assertTrue(attempts[0].endswith('/mpesa/stkpushquery/v1/query'))
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_stk_push_is_never_hedged(self, mock_request):
+        def respond(**kwargs):
+            time.sleep(0.2)
+            return MagicMock(status_code=200, content=json.dumps({
+                "MerchantRequestID": "m-1",
+                "CheckoutRequestID": "ws_CO_1",
+                "ResponseCode": "0",
+                "ResponseDescription": "Accepted",
+                "CustomerMessage": "Accepted"
+            }).encode())
+        mock_request.side_effect = respond
+
+        self.client.stk_push(STKPushRequest(
+            MerchantRequestID='m-1',
+            BusinessShortCode='174379',
+            Password='pw',
+            Timestamp='20240101120000',
+            Amount='100',
+            PartyA='251712345678',
+            PartyB='174379',
+            PhoneNumber='251712345678',
+            TransactionDesc='Payment for testing',
+            CallBackURL='https://example.com/callback',
+            AccountReference='ref'
+        ))
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(self.hedger.stats()["hedges"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_lanes.py
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import DeadlineExceededError, MPESAError
+from safaricom_sdk.lanes import Lane, LaneScheduler
+from safaricom_sdk.models import B2CRequest
+
+
+class TestLaneScheduler(unittest.TestCase):
+    def test_reserved_capacity_for_interactive(self):
+        release = threading.Event()
+        scheduler = LaneScheduler(workers=3, lanes=[Lane("interactive", weight=8, reserved=1), Lane("bulk", weight=1)])
+        bulk = [scheduler.submit("bulk", release.wait, 5) for _ in range(20)]
+        time.sleep(0.05)
+        self.assertEqual(scheduler.stats()["bulk"]["running"], 2)
+
+        started = time.monotonic()
+        self.assertEqual(scheduler.submit("interactive", lambda: "checkout").result(timeout=1), "checkout")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+        release.set()
+        for future in bulk:
+            future.result(timeout=5)
+        scheduler.close()
+        stats = scheduler.stats()
+        self.assertEqual(stats["bulk"]["completed"], 20)
+        self.assertIn("wait_p95_ms", stats["interactive"])
+
+    def test_weighted_fair_order(self):
+        gate = threading.Event()
+        order = []
+        scheduler = LaneScheduler(workers=1, lanes=[Lane("a", weight=3), Lane("b", weight=1)])
+        scheduler.submit("a", gate.wait)
+        time.sleep(0.02)
+        for _ in range(8):
+            scheduler.submit("a", order.append, "a")
+            scheduler.submit("b", order.append, "b")
+        gate.set()
+        scheduler.close()
+        # Weight 3:1 -> "a" gets three of every four dispatches while both are backlogged
+        self.assertEqual(order[:8].count("a"), 6)
+
+    def test_queue_limit_and_unknown_lane(self):
+        gate = threading.Event()
+        scheduler = LaneScheduler(workers=1, lanes=[Lane("bulk", max_queue=1)])
+        scheduler.submit("bulk", gate.wait)
+        time.sleep(0.02)
+        scheduler.submit("bulk", lambda: None)
+        with self.assertRaises(MPESAError):
+            scheduler.submit("bulk", lambda: None)
+        with self.assertRaises(ValueError):
+            scheduler.submit("missing", lambda: None)
+        self.assertEqual(scheduler.stats()["bulk"]["rejected"], 1)
+        gate.set()
+        scheduler.close()
+
+
+class TestClientLanes(unittest.TestCase):
+    def test_submit_b2c_on_bulk_lane(self):
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"), scheduler=LaneScheduler(workers=4))
+        client.auth._access_token = "token"
+        client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+        body = {"ResponseCode": "0", "ResponseDescription": "Accepted", "ConversationID": "AG_1"}
+        response = MagicMock(status_code=200, content=json.dumps(body).encode())
+
+        with patch('safaricom_sdk.client.requests.request', return_value=response):
+            futures = [client.submit_b2c_payment(request) for _ in range(10)]
+            self.assertTrue(all(f.result(timeout=5).ConversationID == "AG_1" for f in futures))
+            expired = client.submit_b2c_payment(request, deadline=0)
+            with self.assertRaises(DeadlineExceededError):
+                expired.result(timeout=5)
+        self.assertEqual(client.scheduler.stats()["bulk"]["completed"], 10)
+        client.scheduler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_ledger.py
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.ledger import TransactionLedger
+from safaricom_sdk.models import STKPushRequest
+from safaricom_sdk.sinks import Event
+
+
+STK_CALLBACK = {
+    "Body": {"stkCallback": {
+        "MerchantRequestID": "29115-34620561-1",
+        "CheckoutRequestID": "ws_CO_191220191020363925",
+        "ResultCode": 0,
+        "ResultDesc": "The service request is processed successfully.",
+        "CallbackMetadata": {"Item": [
+            {"Name": "Amount", "Value": 1.00},
+            {"Name": "MpesaReceiptNumber", "Value": "NLJ7RT61SV"},
+            {"Name": "PhoneNumber", "Value": 251712345678}
+        ]}
+    }}
+}
+
+
+class TestTransactionLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = TransactionLedger(":memory:")
+
+    def tearDown(self):
+        self.ledger.close()
+
+    def test_client_and_callback_populate_ledger(self):
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"), ledger=self.ledger)
+        client.auth._access_token = "token"
+        client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        body = {
+            "MerchantRequestID": "29115-34620561-1",
+            "CheckoutRequestID": "ws_CO_191220191020363925",
+            "ResponseCode": "0",
+            "ResponseDescription": "Success. Request accepted for processing",
+            "CustomerMessage": "Success. Request accepted for processing"
+        }
+        response = MagicMock(status_code=200, content=json.dumps(body).encode())
+        request = STKPushRequest(
+            MerchantRequestID="29115-34620561-1", BusinessShortCode="174379", Password="pw",
+            Timestamp="20240101120000", Amount="1", PartyA="251712345678", PartyB="174379",
+            PhoneNumber="251712345678", TransactionDesc="Test", CallBackURL="https://cb", AccountReference="ACC"
+        )
+        with patch('safaricom_sdk.client.requests.request', return_value=response):
+            client.stk_push(request)
+        self.ledger.record_callback(STK_CALLBACK)
+
+        rows = self.ledger.find(checkout_request_id="ws_CO_191220191020363925")
+        self.assertEqual([r["kind"] for r in rows], ["stk_push", "stk_callback"])
+        latest = self.ledger.latest(merchant_request_id="29115-34620561-1")
+        self.assertEqual(latest["kind"], "stk_callback")
+        self.assertEqual(latest["transaction_id"], "NLJ7RT61SV")
+        self.assertEqual(len(self.ledger.for_phone("0712345678", since=time.time() - 60)), 2)
+
+    def test_monthly_partitions_and_export(self):
+        january = datetime(2024, 1, 15).timestamp()
+        february = datetime(2024, 2, 15).timestamp()
+        events = [
+            Event("b2c_payment", None, {"ConversationID": f"AG_{i}", "PartyB": "251712345678", "Amount": i},
+                  january if i < 3 else february)
+            for i in range(5)
+        ]
+        self.ledger.write_batch(events)
+        self.ledger.record_callback({"Result": {"ConversationID": "AG_4", "ResultCode": 0, "ResultDesc": "OK"}})
+
+        self.assertEqual(self.ledger.latest(conversation_id="AG_4")["kind"], "b2c_result")
+        self.assertEqual(len(self.ledger.find(phone="251712345678", until=february)), 3)
+        exported = list(self.ledger.export(kind="b2c_payment", batch_size=2))
+        self.assertEqual([r["conversation_id"] for r in exported], [f"AG_{i}" for i in range(5)])
+
+        dropped = self.ledger.drop_before(february)
+        self.assertEqual(dropped, ["mpesa_ledger_202401"])
+        self.assertIsNone(self.ledger.latest(conversation_id="AG_0"))
+
+    def test_in_memory_export_reads_each_partition_under_the_lock(self):
+        now = time.time()
+        self.ledger.write_batch([Event("c2b_payment", None, {"TransactionID": str(i)}, now) for i in range(3)])
+
+        export = self.ledger.export(batch_size=1)
+        self.assertEqual(next(export)["transaction_id"], "0")
+        self.ledger.write_batch([Event("c2b_payment", None, {"TransactionID": "late"}, now + 1)])
+
+        self.assertEqual([r["transaction_id"] for r in export], ["1", "2"])
+
+    def test_file_backed_export_streams(self):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            ledger = TransactionLedger(path)
+            ledger.write_batch([Event("c2b_payment", None, {"TransactionID": str(i)}, time.time()) for i in range(10)])
+            self.assertEqual(sum(1 for _ in ledger.export()), 10)
+            ledger.close()
+            self.assertEqual(len(TransactionLedger(path).find(transaction_id="7")), 1)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def test_rejects_unknown_lookup(self):
+        with self.assertRaises(ValueError):
+            self.ledger.find(amount="10")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_pool.py
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from safaricom_sdk.pool import ClientPool
+from safaricom_sdk.config import Configuration
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ClientPool(max_tenants=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuses_client_per_tenant(self):
+        first = self.pool.get('key_a', 'secret_a', shortcode='600001')
+        second = self.pool.get('key_a', 'secret_a', shortcode='600001')
+        other = self.pool.get('key_a', 'secret_a', shortcode='600002')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(first.config.shortcode, '600001')
+        self.assertEqual(self.pool.stats()['hits'], 1)
+        self.assertEqual(self.pool.stats()['misses'], 2)
+
+    def test_shares_session_per_base_url(self):
+        a = self.pool.get('key_a', 'secret_a')
+        b = self.pool.get('key_b', 'secret_b')
+        c = self.pool.get('key_c', 'secret_c', base_url='https://api.example.com')
+
+        self.assertIs(a.session, b.session)
+        self.assertIs(a.auth.session, a.session)
+        self.assertIsNot(a.session, c.session)
+
+    def test_lru_eviction(self):
+        a = self.pool.get('key_a', 'secret_a')
+        self.pool.get('key_b', 'secret_b')
+        self.pool.get('key_a', 'secret_a')  # a is now most recently used
+        self.pool.get('key_c', 'secret_c')  # evicts b
+
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self.pool.stats()['evictions'], 1)
+        self.assertIs(self.pool.get('key_a', 'secret_a'), a)
+        self.pool.get('key_b', 'secret_b')
+        self.assertEqual(self.pool.stats()['misses'], 4)
+
+    def test_get_for_config(self):
+        config = Configuration(consumer_key='key_a', consumer_secret='secret_a', shortcode='600001')
+        client = self.pool.get_for_config(config)
+        self.assertIs(self.pool.get_for_config(config), client)
+        self.assertIs(client.config, config)
+
+    def test_evict(self):
+        self.pool.get('key_a', 'secret_a', shortcode='600001')
+        self.pool.get('key_a', 'secret_a', shortcode='600002')
+        self.assertEqual(self.pool.evict('key_a', shortcode='600001'), 1)
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(self.pool.stats()['evictions'], 1)
+
+    def test_different_overrides_get_different_clients(self):
+        default = self.pool.get('key_a', 'secret_a', shortcode='600001')
+        slow = self.pool.get('key_a', 'secret_a', shortcode='600001', timeout=90)
+
+        self.assertIsNot(default, slow)
+        self.assertEqual(slow.config.timeout, 90)
+        self.assertIs(self.pool.get('key_a', 'secret_a', shortcode='600001', timeout=90), slow)
+        self.assertIs(self.pool.get('key_a', 'secret_a', shortcode='600001'), default)
+
+    def test_get_and_get_for_config_share_a_tenant(self):
+        client = self.pool.get('key_a', 'secret_a', shortcode='600001')
+        config = Configuration(consumer_key='key_a', consumer_secret='secret_a')
+
+        self.assertIs(self.pool.get_for_config(config, shortcode='600001'), client)
+        self.assertIs(
+            self.pool.get_for_config(Configuration(consumer_key='key_a', consumer_secret='secret_a', shortcode='600001')),
+            client,
+        )
+        self.assertEqual(len(self.pool), 1)
+
+        with ClientPool(defaults={'shortcode': '600002'}) as pool:
+            client = pool.get('key_a', 'secret_a')
+            self.assertEqual(client.config.shortcode, '600002')
+            self.assertIs(pool.get_for_config(config, shortcode='600002'), client)
+
+    def test_refresh_tokens_only_when_expiring(self):
+        fresh = self.pool.get('key_a', 'secret_a')
+        stale = self.pool.get('key_b', 'secret_b')
+        fresh.auth._access_token = 'fresh'
+        fresh.auth._token_expiry = datetime.now() + timedelta(hours=1)
+        stale.auth._access_token = 'stale'
+        stale.auth._token_expiry = datetime.now() + timedelta(seconds=30)
+
+        with patch('safaricom_sdk.auth.Authentication._refresh_access_token', autospec=True) as mock_refresh:
+            refreshed = self.pool.refresh_tokens(within_seconds=120)
+
+        self.assertEqual(refreshed, 1)
+        mock_refresh.assert_called_once_with(stale.auth)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# tests/test_preparation.py
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import ValidationError
+from safaricom_sdk.preparation import prepare_batch
+from safaricom_sdk.utils import generate_password
+
+B2C_DEFAULTS = dict(InitiatorName="api", SecurityCredential="c", PartyA="600000", Remarks="Salary",
+                    QueueTimeOutURL="https://t", ResultURL="https://r")
+
+STK_ROWS = [{"MerchantRequestID": "m-1", "BusinessShortCode": "174379", "Amount": "10", "PartyA": "0712345678",
+             "PartyB": "174379", "PhoneNumber": "0712345678", "TransactionDesc": "Rent",
+             "CallBackURL": "https://cb", "AccountReference": "A1"}]
+
+
+def b2c_rows(count):
+    return ({"Amount": 100 + i, "PartyB": f"0712{i:06d}"} for i in range(count))
+
+
+class TestPrepareBatch(unittest.TestCase):
+    def test_inline_preparation_normalises_and_encodes(self):
+        prepared = list(prepare_batch(b2c_rows(3), "b2c", defaults=B2C_DEFAULTS, workers=0, chunk_size=2))
+        self.assertEqual([p.index for p in prepared], [0, 1, 2])
+        body = json.loads(prepared[1].body)
+        self.assertEqual(body["PartyB"], "251712000001")
+        self.assertEqual(body["Amount"], 101)
+        self.assertEqual(prepared[1].summary, {"Amount": 101, "PartyB": "251712000001", "CommandID": "BusinessPayment"})
+        self.assertNotIn("SecurityCredential", prepared[1].summary)
+
+    def test_invalid_rows_are_reported_not_raised(self):
+        rows = [{"Amount": 100, "PartyB": "0712000000"}, {"Amount": "lots", "PartyB": "0712000001"},
+                {"Amount": 100, "PartyB": "12"}]
+        prepared = list(prepare_batch(rows, "b2c", defaults=B2C_DEFAULTS, workers=0))
+        self.assertEqual([p.ok for p in prepared], [True, False, False])
+        self.assertIsNone(prepared[1].body)
+        self.assertIn("ValidationError", prepared[1].error)
+        self.assertIn("ValueError", prepared[2].error)
+
+    def test_stk_push_password_from_passkey(self):
+        prepared = next(prepare_batch(STK_ROWS, "stk_push", passkey="secret", workers=0))
+        body = json.loads(prepared.body)
+        self.assertEqual(prepared.timestamp, body["Timestamp"])
+        self.assertEqual(body["Password"], generate_password("174379", "secret", body["Timestamp"]))
+        self.assertEqual(body["PhoneNumber"], "251712345678")
+
+    def test_process_pool_ordered_and_unordered(self):
+        expected = list(prepare_batch(b2c_rows(50), "b2c", defaults=B2C_DEFAULTS, workers=0))
+        ordered = list(prepare_batch(b2c_rows(50), "b2c", defaults=B2C_DEFAULTS, workers=2, chunk_size=7))
+        self.assertEqual([p.body for p in ordered], [p.body for p in expected])
+        unordered = prepare_batch(b2c_rows(50), "b2c", defaults=B2C_DEFAULTS, workers=2, chunk_size=7, ordered=False)
+        self.assertEqual(sorted(p.index for p in unordered), list(range(50)))
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            next(prepare_batch([], "c2b"))
+
+
+class TestSendPrepared(unittest.TestCase):
+    def setUp(self):
+        self.client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"))
+        self.client.auth._access_token = "token"
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_sends_prepared_bytes_unchanged(self, mock_request):
+        mock_request.return_value = MagicMock(
+            status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "ok", "ConversationID": "AG_1"}'
+        )
+        prepared = next(prepare_batch(b2c_rows(1), "b2c", defaults=B2C_DEFAULTS, workers=0))
+        response = self.client.send_prepared(prepared)
+        self.assertEqual(response.ConversationID, "AG_1")
+        kwargs = mock_request.call_args.kwargs
+        self.assertIs(kwargs["data"], prepared.body)
+        self.assertNotIn("json", kwargs)
+        self.assertEqual(kwargs["url"], self.client.config.get_b2c_url())
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_stk_push_password_regenerated_at_send_time(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, content=(
+            b'{"MerchantRequestID": "m-1", "CheckoutRequestID": "ws_1", "ResponseCode": "0", '
+            b'"ResponseDescription": "ok", "CustomerMessage": "ok"}'
+        ))
+        prepared = next(prepare_batch(STK_ROWS, "stk_push", passkey="secret", workers=0))
+        stale = prepared._replace(timestamp="20200101000000")
+
+        with self.assertRaises(ValidationError):
+            self.client.send_prepared(stale)
+        mock_request.assert_not_called()
+
+        self.client.send_prepared(stale, passkey="secret")
+        body = json.loads(mock_request.call_args.kwargs["data"])
+        self.assertGreater(body["Timestamp"], "20200101000000")
+        self.assertEqual(body["Password"], generate_password("174379", "secret", body["Timestamp"]))
+        self.assertEqual(body["PhoneNumber"], "251712345678")
+
+    def test_failed_row_is_rejected(self):
+        prepared = next(prepare_batch([{"Amount": 1}], "b2c", workers=0))
+        with self.assertRaises(ValidationError):
+            self.client.send_prepared(prepared)
+
+
+if __name__ == "__main__":
+    unittest.main()
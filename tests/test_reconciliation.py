@@ -0,0 +1,94 @@
+# tests/test_reconciliation.py
+import unittest
+from decimal import Decimal
+
+from safaricom_sdk.models import C2BConfirmation
+from safaricom_sdk.reconciliation import (
+    ReconciliationEngine, Invoice,
+    MATCHED, PARTIAL, OVERPAID, DUPLICATE, UNMATCHED, INVALID
+)
+
+
+def confirmation(trans_id, amount, bill_ref=None, msisdn=None):
+    return C2BConfirmation(TransID=trans_id, TransAmount=amount, BillRefNumber=bill_ref, MSISDN=msisdn)
+
+
+class TestReconciliationEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReconciliationEngine()
+        self.engine.load([
+            Invoice('INV-1', '100.00', bill_ref='acc-001', phone='0712345678'),
+            Invoice('INV-2', 250, bill_ref='ACC-002'),
+            {'invoice_id': 'INV-3', 'amount': '75.50', 'phone': '+251 711 111 111'},
+            Invoice('INV-4', '42.00'),
+        ])
+
+    def test_match_by_bill_ref(self):
+        result = self.engine.match(confirmation('T1', '100.00', bill_ref=' ACC-001 '))
+        self.assertEqual(result.status, MATCHED)
+        self.assertEqual(result.invoice_id, 'INV-1')
+        self.assertEqual(result.matched_by, 'bill_ref')
+        self.assertEqual(len(self.engine), 3)
+
+    def test_match_by_normalized_phone(self):
+        result = self.engine.match({'TransID': 'T1', 'TransAmount': 75.5, 'MSISDN': '251711111111'})
+        self.assertEqual((result.status, result.invoice_id, result.matched_by), (MATCHED, 'INV-3', 'phone'))
+
+    def test_match_by_unique_amount(self):
+        result = self.engine.match(confirmation('T1', '42'))
+        self.assertEqual((result.status, result.invoice_id, result.matched_by), (MATCHED, 'INV-4', 'amount'))
+
+    def test_partial_then_settled(self):
+        first = self.engine.match(confirmation('T1', '200', bill_ref='ACC-002'))
+        self.assertEqual(first.status, PARTIAL)
+        self.assertEqual(first.remaining, Decimal('50'))
+
+        # The outstanding balance is now findable by amount alone
+        second = self.engine.match(confirmation('T2', '50'))
+        self.assertEqual((second.status, second.invoice_id), (MATCHED, 'INV-2'))
+
+    def test_overpaid_duplicate_unmatched_invalid(self):
+        self.assertEqual(self.engine.match(confirmation('T1', '120', bill_ref='ACC-001')).status, OVERPAID)
+        self.assertEqual(self.engine.match(confirmation('T1', '120', bill_ref='ACC-001')).status, DUPLICATE)
+        self.assertEqual(self.engine.match(confirmation('T2', '999', bill_ref='NOPE')).status, UNMATCHED)
+        self.assertEqual(self.engine.match(confirmation('T3', 'abc')).status, INVALID)
+        for trans_id, amount in (('T4', 'Infinity'), ('T5', 'NaN'), ('T6', 'sNaN')):
+            self.assertEqual(self.engine.match(confirmation(trans_id, amount)).status, INVALID)
+
+        summary = self.engine.summary()
+        self.assertEqual(summary[OVERPAID], 1)
+        self.assertEqual(summary[DUPLICATE], 1)
+        self.assertEqual(summary[UNMATCHED], 1)
+        self.assertEqual(summary[INVALID], 4)
+        self.assertEqual(summary['open_invoices'], 3)
+
+    def test_process_stream_and_open_invoices(self):
+        results = list(self.engine.process([
+            confirmation('T1', '100', bill_ref='ACC-001'),
+            confirmation('T2', '10', bill_ref='ACC-002'),
+        ]))
+        self.assertEqual([r.status for r in results], [MATCHED, PARTIAL])
+
+        open_invoices = {r.invoice_id: r for r in self.engine.open_invoices()}
+        self.assertEqual(set(open_invoices), {'INV-2', 'INV-3', 'INV-4'})
+        self.assertEqual(open_invoices['INV-2'].remaining, Decimal('240'))
+
+    def test_amount_tolerance(self):
+        engine = ReconciliationEngine(amount_tolerance=50)
+        engine.load([Invoice('INV-1', '100.00'), Invoice('INV-2', '300.00'), Invoice('INV-3', '300.20')])
+
+        result = engine.match(confirmation('T1', '99.60'))
+        self.assertEqual((result.status, result.invoice_id), (PARTIAL, 'INV-1'))
+        # Two invoices within tolerance: ambiguous, left unmatched
+        self.assertEqual(engine.match(confirmation('T2', '300.10')).status, UNMATCHED)
+
+    def test_duplicate_window_is_bounded(self):
+        engine = ReconciliationEngine(max_tracked_transactions=2)
+        for trans_id in ('T1', 'T2', 'T3'):
+            engine.match(confirmation(trans_id, '1'))
+        self.assertEqual(len(engine._seen), 2)
+        self.assertNotEqual(engine.match(confirmation('T1', '1')).status, DUPLICATE)
+
+
+if __name__ == '__main__':
+    unittest.main()
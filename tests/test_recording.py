@@ -0,0 +1,99 @@
+# tests/test_recording.py
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.models import B2CRequest
+from safaricom_sdk.recording import TrafficRecorder, TrafficReplayer, read_recording, redact
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubServer  # noqa: E402
+
+REQUEST = B2CRequest(InitiatorName="api", SecurityCredential="secret-credential", Amount=100, PartyA="600000",
+                     PartyB="251712345678", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+
+
+class TestTrafficRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traffic.jsonl")
+        self.server = StubServer().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def client(self, recorder=None):
+        config = Configuration(consumer_key="k", consumer_secret="s", base_url=self.server.base_url)
+        return MPESAClient(config, recorder=recorder)
+
+    def test_redaction(self):
+        body = redact({
+            "SecurityCredential": "abc", "PartyA": "600000", "PartyB": "251712345678",
+            "CallbackMetadata": {"Item": [{"Name": "PhoneNumber", "Value": 251712345678}, {"Name": "Amount", "Value": 5}]},
+        })
+        self.assertEqual(body["SecurityCredential"], "***")
+        self.assertEqual(body["PartyA"], "600000")
+        self.assertEqual(body["PartyB"], "XXXXXXXXX678")
+        self.assertEqual(body["CallbackMetadata"]["Item"][0]["Value"], "XXXXXXXXX678")
+        self.assertEqual(body["CallbackMetadata"]["Item"][1]["Value"], 5)
+
+    def test_records_requests_and_callbacks_redacted(self):
+        with TrafficRecorder(self.path, flush_every=10) as recorder:
+            client = self.client(recorder)
+            client.process_b2c_payment(REQUEST)
+            handler = recorder.wrap(lambda payload: "handled", path="/b2c/result")
+            self.assertEqual(handler({"Result": {"ResultCode": 0, "ConversationID": "AG_1"}}), "handled")
+
+        with open(self.path) as f:
+            raw = f.read()
+        self.assertNotIn("secret-credential", raw)
+        self.assertNotIn("251712345678", raw)
+        self.assertNotIn("Bearer", raw)
+
+        records = list(read_recording(self.path))
+        self.assertEqual([r["type"] for r in records], ["request", "callback"])
+        request = records[0]
+        self.assertEqual(request["path"], "/mpesa/b2c/v1/paymentrequest")
+        self.assertEqual(request["status"], 200)
+        self.assertEqual(request["request"]["Amount"], 100)
+        self.assertEqual(request["response"]["ResponseCode"], "0")
+        self.assertGreater(request["ms"], 0)
+        self.assertEqual(records[1]["path"], "/b2c/result")
+
+    def test_append_only_and_torn_line_skipped(self):
+        for _ in range(2):
+            with TrafficRecorder(self.path) as recorder:
+                recorder.record_callback({"TransID": "T1"})
+        with open(self.path, "a") as f:
+            f.write('{"t": 1, "type": "callb')
+        self.assertEqual(len(list(read_recording(self.path))), 2)
+
+    def test_replay_preserves_spacing_at_speed(self):
+        with TrafficRecorder(self.path) as recorder:
+            client = self.client(recorder)
+            client.process_b2c_payment(REQUEST)
+            time.sleep(0.3)
+            client.process_b2c_payment(REQUEST)
+            recorder.record_callback({"TransID": "T1"})
+
+        replayer = TrafficReplayer(self.client(), self.path, speed=3, callback_url=self.server.base_url + "/callback")
+        report = replayer.run()
+        self.assertEqual((report.sent, report.errors), (3, 0))
+        self.assertGreaterEqual(report.duration_s, 0.09)
+        self.assertLess(report.duration_s, 0.3)
+        self.assertGreater(report.p50_ms, 0)
+        self.assertGreater(report.recorded_p50_ms, 0)
+
+    def test_speed_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TrafficReplayer(self.client(), self.path, speed=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# tests/test_routing.py
+import os
+import socket
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.models import B2CRequest
+from safaricom_sdk.routing import EndpointRouter, never_sent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubServer  # noqa: E402
+
+A, B = "https://a.example", "https://b.example"
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+class TestEndpointRouter(unittest.TestCase):
+    def test_prefers_configured_order_until_measured(self):
+        router = EndpointRouter([A, B + "/"])
+        self.assertEqual(router.order(), [A, B])
+        router.record(A, 0.300, ok=True)
+        router.record(B, 0.280, ok=True)
+        self.assertEqual(router.order()[0], A)  # within hysteresis
+        router.record(B, 0.050, ok=True)
+        self.assertEqual(router.order()[0], B)
+        self.assertEqual(router.stats()["active"], B)
+
+    def test_errors_and_ejection(self):
+        router = EndpointRouter([A, B], eject_after=2, cooldown=60)
+        router.record(A, 0.1, ok=True)
+        router.record(B, 0.1, ok=True)
+        router.record(A, 0.1, ok=False)
+        self.assertEqual(router.order()[0], B)
+        router.record(B, 0.1, ok=False)
+        router.record(B, 0.1, ok=False)
+        self.assertTrue(router.stats()["endpoints"][B]["ejected"])
+        self.assertEqual(router.order(), [A, B])
+
+    def test_fails_over_only_when_never_sent(self):
+        router = EndpointRouter([A, B])
+        refused = requests.exceptions.ConnectionError(MagicMock(reason=NewConnectionError(None, "Connection refused")))
+        sent = []
+
+        def send(url):
+            sent.append(url)
+            if url.startswith(A):
+                raise refused
+            return MagicMock(status_code=200)
+
+        router.send(A + "/mpesa/b2c/v1/paymentrequest", A, send)
+        self.assertEqual(sent, [A + "/mpesa/b2c/v1/paymentrequest", B + "/mpesa/b2c/v1/paymentrequest"])
+        self.assertEqual(router.stats()["failovers"], 1)
+
+        read_timeout = MagicMock(side_effect=requests.exceptions.ReadTimeout())
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            EndpointRouter([A, B]).send(A + "/x", A, read_timeout)
+        self.assertEqual(read_timeout.call_count, 1)
+
+        self.assertEqual(EndpointRouter([A, B]).send(A + "/x", A, send, idempotent=True).status_code, 200)
+
+    def test_set_endpoints_keeps_history(self):
+        router = EndpointRouter([A, B])
+        router.record(B, 0.2, ok=True)
+        router.set_endpoints([B, "https://c.example"])
+        self.assertEqual(router.stats()["endpoints"][B]["requests"], 1)
+        self.assertEqual(router.stats()["active"], B)
+
+    def test_never_sent_classification(self):
+        self.assertTrue(never_sent(requests.exceptions.ConnectTimeout()))
+        self.assertFalse(never_sent(requests.exceptions.ReadTimeout()))
+        self.assertFalse(never_sent(requests.exceptions.ConnectionError("Connection aborted")))
+
+
+class TestClientFailover(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_token_and_payment_fail_over_to_live_endpoint(self):
+        dead = closed_port_url()
+        config = Configuration(consumer_key="k", consumer_secret="s", base_url=dead, base_urls=[self.server.base_url])
+        client = MPESAClient(config)
+        self.assertIs(client.auth.router, client.router)
+
+        response = client.process_b2c_payment(B2CRequest(
+            InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+            PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r"
+        ))
+        self.assertEqual(response.ResponseCode, "0")
+        stats = client.router.stats()
+        self.assertEqual(stats["active"], self.server.base_url.rstrip("/"))
+        self.assertEqual(stats["failovers"], 1)  # token fetch; the payment then went straight to the live endpoint
+        self.assertEqual(stats["endpoints"][dead]["failures"], 1)
+
+    def test_probes_measure_endpoints(self):
+        router = EndpointRouter([closed_port_url(), self.server.base_url], eject_after=1)
+        router.probe(timeout=1)
+        endpoints = router.stats()["endpoints"]
+        dead, live = router.endpoints
+        self.assertTrue(endpoints[dead]["ejected"])
+        self.assertIsNotNone(endpoints[live]["latency_ms"])
+        self.assertEqual(router.order()[0], live)
+
+    def test_single_endpoint_has_no_router(self):
+        self.assertIsNone(MPESAClient(Configuration(consumer_key="k", consumer_secret="s")).router)
+
+    def test_update_config_adds_router_for_failover_endpoints(self):
+        dead = closed_port_url()
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s", base_url=dead))
+        client.update_config(Configuration(
+            consumer_key="k", consumer_secret="s", base_url=dead, base_urls=[self.server.base_url]
+        ))
+
+        self.assertIsNotNone(client.router)
+        self.assertIs(client.auth.router, client.router)
+        self.assertTrue(client.auth.get_access_token())
+        self.assertEqual(client.router.stats()["failovers"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+# tests/test_scheduler.py
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from safaricom_sdk.exceptions import APIError, MPESAError
+from safaricom_sdk.models import B2CRequest, STKPushRequest, TransactionResponse
+from safaricom_sdk.scheduler import PaymentScheduler
+
+
+def b2c_request(amount=100):
+    return B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=amount, PartyA="600000",
+                      PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+
+
+class TestPaymentScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.now = 1_000_000.0
+        self.client = MagicMock()
+        self.client.process_b2c_payment.return_value = TransactionResponse(ResponseCode="0", ResponseDescription="ok")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scheduler(self, **kwargs):
+        scheduler = PaymentScheduler(self.client, self.path, clock=lambda: self.now, **kwargs)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def test_dispatches_only_due_jobs_in_order(self):
+        scheduler = self.scheduler(max_concurrency=1)
+        late = scheduler.schedule(b2c_request(300), self.now + 30)
+        first = scheduler.schedule(b2c_request(100), self.now + 10)
+        scheduler.schedule(b2c_request(900), self.now + 3600)
+
+        self.assertEqual(scheduler.run_pending(self.now + 5), 0)
+        self.assertEqual(scheduler.run_pending(self.now + 60), 2)
+        amounts = [c.args[0].Amount for c in self.client.process_b2c_payment.call_args_list]
+        self.assertEqual(amounts, [100, 300])
+        self.assertEqual(scheduler.get(first)["status"], "done")
+        self.assertEqual(scheduler.get(late)["result"]["ResponseCode"], "0")
+        self.assertEqual(scheduler.stats()["pending"], 1)
+
+    def test_recurring_job_coalesces_missed_occurrences(self):
+        scheduler = self.scheduler()
+        job = scheduler.schedule(b2c_request(), self.now, interval=60)
+        self.now += 250
+        self.assertEqual(scheduler.run_pending(), 1)
+        state = scheduler.get(job)
+        self.assertEqual(state["status"], "pending")
+        self.assertEqual(state["due_at"], self.now - 250 + 300)
+        self.assertEqual(state["runs"], 1)
+
+    def test_skip_policy_marks_stale_jobs_missed(self):
+        scheduler = self.scheduler(misfire_grace=60, misfire_policy="skip")
+        stale = scheduler.schedule(b2c_request(), self.now - 600)
+        fresh = scheduler.schedule(b2c_request(), self.now - 30)
+        self.assertEqual(scheduler.run_pending(), 1)
+        self.assertEqual(scheduler.get(stale)["status"], "missed")
+        self.assertEqual(scheduler.get(fresh)["status"], "done")
+        self.assertEqual(self.client.process_b2c_payment.call_count, 1)
+
+    def test_failures_split_into_failed_and_uncertain(self):
+        def send(request, deadline=None):
+            if request.Amount == 1:
+                raise APIError("rejected", status_code=400)
+            raise MPESAError("timed out") from requests.exceptions.ReadTimeout()
+        self.client.process_b2c_payment.side_effect = send
+        scheduler = self.scheduler()
+        rejected = scheduler.schedule(b2c_request(1), self.now)
+        timed_out = scheduler.schedule(b2c_request(2), self.now)
+        scheduler.run_pending()
+        self.assertEqual(scheduler.get(rejected)["status"], "failed")
+        self.assertEqual(scheduler.get(timed_out)["status"], "uncertain")
+
+    def test_job_scheduled_during_refill_is_not_lost(self):
+        scheduler = self.scheduler()
+        execute = scheduler._execute
+        raced = []
+
+        def execute_with_race(sql, params=()):
+            cursor = execute(sql, params)
+            if sql.startswith("SELECT due_at") and not raced:
+                rows = cursor.fetchall()
+                # Lands after the SELECT but before the refill advances its mark
+                raced.append(scheduler.schedule(b2c_request(200), self.now + 1))
+                return MagicMock(fetchall=lambda: rows)
+            return cursor
+        scheduler._execute = execute_with_race
+
+        first = scheduler.schedule(b2c_request(100), self.now)
+        self.assertEqual(scheduler.run_pending(self.now + 5), 2)
+        self.assertEqual(scheduler.get(first)["status"], "done")
+        self.assertEqual(scheduler.get(raced[0])["status"], "done")
+
+    def test_cancelled_job_is_not_sent(self):
+        scheduler = self.scheduler()
+        job = scheduler.schedule(b2c_request(), self.now)
+        self.assertTrue(scheduler.cancel(job))
+        self.assertEqual(scheduler.run_pending(), 0)
+        self.assertFalse(scheduler.cancel(job))
+        self.client.process_b2c_payment.assert_not_called()
+
+    def test_job_waiting_for_a_worker_stays_pending(self):
+        scheduler = self.scheduler(max_concurrency=1)
+        job = scheduler.schedule(b2c_request(), self.now)
+        scheduler._slots.acquire()  # the only worker is busy
+        dispatch = threading.Thread(target=scheduler._dispatch, args=(self.now, job, self.now), daemon=True)
+        dispatch.start()
+        time.sleep(0.05)
+
+        self.assertEqual(scheduler.get(job)["status"], "pending")
+        self.assertTrue(scheduler.cancel(job))
+        scheduler._slots.release()
+        dispatch.join(timeout=5)
+        self.assertEqual(scheduler.get(job)["status"], "cancelled")
+        self.client.process_b2c_payment.assert_not_called()
+        self.assertTrue(scheduler._slots.acquire(timeout=1))  # the slot was given back
+        scheduler._slots.release()
+
+    def test_restart_loads_pending_and_flags_interrupted_jobs(self):
+        scheduler = PaymentScheduler(self.client, self.path, clock=lambda: self.now)
+        pending = scheduler.schedule(b2c_request(), self.now + 10)
+        in_flight = scheduler.schedule(b2c_request(), self.now)
+        scheduler._execute("UPDATE mpesa_scheduled_jobs SET status = 'running' WHERE id = ?", (in_flight,))
+        scheduler.close()
+
+        restarted = self.scheduler()
+        self.assertEqual(restarted.get(in_flight)["status"], "uncertain")
+        self.assertEqual(restarted.stats()["recovered"], 1)
+        self.assertEqual(restarted.run_pending(self.now + 10), 1)
+        self.assertEqual(restarted.get(pending)["status"], "done")
+        self.assertEqual(self.client.process_b2c_payment.call_count, 1)
+
+    def test_stk_push_password_regenerated_at_dispatch(self):
+        self.client.stk_push.return_value = MagicMock(model_dump_json=lambda: "{}")
+        scheduler = self.scheduler(passkey="secret")
+        scheduler.schedule(STKPushRequest(
+            MerchantRequestID="m-1", BusinessShortCode="174379", Password="stale", Timestamp="20200101000000",
+            Amount="10", PartyA="254700000000", PartyB="174379", PhoneNumber="254700000000",
+            TransactionDesc="Rent", CallBackURL="https://cb", AccountReference="A1"
+        ), self.now)
+        scheduler.run_pending()
+        sent = self.client.stk_push.call_args.args[0]
+        self.assertNotEqual(sent.Timestamp, "20200101000000")
+        self.assertNotEqual(sent.Password, "stale")
+
+    def test_timer_thread_dispatches_with_bounded_concurrency(self):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def send(request, deadline=None):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return TransactionResponse(ResponseCode="0", ResponseDescription="ok")
+        self.client.process_b2c_payment.side_effect = send
+
+        scheduler = PaymentScheduler(self.client, self.path, max_concurrency=2)
+        self.addCleanup(scheduler.close)
+        for _ in range(6):
+            scheduler.schedule(b2c_request(), time.time())
+        scheduler.start()
+        deadline = time.time() + 5
+        while scheduler.stats()["done"] < 6 and time.time() < deadline:
+            time.sleep(0.01)
+        scheduler.stop()
+        self.assertEqual(scheduler.stats()["done"], 6)
+        self.assertLessEqual(peak[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
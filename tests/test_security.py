@@ -0,0 +1,83 @@
+# tests/test_security.py
+import base64
+import datetime
+import unittest
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+    from cryptography.x509.oid import NameOID
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+
+from safaricom_sdk.exceptions import ConfigurationError
+from safaricom_sdk.security import SecurityCredentialProvider
+
+
+def make_certificate():
+    """Self-signed certificate standing in for Safaricom's public certificate"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "apisandbox.safaricom.et")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, cert
+
+
+@unittest.skipUnless(HAS_CRYPTOGRAPHY, "cryptography is not installed")
+class TestSecurityCredentialProvider(unittest.TestCase):
+    def setUp(self):
+        self.key, cert = make_certificate()
+        self.provider = SecurityCredentialProvider(cert.public_bytes(serialization.Encoding.PEM))
+
+    def decrypt(self, credential):
+        return self.key.decrypt(base64.b64decode(credential), padding.PKCS1v15()).decode()
+
+    def test_encrypts_initiator_password(self):
+        credential = self.provider.get('initiator', 'Safaricom999!*!')
+        self.assertEqual(self.decrypt(credential), 'Safaricom999!*!')
+
+    def test_caches_per_initiator(self):
+        first = self.provider.get('initiator', 'password')
+        self.assertEqual(self.provider.get('initiator', 'password'), first)
+        self.assertEqual(self.provider.stats(), {'initiators': 1, 'hits': 1, 'misses': 1})
+
+        # A new password replaces the cached credential
+        changed = self.provider.get('initiator', 'new-password')
+        self.assertNotEqual(changed, first)
+        self.assertEqual(self.decrypt(changed), 'new-password')
+
+    def test_invalidate(self):
+        first = self.provider.get('initiator', 'password')
+        self.provider.invalidate('initiator')
+        # PKCS#1 v1.5 padding is randomized, so a re-encryption differs
+        self.assertNotEqual(self.provider.get('initiator', 'password'), first)
+
+    def test_rotate_certificate(self):
+        self.provider.get('initiator', 'password')
+        new_key, new_cert = make_certificate()
+        self.provider.rotate_certificate(new_cert.public_bytes(serialization.Encoding.DER))
+
+        credential = self.provider.get('initiator', 'password')
+        self.assertEqual(
+            new_key.decrypt(base64.b64decode(credential), padding.PKCS1v15()).decode(), 'password'
+        )
+        self.assertEqual(self.provider.stats()['misses'], 2)
+
+    def test_invalid_certificate(self):
+        with self.assertRaises(ConfigurationError):
+            SecurityCredentialProvider(b'not a certificate')
+
+
+if __name__ == '__main__':
+    unittest.main()
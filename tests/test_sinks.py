@@ -0,0 +1,137 @@
+# tests/test_sinks.py
+import json
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import SinkFullError
+from safaricom_sdk.models import B2CRequest
+from safaricom_sdk.sinks import BatchingWriter, EventSink, SQLiteEventSink, callback_event, make_event
+
+
+class RecordingSink(EventSink):
+    def __init__(self, fail_times=0, block=None):
+        self.batches = []
+        self.fail_times = fail_times
+        self.block = block
+        self.closed = False
+
+    def write_batch(self, events):
+        if self.block is not None:
+            self.block.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise IOError("database unavailable")
+        self.batches.append(list(events))
+
+    def close(self):
+        self.closed = True
+
+
+class TestBatchingWriter(unittest.TestCase):
+    def test_incomplete_sink_fails_at_construction(self):
+        class NoWriteBatch(EventSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoWriteBatch()
+
+    def test_flushes_by_size(self):
+        sink = RecordingSink()
+        writer = BatchingWriter(sink, max_batch=10, flush_interval=60)
+        for i in range(25):
+            writer.emit(make_event("b2c_payment", f"AG_{i}", {"n": i}))
+        writer.close()
+
+        self.assertEqual([len(b) for b in sink.batches], [10, 10, 5])
+        self.assertTrue(sink.closed)
+        self.assertEqual(writer.stats()["written"], 25)
+
+    def test_flushes_by_interval(self):
+        sink = RecordingSink()
+        writer = BatchingWriter(sink, max_batch=1000, flush_interval=0.01)
+        writer.emit(make_event("stk_push", "ws_CO_1", {}))
+        for _ in range(200):
+            if sink.batches:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(len(sink.batches), 1)
+        writer.close()
+
+    def test_backpressure_when_full(self):
+        release = threading.Event()
+        sink = RecordingSink(block=release)
+        writer = BatchingWriter(sink, max_batch=1, max_queue=2, put_timeout=0.05)
+        with self.assertRaises(SinkFullError):
+            for i in range(10):
+                writer.emit(make_event("callback", str(i), {}))
+        self.assertEqual(writer.stats()["rejected"], 1)
+        release.set()
+        writer.close()
+
+    def test_emit_racing_close_is_not_lost(self):
+        sink = RecordingSink()
+        writer = BatchingWriter(sink, max_batch=10, flush_interval=60)
+        put = writer._queue.put
+        closer = threading.Thread(target=writer.close)
+
+        def put_after_close(item, *args, **kwargs):
+            # close() starts after this producer passed the closed check but before it enqueues
+            writer._queue.put = put
+            closer.start()
+            closer.join(timeout=0.2)
+            put(item, *args, **kwargs)
+
+        writer._queue.put = put_after_close
+        emitter = threading.Thread(target=writer.emit, args=(make_event("callback", "late", {}),))
+        emitter.start()
+        emitter.join(timeout=5)
+        closer.join(timeout=5)
+        self.assertFalse(writer._worker.is_alive())
+        self.assertEqual([e.key for batch in sink.batches for e in batch], ["late"])
+        self.assertEqual(writer.stats()["emitted"], 1)
+
+    def test_retries_failed_batches(self):
+        sink = RecordingSink(fail_times=1)
+        writer = BatchingWriter(sink, max_batch=5)
+        writer.emit(make_event("callback", "x", {}))
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual(len(sink.batches), 1)
+        self.assertEqual(writer.stats()["failed"], 0)
+        writer.close()
+
+
+class TestSQLiteEventSink(unittest.TestCase):
+    def test_write_batch(self):
+        sink = SQLiteEventSink(":memory:")
+        with BatchingWriter(sink, max_batch=100) as writer:
+            writer.emit(callback_event({"TransID": "RKTQDM7W6S", "TransAmount": "10"}))
+            writer.write_batch([make_event("b2c_payment", f"AG_{i}", {"Amount": i}) for i in range(150)])
+            writer.flush()
+            self.assertEqual(sink.count(), 151)
+            self.assertEqual(sink.count("callback"), 1)
+
+    def test_client_emits_transaction_events(self):
+        sink = SQLiteEventSink(":memory:")
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"), event_sink=sink)
+        client.auth._access_token = "token"
+        client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+
+        body = {"ResponseCode": "0", "ResponseDescription": "Accepted", "ConversationID": "AG_1"}
+        response = MagicMock(status_code=200, content=json.dumps(body).encode())
+        request = B2CRequest(InitiatorName="api", SecurityCredential="secret", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+        with patch('safaricom_sdk.client.requests.request', return_value=response):
+            client.process_b2c_payment(request)
+
+        row = sink._db.execute("SELECT kind, key, payload FROM mpesa_events").fetchone()
+        self.assertEqual(row[:2], ("b2c_payment", "AG_1"))
+        self.assertNotIn("secret", row[2])
+        sink.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# tests/test_streaming.py
+import asyncio
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from urllib.parse import urlsplit
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.concurrency import AdaptiveConcurrencyLimiter
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import APIError
+from safaricom_sdk.models import B2CRequest, STKPushRequest
+from safaricom_sdk.streaming import stream_requests
+
+
+class TestStreamRequests(unittest.TestCase):
+    def test_pulls_input_only_as_capacity_frees(self):
+        pulled, done, active, peak = [0], [0], [0], [0]
+
+        async def source():
+            for i in range(20):
+                pulled[0] += 1
+                # Never more than `concurrency` in flight plus the item being pulled
+                self.assertLessEqual(pulled[0] - done[0], 4)
+                yield i
+
+        async def call(request, deadline=None):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.001 * (request % 3))
+            active[0] -= 1
+            return request * 10
+
+        async def main():
+            results = []
+            async for result in stream_requests(source(), call, lambda i, r: f"id-{i}", concurrency=3):
+                done[0] += 1
+                results.append(result)
+            return results
+
+        results = asyncio.run(main())
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(peak[0], 3)
+        self.assertEqual({r.correlation_id: r.response for r in results}, {f"id-{i}": i * 10 for i in range(20)})
+
+    def test_errors_are_yielded_and_pairs_keep_their_ids(self):
+        async def call(request, deadline=None):
+            if request == "bad":
+                raise APIError("rejected", status_code=400)
+            return "ok"
+
+        async def main():
+            return [r async for r in stream_requests([("a", "good"), ("b", "bad")], call, lambda i, r: i)]
+
+        results = {r.correlation_id: r for r in asyncio.run(main())}
+        self.assertTrue(results["a"].ok)
+        self.assertIsInstance(results["b"].error, APIError)
+
+    def test_early_exit_cancels_in_flight_and_closes_source(self):
+        closed, cancelled = [], []
+
+        async def source():
+            try:
+                i = 0
+                while True:
+                    yield i
+                    i += 1
+            finally:
+                closed.append(True)
+
+        async def call(request, deadline=None):
+            try:
+                await asyncio.sleep(0.05 if request == 0 else 10)
+            except asyncio.CancelledError:
+                cancelled.append(request)
+                raise
+            return request
+
+        async def main():
+            stream = stream_requests(source(), call, lambda i, r: i, concurrency=4)
+            async for result in stream:
+                break
+            await stream.aclose()
+
+        asyncio.run(main())
+        self.assertEqual(closed, [True])
+        self.assertEqual(sorted(cancelled), [1, 2, 3])
+
+
+class TestClientStreaming(unittest.TestCase):
+    def setUp(self):
+        self.client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s"))
+        self.client.auth._access_token = "token"
+        self.client.auth._token_expiry = datetime.now() + timedelta(hours=1)
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_stream_stk_push_correlates_by_merchant_request_id(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, content=(
+            b'{"MerchantRequestID": "m", "CheckoutRequestID": "ws_1", "ResponseCode": "0", '
+            b'"ResponseDescription": "ok", "CustomerMessage": "ok"}'
+        ))
+
+        async def intents():
+            for i in range(5):
+                yield STKPushRequest(
+                    MerchantRequestID=f"m-{i}", BusinessShortCode="174379", Password="p", Timestamp="t",
+                    Amount="10", PartyA="251712345678", PartyB="174379", PhoneNumber="251712345678",
+                    TransactionDesc="Rent", CallBackURL="https://cb", AccountReference="A1"
+                )
+
+        async def main():
+            return [r async for r in self.client.stream_stk_push(intents(), concurrency=2)]
+
+        results = asyncio.run(main())
+        self.assertEqual(sorted(r.correlation_id for r in results), [f"m-{i}" for i in range(5)])
+        self.assertTrue(all(r.ok for r in results))
+
+    @patch('safaricom_sdk.client.requests.request')
+    def test_stream_b2c_reports_failures(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=500, content=b'{}')
+        request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+
+        async def main():
+            return [r async for r in self.client.stream_b2c([request] * 3)]
+
+        results = asyncio.run(main())
+        self.assertEqual(sorted(r.correlation_id for r in results), [0, 1, 2])
+        self.assertTrue(all(r.error.status_code == 500 for r in results))
+
+    def test_cancelled_request_keeps_its_slot_until_the_thread_finishes(self):
+        self.client.limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        endpoint = urlsplit(self.client.config.get_b2c_url()).path
+        sending, release = threading.Event(), threading.Event()
+
+        def send(**kwargs):
+            sending.set()
+            release.wait(5)
+            return MagicMock(status_code=200, content=b'{"ResponseCode": "0", "ResponseDescription": "ok"}')
+
+        request = B2CRequest(InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+                             PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r")
+
+        async def main():
+            stream = self.client.stream_b2c([request] * 3, concurrency=2)
+            fetch = asyncio.ensure_future(stream.__anext__())
+            await asyncio.get_running_loop().run_in_executor(None, sending.wait, 5)
+            fetch.cancel()
+            await asyncio.gather(fetch, return_exceptions=True)
+            await stream.aclose()
+            in_flight = self.client.limiter.stats()[endpoint]["in_flight"]
+            release.set()
+            for _ in range(100):
+                if self.client.limiter.stats()[endpoint]["in_flight"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            return in_flight, self.client.limiter.stats()[endpoint]["in_flight"]
+
+        with patch('safaricom_sdk.client.requests.request', side_effect=send):
+            self.assertEqual(asyncio.run(main()), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
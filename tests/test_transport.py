@@ -0,0 +1,122 @@
+# tests/test_transport.py
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.exceptions import ConfigurationError
+from safaricom_sdk.models import B2CRequest
+from safaricom_sdk.recording import TrafficRecorder, TrafficReplayer
+from safaricom_sdk.routing import EndpointRouter, never_sent
+from safaricom_sdk.transport import HTTP2Transport, create_transport, http2_available
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import H2StubServer  # noqa: E402
+
+B2C = B2CRequest(
+    InitiatorName="api", SecurityCredential="c", Amount=100, PartyA="600000",
+    PartyB="251700000000", Remarks="Salary", QueueTimeOutURL="https://t", ResultURL="https://r"
+)
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+@unittest.skipUnless(http2_available(), "httpx and h2 are not installed")
+class TestHTTP2Transport(unittest.TestCase):
+    def setUp(self):
+        self.server = H2StubServer(latency=0.05).__enter__()
+        self.transport = HTTP2Transport(max_connections=2, prior_knowledge=True)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.__exit__(None, None, None)
+
+    def test_client_multiplexes_concurrent_requests(self):
+        config = Configuration(consumer_key="k", consumer_secret="s", base_url=self.server.base_url)
+        client = MPESAClient(config, session=self.transport)
+        self.assertIs(client.auth.session, self.transport)
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            responses = list(pool.map(lambda _: client.process_b2c_payment(B2C), range(40)))
+        self.assertTrue(all(response.ResponseCode == "0" for response in responses))
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_many_threads_share_one_connection(self):
+        with H2StubServer() as server, HTTP2Transport(max_connections=1, prior_knowledge=True) as transport:
+            url = server.base_url + "/mpesa/b2c/v1/paymentrequest"
+            with ThreadPoolExecutor(max_workers=64) as pool:
+                statuses = list(pool.map(
+                    lambda _: transport.request("POST", url, json={}, timeout=5).status_code, range(1000)
+                ))
+            self.assertEqual(statuses, [200] * 1000)
+            self.assertEqual(server.connections, 1)
+
+    def test_responses_behave_like_requests_responses(self):
+        response = self.transport.request("POST", self.server.base_url + "/mpesa/b2c/v1/paymentrequest", json={})
+        self.assertIsInstance(response, requests.Response)
+        self.assertEqual(response.json()["ResponseCode"], "0")
+        self.assertEqual(response.headers["Content-Type"], "application/json")
+        response.close()
+
+    def test_probe_over_http2(self):
+        router = EndpointRouter([self.server.base_url, closed_port_url()])
+        router.probe(session=self.transport, timeout=2)
+        endpoints = router.stats()["endpoints"]
+        self.assertEqual(endpoints[self.server.base_url]["probes"], 1)
+        self.assertEqual(endpoints[self.server.base_url]["failures"], 0)
+        self.assertEqual(list(endpoints.values())[1]["failures"], 1)
+
+    def test_warm_up_over_http2(self):
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s", base_url=self.server.base_url),
+                             session=self.transport)
+        report = client.warm_up(connections=2, timeout=5)
+        self.assertTrue(report.ok, report.errors)
+        self.assertEqual(report.connections_opened, 2)
+
+    def test_replay_over_http2(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traffic.jsonl")
+            config = Configuration(consumer_key="k", consumer_secret="s", base_url=self.server.base_url)
+            with TrafficRecorder(path) as recorder:
+                MPESAClient(config, session=self.transport, recorder=recorder).process_b2c_payment(B2C)
+                recorder.record_callback({"TransID": "T1"})
+
+            replayer = TrafficReplayer(MPESAClient(config, session=self.transport), path,
+                                       callback_url=self.server.base_url + "/callback")
+            report = replayer.run()
+        self.assertEqual((report.sent, report.errors), (2, 0))
+
+    def test_connect_errors_map_to_requests_exceptions(self):
+        with self.assertRaises(requests.exceptions.ConnectionError) as ctx:
+            self.transport.request("POST", closed_port_url() + "/x", json={}, timeout=(1, 1))
+        self.assertTrue(never_sent(ctx.exception))
+
+
+class TestCreateTransport(unittest.TestCase):
+    def test_falls_back_to_requests_session(self):
+        with patch("safaricom_sdk.transport.http2_available", return_value=False):
+            session = create_transport()
+            self.assertIsInstance(session, requests.Session)
+            with self.assertRaises(ConfigurationError):
+                HTTP2Transport()
+
+    @unittest.skipUnless(http2_available(), "httpx and h2 are not installed")
+    def test_prefers_http2_when_installed(self):
+        with create_transport(max_connections=2) as transport:
+            self.assertIsInstance(transport, HTTP2Transport)
+        self.assertIsInstance(create_transport(http2=False), requests.Session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# tests/test_warmup.py
+import asyncio
+import os
+import sys
+import unittest
+
+import requests
+
+from safaricom_sdk.client import MPESAClient
+from safaricom_sdk.config import Configuration
+from safaricom_sdk.models import B2CRequest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from stub_server import StubServer  # noqa: E402
+
+B2C = B2CRequest(
+    InitiatorName="test",
+    SecurityCredential="credential",
+    Amount=100,
+    PartyA="174379",
+    PartyB="251712345678",
+    Remarks="Warm-up test",
+    QueueTimeOutURL="https://example.com/timeout",
+    ResultURL="https://example.com/result",
+)
+
+
+class TestWarmUp(unittest.TestCase):
+    def test_warm_up_against_stub_server(self):
+        # Server latency keeps the warm-up requests overlapping, so none reuses another's connection
+        with StubServer(latency=0.05) as server:
+            client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s", base_url=server.base_url))
+            report = client.warm_up(connections=3, timeout=5)
+
+            self.assertTrue(report.ok, report.errors)
+            self.assertEqual(report.connections_opened, 3)
+            self.assertIsNotNone(report.token_ms)
+            self.assertIsNotNone(client.session)
+            self.assertIs(client.auth.session, client.session)
+            self.assertTrue(client.auth._is_token_valid())
+
+            # Resolve the pool the way the adapter does for an API call; it must be the warm one
+            url = server.base_url + "/mpesa/b2c/v1/paymentrequest"
+            adapter = client.session.get_adapter(url)
+            verify = client.session.merge_environment_settings(url, {}, None, client.config.verify_ssl, None)["verify"]
+            pool = adapter.get_connection_with_tls_context(requests.Request("POST", url).prepare(), verify)
+            self.assertGreaterEqual(sum(1 for conn in pool.pool.queue if conn is not None), 3)
+
+            connections = server.connections
+            client.process_b2c_payment(B2C)
+            self.assertEqual(server.connections, connections)
+
+    def test_warm_up_reports_failures(self):
+        client = MPESAClient(Configuration(consumer_key="k", consumer_secret="s", base_url="http://127.0.0.1:9"))
+        report = asyncio.run(client.warm_up_async(connections=1, timeout=2))
+        self.assertFalse(report.ok)
+        self.assertIn("token", report.errors)
+        self.assertEqual(report.connections_opened, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()